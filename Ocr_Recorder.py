@@ -1,14 +1,62 @@
-import easyocr
 import base64
 import io
+import os
 import re
+import threading
+import time
 from dataclasses import dataclass
-from typing import Any, Dict, List, Optional, Tuple
+from typing import Any, BinaryIO, Dict, List, Optional, Tuple, Union
 import numpy as np
-from PIL import Image
+from PIL import Image, ImageOps
 
+from telemetry import span
 
-reader = easyocr.Reader(["ko", "en"], gpu=False)
+
+OCR_LANGUAGES = ["ko", "en"]
+
+
+def _easyocr_version() -> str:
+    # easyocr(torch) import 없이 설치 버전만 조회
+    from importlib.metadata import PackageNotFoundError, version
+
+    try:
+        return version("easyocr")
+    except PackageNotFoundError:
+        return "unknown"
+
+
+OCR_MODEL_VERSION = _easyocr_version()
+
+# EasyOCR 리더는 첫 사용 시점(또는 서버 warm-up)에 생성한다.
+# import 만으로 모델(수백 MB)을 로드하지 않도록 지연 초기화.
+_reader = None
+_reader_lock = threading.Lock()
+reader_load_seconds: Optional[float] = None
+
+
+def get_reader():
+    """EasyOCR 리더를 반환합니다. 최초 호출 시 모델을 로드합니다."""
+    global _reader, reader_load_seconds
+    if _reader is None:
+        with _reader_lock:
+            if _reader is None:
+                import easyocr
+
+                started = time.perf_counter()
+                _reader = easyocr.Reader(OCR_LANGUAGES, gpu=False)
+                reader_load_seconds = time.perf_counter() - started
+    return _reader
+
+
+def is_reader_loaded() -> bool:
+    return _reader is not None
+
+
+def __getattr__(name: str):
+    # 기존 코드의 `Ocr_Recorder.reader` 접근 호환
+    if name == "reader":
+        return get_reader()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 # 영수증 검증 정규식
 
@@ -19,27 +67,265 @@ CARD_HINT = re.compile(r"(카드|신용|체크|승인|VISA|MASTER|AMEX)", re.I)
 CASH_HINT = re.compile(r"(현금|현금영수증)", re.I)
 APP_HINT = re.compile(r"(페이|PAY|간편결제|삼성페이|카카오페이|네이버페이|토스페이)", re.I)
 TEL_PAT = re.compile(r"\b0\d{1,2}[- ]?\d{3,4}[- ]?\d{4}\b")
+BIZNO_LOOSE_PAT = re.compile(r"(\d{3})[- ](\d{2})[- ](\d{5})")
+WON_PAT = re.compile(r"([0-9,]+)\s*[원온O]")  # O도 포함 (OCR 오류)
+MERCHANT_EXCLUDE = re.compile(r"(영수증|매출|합계|총액|승인|결제|금액|VAT|사업자|대표|부가세|카드|현금)", re.I)
+DIGITS_PAT = re.compile(r"\d+")
+NON_DIGIT_PAT = re.compile(r"\D")
 
-def _decode_image_b64(image_b64: str) -> np.ndarray:
+# 결제수단 힌트 (앞쪽이 우선)
+PAYMENT_HINTS = (("cash", CASH_HINT), ("card", CARD_HINT), ("app_pay", APP_HINT))
+
+# 사업자번호 OCR 오인식 보정: D→3, b→8, A→4, I→1, E→3, O→0, l→1, S→5, Z→2 등
+OCR_DIGIT_TABLE = str.maketrans({
+    'O': '0', 'o': '0', 'D': '3', 'd': '3',
+    'l': '1', 'I': '1', 'i': '1', 'L': '1',
+    'S': '5', 's': '5', 'Z': '2', 'z': '2',
+    'B': '8', 'b': '8', 'A': '4', 'a': '4',
+    'E': '3', 'e': '3', 'G': '6', 'g': '6',
+    'T': '7', 't': '7',
+})
+
+@dataclass(frozen=True)
+class PreprocessConfig:
+    """
+    OCR 전처리 설정
+    - max_side: 긴 변 최대 픽셀 (0이면 리사이즈 안 함).
+      EasyOCR 검출기는 긴 변 2560(canvas_size)보다 큰 이미지만 줄이므로 2560 이상은 속도 차이가 없고,
+      검출 시간은 대략 면적에 비례해 1600 에서 2560 대비 1/3 수준 (README 의 측정표 참고).
+    - grayscale: 흑백 변환. 정확도 영향이 측정되지 않아 기본은 끔
+    - auto_crop: 밝은 영수증 영역만 잘라내기 (어두운 배경에서 촬영한 경우 효과)
+    """
+    max_side: int = 1600
+    grayscale: bool = False
+    auto_crop: bool = False
+
+    def signature(self) -> str:
+        return f"max{self.max_side}-{'L' if self.grayscale else 'RGB'}-{'crop' if self.auto_crop else 'full'}"
+
+
+PREPROCESS = PreprocessConfig(
+    max_side=int(os.getenv("OCR_MAX_SIDE", "1600")),
+    grayscale=os.getenv("OCR_GRAYSCALE", "0") == "1",
+    auto_crop=os.getenv("OCR_AUTO_CROP", "0") == "1",
+)
+
+# 2차 부분 재인식 설정
+# - OCR_REFINE: 1이면 못 찾았거나 신뢰도가 낮은 필드(사업자번호/금액/거래일자)의 줄만 잘라 다시 인식
+# - OCR_REFINE_CONF: 이 값 미만의 신뢰도는 낮은 것으로 보고 재인식
+# - OCR_REFINE_MAX_REGIONS: 이미지 한 장에서 재인식할 최대 영역 수
+OCR_REFINE = os.getenv("OCR_REFINE", "1") == "1"
+OCR_REFINE_CONF = float(os.getenv("OCR_REFINE_CONF", "0.6"))
+OCR_REFINE_MAX_REGIONS = int(os.getenv("OCR_REFINE_MAX_REGIONS", "6"))
+
+
+def _decode_image_b64(image_b64: str, config: Optional[PreprocessConfig] = None) -> np.ndarray:
     img_bytes = base64.b64decode(image_b64)
-    img = Image.open(io.BytesIO(img_bytes)).convert("RGB")
-    return np.array(img)
+    return _decode_image_bytes(img_bytes, config)
+
+
+def _decode_image_bytes(img_bytes: bytes, config: Optional[PreprocessConfig] = None) -> np.ndarray:
+    return _decode_image_file(io.BytesIO(img_bytes), config)
+
+
+def _decode_image_file(fp: Union[str, BinaryIO], config: Optional[PreprocessConfig] = None) -> np.ndarray:
+    """파일 경로/파일 객체에서 바로 디코딩 (원본 바이트 사본을 만들지 않음)"""
+    with span("ocr.decode"), Image.open(fp) as img:
+        return np.array(_preprocess(img, config or PREPROCESS))
+
+
+def _preprocess(img: Image.Image, config: PreprocessConfig) -> Image.Image:
+    """EXIF 회전 보정 → (선택) 흑백 → (선택) 영수증 영역 crop → 긴 변 리사이즈"""
+    mode = "L" if config.grayscale else "RGB"
+    if config.max_side and not config.auto_crop and max(img.size) > config.max_side:
+        # JPEG 은 디코딩 단계에서 1/2, 1/4, 1/8 로 축소 (12MP 전체 디코딩 회피)
+        scale = config.max_side / max(img.size)
+        img.draft(mode, (round(img.width * scale), round(img.height * scale)))
+    img = ImageOps.exif_transpose(img)
+    img = img.convert(mode)
+    if config.auto_crop:
+        img = _crop_receipt_region(img)
+    if config.max_side and max(img.size) > config.max_side:
+        scale = config.max_side / max(img.size)
+        new_size = (max(1, round(img.width * scale)), max(1, round(img.height * scale)))
+        img = img.resize(new_size, Image.BILINEAR)
+    return img
+
+
+def _crop_receipt_region(img: Image.Image, margin: float = 0.02) -> Image.Image:
+    """
+    밝은 종이 영역의 행/열 투영으로 영수증 bounding box 를 찾습니다.
+    찾은 영역이 너무 작거나(20% 미만) 거의 전체(95% 이상)면 원본을 그대로 반환합니다.
+    """
+    gray = img if img.mode == "L" else img.convert("L")
+    # 투영 계산은 축소본에서 수행
+    small = gray.copy()
+    small.thumbnail((512, 512))
+    arr = np.asarray(small, dtype=np.uint8)
+    threshold = max(int(arr.mean()), 128)
+    bright = arr > threshold
+    rows = np.flatnonzero(bright.mean(axis=1) > 0.3)
+    cols = np.flatnonzero(bright.mean(axis=0) > 0.3)
+    if rows.size == 0 or cols.size == 0:
+        return img
+    sx, sy = img.width / small.width, img.height / small.height
+    left, right = cols[0] * sx, (cols[-1] + 1) * sx
+    top, bottom = rows[0] * sy, (rows[-1] + 1) * sy
+    area = (right - left) * (bottom - top) / (img.width * img.height)
+    if area < 0.2 or area > 0.95:
+        return img
+    mx, my = img.width * margin, img.height * margin
+    box = (
+        max(0, int(left - mx)),
+        max(0, int(top - my)),
+        min(img.width, int(right + mx)),
+        min(img.height, int(bottom + my)),
+    )
+    return img.crop(box)
 
 
 def _ocr_lines(img_np: np.ndarray) -> List[Dict[str, Any]]:
     """
     Returns: [{"text": str, "conf": float, "bbox": [[x,y]...]}]
     """
-    results = reader.readtext(img_np, detail=1)
+    reader = get_reader()
+    with span("ocr.recognize"):
+        results = reader.readtext(img_np, detail=1)
     lines = []
     for bbox, text, conf in results:
         t = (text or "").strip()
         if not t:
             continue
-        lines.append({"text": t, "conf": float(conf), "bbox": bbox})
+        # bbox 는 캐시/프로세스 간 전달을 위해 순수 int 좌표로 변환
+        lines.append({"text": t, "conf": float(conf), "bbox": [[int(x), int(y)] for x, y in bbox]})
     return lines
 
 
+# 재인식 대상 필드별 키워드 (키워드 뒤부터가 값 영역)
+REFINE_KEYWORDS = {
+    "business_reg_no": re.compile(r"사업자\s*(?:등록)?\s*번호|사업자|등록번호"),
+    "amount": re.compile(r"합\s*계|총\s*액|결제\s*금액|결제\s*요금|승인\s*금액|거래\s*금액|미터\s*요금|[총층]\s*운임"),
+    "trade_date": re.compile(r"거래\s*일시|거래\s*일자|일시|일자|날짜"),
+}
+# 값 영역 재인식 시 허용 문자 (숫자 + 구분 기호)
+DIGIT_ALLOWLIST = "0123456789-,.:/"
+# 숫자로 읽혀야 할 자리의 문자 (OCR 이 숫자를 O/l/I 등으로 읽은 경우 포함)
+DIGITISH_PAT = re.compile(r"[0-9OolIDSBZ]")
+CONFUSED_DIGIT_PAT = re.compile(r"\d[OolIDSBZg]|[OolIDSBZg]\d")
+NUMERIC_LINE_PAT = re.compile(r"^[\s0-9OolIDSBZ\-,.:/()원온]+$")
+YEAR_PAT = re.compile(r"20\d{2}")
+# 재인식 때 글자 높이를 이 픽셀 이상으로 키움 (EasyOCR 인식기 입력 높이 64)
+REFINE_MIN_HEIGHT = 64
+REFINE_MAX_SCALE = 4.0
+
+
+def _box(bbox: List[List[int]]) -> Tuple[int, int, int, int]:
+    xs = [p[0] for p in bbox]
+    ys = [p[1] for p in bbox]
+    return min(xs), max(xs), min(ys), max(ys)
+
+
+def _value_start(text: str, field: str) -> int:
+    """줄에서 값이 시작하는 글자 위치 (키워드 뒤 첫 숫자). 숫자만 있는 줄이면 0, 값이 없으면 -1."""
+    if NUMERIC_LINE_PAT.match(text):
+        return 0
+    km = REFINE_KEYWORDS[field].search(text)
+    if km:
+        dm = DIGITISH_PAT.search(text, km.end())
+        return dm.start() if dm else -1
+    if field == "trade_date":
+        ym = YEAR_PAT.search(text)
+        return ym.start() if ym else -1
+    return -1
+
+
+def _refine_targets(lines: List[Dict[str, Any]], parsed: Dict[str, Any]) -> List[Tuple[int, int, str]]:
+    """
+    재인식할 (줄 번호, 값 시작 위치, 필드) 목록. 필드의 키워드 줄과 그 다음 숫자 줄 중
+    필드를 못 찾았거나, 줄 신뢰도가 낮거나, 값 부분에 숫자와 섞인 오인식 문자(3Z,OOO 등)가 있는 줄.
+    """
+    targets: Dict[int, Tuple[int, str]] = {}
+    for field, keyword in REFINE_KEYWORDS.items():
+        found = bool(parsed.get(field))
+        for i, ln in enumerate(lines):
+            if not (keyword.search(ln["text"]) or (field == "trade_date" and YEAR_PAT.search(ln["text"]))):
+                continue
+            for j in (i, i + 1):
+                if j >= len(lines) or j in targets:
+                    continue
+                text = lines[j]["text"]
+                start = _value_start(text, field)
+                if start < 0 or (j != i and start != 0):
+                    continue
+                if not found or lines[j]["conf"] < OCR_REFINE_CONF or CONFUSED_DIGIT_PAT.search(text, start):
+                    targets[j] = (start, field)
+    ordered = sorted(targets.items(), key=lambda t: lines[t[0]]["conf"])[:OCR_REFINE_MAX_REGIONS]
+    return [(idx, start, field) for idx, (start, field) in ordered]
+
+
+def _value_crop(img: Image.Image, ln: Dict[str, Any], start: int) -> Optional[Image.Image]:
+    # 글자 폭(한글 2, 나머지 1) 비례로 값이 시작하는 x 좌표를 추정해 값 부분만 자른다
+    x0, x1, y0, y1 = _box(ln["bbox"])
+    text = ln["text"]
+    if start > 0:
+        widths = [2 if "가" <= c <= "힣" else 1 for c in text]
+        x0 = int(x0 + (x1 - x0) * sum(widths[:start]) / sum(widths) - (y1 - y0) * 0.3)
+    pad = max(2, (y1 - y0) // 6)
+    box = (max(0, x0 - pad), max(0, y0 - pad), min(img.width, x1 + pad), min(img.height, y1 + pad))
+    if box[2] - box[0] < 4 or box[3] - box[1] < 4:
+        return None
+    crop = img.crop(box)
+    scale = min(REFINE_MAX_SCALE, max(2.0, REFINE_MIN_HEIGHT / crop.height))
+    return crop.resize((round(crop.width * scale), round(crop.height * scale)), Image.LANCZOS)
+
+
+def _refine_lines(img_np: np.ndarray, lines: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """
+    2차 부분 재인식: 사업자번호/금액/거래일자를 못 찾았거나 신뢰도가 낮으면
+    해당 키워드 줄의 값 부분(또는 다음 숫자 줄)만 bbox 로 잘라 확대한 뒤 검출 없이 인식만 다시 합니다.
+    값 부분은 숫자/구분 기호만 허용해 O→0, l→1 같은 오인식을 줄입니다.
+    바꾼 줄로도 필드가 읽힐 때만 받아들입니다. 못 찾던 필드는 읽히기만 하면, 이미 찾은 필드는
+    재인식 신뢰도가 원래보다 높고 숫자 자릿수가 같을 때 그 줄의 값 부분을 바꾸고 "refined": True 로 표시합니다.
+    """
+    parsed = _extract_fields(lines)
+    targets = _refine_targets(lines, parsed)
+    if not targets:
+        return lines
+    reader = get_reader()
+    img = Image.fromarray(img_np)
+    refined = list(lines)
+    with span("ocr.refine"):
+        for idx, start, field in targets:
+            ln = lines[idx]
+            crop = _value_crop(img, ln, start)
+            if crop is None:
+                continue
+            results = reader.recognize(
+                np.array(crop),
+                horizontal_list=[[0, crop.width, 0, crop.height]],
+                free_list=[],
+                allowlist=DIGIT_ALLOWLIST,
+                detail=1,
+            )
+            if not results:
+                continue
+            _, text, conf = results[0]
+            text = (text or "").strip()
+            if not text:
+                continue
+            candidate = refined[:idx] + [{**ln, "text": ln["text"][:start] + text, "conf": float(conf), "refined": True}] + refined[idx + 1:]
+            reparsed = _extract_fields(candidate)
+            if not reparsed.get(field):
+                # 재인식 결과로는 필드를 읽을 수 없으면 신뢰도가 높아도 버림
+                continue
+            if parsed.get(field):
+                # 이미 읽은 필드는 신뢰도가 더 높고 자릿수가 같을 때만 교체 (32,000 → 3,000 처럼 자리가 빠진 결과 방지)
+                if float(conf) <= ln["conf"] or len(NON_DIGIT_PAT.sub("", str(reparsed[field]))) != len(NON_DIGIT_PAT.sub("", str(parsed[field]))):
+                    continue
+            refined, parsed = candidate, reparsed
+    return refined
+
+
 def _pick_best_by_keyword(lines: List[Dict[str, Any]], keyword_regex: re.Pattern, value_regex: re.Pattern) -> Tuple[Optional[str], float]:
     """
     Find lines containing keyword and extract value using value_regex; return best by conf.
@@ -58,211 +344,144 @@ def _pick_best_by_keyword(lines: List[Dict[str, Any]], keyword_regex: re.Pattern
 
 
 def _extract_fields(lines: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    OCR 라인에서 영수증 필드를 추출합니다.
+    여러 줄에 걸칠 수 있는 패턴(사업자번호 1단계, 합계 금액)만 전체 텍스트에서 찾고,
+    나머지는 라인을 한 번만 순회하며 모든 필드 후보를 모은 뒤 우선순위대로 확정합니다.
+    """
+    n = len(lines)
     text_all = "\n".join([l["text"] for l in lines])
 
     warnings: List[str] = []
     confidence: Dict[str, float] = {}
 
-    # 사업자번호
+    # 사업자번호 1단계: 정규식으로 정확한 XXX-XX-XXXXX 찾기
     biz = None
     biz_conf = 0.0
-    
-    # 1단계: 정규식으로 정확한 XXX-XX-XXXXX 찾기
+    biz_token = None
     m = BIZNO_PAT.search(text_all)
     if m:
         biz = f"{m.group(1)}-{m.group(2)}-{m.group(3)}"
-        for ln in lines:
-            if m.group(0).replace(" ", "") in ln["text"].replace(" ", ""):
-                biz_conf = max(biz_conf, ln["conf"])
-    
-    # 2단계: "사업자번호" 키워드 다음 라인 확인 (OCR 오류 수정 포함)
-    if not biz:
-        for i, ln in enumerate(lines[:-1]):
-            if "사업자" in ln["text"] and "번호" in ln["text"]:
-                next_ln = lines[i + 1]
-                next_text = next_ln["text"]
-                
-                # 숫자 추출
-                numbers = re.findall(r"\d+", next_text)
-                
-                # 10자리 이상의 연속 숫자가 있으면 우선 사용
-                if numbers and len(numbers[0]) >= 10:
-                    num_str = numbers[0]
-                    biz = f"{num_str[:3]}-{num_str[3:5]}-{num_str[5:10]}"
-                    biz_conf = next_ln["conf"]
-                else:
-                    # OCR 오류: 숫자처럼 보이지만 문자인 경우 변환
-                    # D→3, b→6, A→4, I→1, E→3, O→0, l→1, S→5, Z→2 등
-                    ocr_to_num = {
-                        'O': '0', 'o': '0', 'D': '3', 'd': '3',
-                        'l': '1', 'I': '1', 'i': '1', 'L': '1',
-                        'S': '5', 's': '5', 'Z': '2', 'z': '2',
-                        'B': '8', 'b': '8', 'A': '4', 'a': '4',
-                        'E': '3', 'e': '3', 'G': '6', 'g': '6',
-                        'T': '7', 't': '7',
-                    }
-                    
-                    # 문자를 숫자로 변환 시도
-                    converted = next_text
-                    for char, digit in ocr_to_num.items():
-                        converted = converted.replace(char, digit)
-                    
-                    # 숫자만 추출
-                    num_only = re.sub(r"\D", "", converted)
-                    
-                    if len(num_only) >= 10:
-                        biz = f"{num_only[:3]}-{num_only[3:5]}-{num_only[5:10]}"
-                        biz_conf = next_ln["conf"]
-                    elif len(num_only) >= 8:
-                        biz = num_only
-                        biz_conf = next_ln["conf"]
-                break
-    
-    # 3단계: 영수증 전체에서 정확한 사업자번호 형식 찾기
+        biz_token = m.group(0).replace(" ", "")
+    biz_keyword_idx = None
+
+    # 결제금액 1단계: 전체 텍스트에서 합계/총액 키워드 매칭 (줄바꿈 너머 숫자 포함)
+    amount = None
+    amt_conf = 0.0
+    mm = AMOUNT_PAT.search(text_all)
+    if mm:
+        val = mm.group(2).replace(",", "")
+        if val:
+            amount = int(val)
+            amt_conf = 0.8  # 전체 텍스트 매칭 신뢰도
+    amount_by_line = amount is None
+
+    trade_date = None
+    date_conf = 0.0
+    won_candidates: List[Tuple[int, float]] = []
+    merchant_name = None
+    m_conf = 0.0
+    tel = None
+    tel_conf = 0.0
+
+    for i, ln in enumerate(lines):
+        t = ln["text"]
+        conf = ln["conf"]
+
+        # 사업자번호: 1단계 매칭값이 포함된 라인의 최대 신뢰도 / 2단계용 키워드 라인 위치
+        if biz_token is not None:
+            if biz_token in t.replace(" ", ""):
+                biz_conf = max(biz_conf, conf)
+        elif biz_keyword_idx is None and i < n - 1 and "사업자" in t and "번호" in t:
+            biz_keyword_idx = i
+
+        # 거래일자: 가장 conf 높은 날짜
+        dm = DATE_PAT.search(t)
+        if dm and conf > date_conf:
+            trade_date = f"{dm.group(1)}-{int(dm.group(2)):02d}-{int(dm.group(3)):02d}"
+            date_conf = conf
+
+        # 결제금액 2단계: 줄별(공백 제거) 키워드 매칭
+        if amount_by_line:
+            am = AMOUNT_PAT.search(t.replace(" ", ""))
+            if am:
+                val = am.group(2).replace(",", "")
+                if val and conf > amt_conf:
+                    amount, amt_conf = int(val), conf
+
+        # 결제금액 3단계 후보: "원"/"온"/"O" 앞의 1000 초과 금액 (택시 등)
+        for wm in WON_PAT.finditer(t):
+            val = wm.group(1).replace(",", "")
+            if val:
+                num = int(val)
+                if num > 1000:
+                    won_candidates.append((num, conf))
+
+        # 가맹점명: 상단 12줄 중 영수증/합계/승인 같은 키워드가 없는 첫 줄
+        if merchant_name is None and i < 12 and not MERCHANT_EXCLUDE.search(t) and len(t) >= 2:
+            merchant_name = t
+            m_conf = conf
+
+        # 전화번호: 마지막으로 매칭된 값, 신뢰도는 최대값
+        tm = TEL_PAT.search(t)
+        if tm:
+            tel = tm.group(0).replace(" ", "-")
+            tel_conf = max(tel_conf, conf)
+
+    # 사업자번호 2~4단계 (1단계 실패 시에만)
+    if not biz and biz_keyword_idx is not None:
+        biz, biz_conf = _biz_from_next_line(lines[biz_keyword_idx + 1])
     if not biz:
-        loose_pattern = re.compile(r"(\d{3})[- ](\d{2})[- ](\d{5})")
         for ln in lines:
-            mm = loose_pattern.search(ln["text"])
+            mm = BIZNO_LOOSE_PAT.search(ln["text"])
             if mm:
                 biz = f"{mm.group(1)}-{mm.group(2)}-{mm.group(3)}"
                 biz_conf = ln["conf"]
                 break
-    
-    # 4단계: 숫자만 연속된 10자리 이상 찾기 (마지막 수단)
     if not biz:
         for ln in lines:
-            num_only = re.sub(r"\D", "", ln["text"])
+            num_only = NON_DIGIT_PAT.sub("", ln["text"])
             if len(num_only) >= 10:
                 biz = f"{num_only[:3]}-{num_only[3:5]}-{num_only[5:10]}"
                 biz_conf = ln["conf"]
                 break
-    
     if not biz:
         warnings.append("사업자번호를 찾지 못했습니다.")
     confidence["business_reg_no"] = round(biz_conf, 3)
 
-    # 거래일자
-    trade_date = None
-    date_conf = 0.0
-    # 여러 줄에서 가장 conf 높은 날짜 선택
-    for ln in lines:
-        mm = DATE_PAT.search(ln["text"])
-        if not mm:
-            continue
-        y, mo, d = mm.group(1), int(mm.group(2)), int(mm.group(3))
-        cand = f"{y}-{mo:02d}-{d:02d}"
-        if ln["conf"] > date_conf:
-            trade_date, date_conf = cand, ln["conf"]
     if not trade_date:
         warnings.append("거래일자를 찾지 못했습니다.")
     confidence["trade_date"] = round(date_conf, 3)
 
-    # 결제금액(합계/총액 우선) - 여러 줄 처리
-    amount = None
-    amt_conf = 0.0
-    
-    # 먼저 전체 텍스트에서 매칭 시도
-    mm = AMOUNT_PAT.search(text_all)
-    if mm:
-        val = mm.group(2).replace(",", "")
-        try:
-            amount = int(val)
-            amt_conf = 0.8  # 전체 텍스트 매칭 신뢰도
-        except ValueError:
-            pass
-    
-    # 실패하면 각 줄별로 시도
-    if amount is None:
-        for ln in lines:
-            mm = AMOUNT_PAT.search(ln["text"].replace(" ", ""))
-            if not mm:
-                continue
-            val = mm.group(2).replace(",", "")
-            try:
-                cand = int(val)
-            except ValueError:
-                continue
-            if ln["conf"] > amt_conf:
-                amount, amt_conf = cand, ln["conf"]
-    
-    # 여전히 못 찾으면 "원" 또는 "온" 또는 "O" 앞의 큰 숫자 찾기 (택시 등)
-    # O(영문)와 0(숫자)을 모두 처리, 더 큰 금액 우선
     if amount is None:
-        amount_pattern = re.compile(r"([0-9,]+)\s*[원온O]")  # O도 추가 (OCR 오류)
-        candidates = []
-        for ln in lines:
-            for match in amount_pattern.finditer(ln["text"]):
-                val = match.group(1).replace(",", "")
-                try:
-                    num = int(val)
-                    if num > 1000:  # 1000원 이상만
-                        candidates.append((num, ln["conf"]))
-                except ValueError:
-                    pass
-        
-        if candidates:
-            # 가장 큰 금액 우선 (신뢰도 동일시 가장 큰 금액)
-            amount, amt_conf = max(candidates, key=lambda x: (x[1], x[0]))
+        if won_candidates:
+            # 신뢰도 우선, 동일하면 가장 큰 금액
+            amount, amt_conf = max(won_candidates, key=lambda x: (x[1], x[0]))
     else:
-        # 이미 찾았어도, 더 큰 금액이 있는지 확인 (정확도 개선)
-        amount_pattern = re.compile(r"([0-9,]+)\s*[원온O]")
-        for ln in lines:
-            for match in amount_pattern.finditer(ln["text"]):
-                val = match.group(1).replace(",", "")
-                try:
-                    num = int(val)
-                    # 현재값의 2배 이상 큰 금액 발견시 교체
-                    if num > amount * 1.5 and num > 1000:
-                        amount, amt_conf = num, ln["conf"]
-                except ValueError:
-                    pass
-    
+        # 이미 찾았어도 1.5배 넘게 큰 금액이 있으면 교체 (정확도 개선)
+        for num, conf in won_candidates:
+            if num > amount * 1.5:
+                amount, amt_conf = num, conf
     if amount is None:
         warnings.append("결제금액(합계/총액)을 찾지 못했습니다.")
     confidence["amount"] = round(amt_conf, 3)
 
-    # 결제수단(룰 기반)
+    # 결제수단(룰 기반) - 현금 > 카드 > 앱결제 순으로 우선
     payment_method = "unknown"
     pm_conf = 0.0
-    if APP_HINT.search(text_all):
-        payment_method = "app_pay"
-        pm_conf = 0.7
-    if CARD_HINT.search(text_all):
-        payment_method = "card"
-        pm_conf = max(pm_conf, 0.7)
-    if CASH_HINT.search(text_all):
-        payment_method = "cash"
-        pm_conf = max(pm_conf, 0.7)
+    for method, hint in PAYMENT_HINTS:
+        if hint.search(text_all):
+            payment_method = method
+            pm_conf = 0.7
+            break
     confidence["payment_method"] = round(pm_conf, 3)
     if payment_method == "unknown":
         warnings.append("결제수단을 확정하지 못했습니다(카드/현금/앱결제).")
 
-    # 가맹점 정보(매우 러프한 MVP: 상단 10줄 중 '영수증/합계/승인' 같은 키워드 제외)
-    merchant_name = None
-    m_conf = 0.0
-    exclude = re.compile(r"(영수증|매출|합계|총액|승인|결제|금액|VAT|사업자|대표|부가세|카드|현금)", re.I)
-    for ln in lines[:12]:
-        t = ln["text"]
-        if exclude.search(t):
-            continue
-        if len(t) < 2:
-            continue
-        merchant_name = t
-        m_conf = ln["conf"]
-        break
     if not merchant_name:
         warnings.append("가맹점명을 확정하지 못했습니다.")
     confidence["merchant_name"] = round(m_conf, 3)
 
-    # 전화번호(있으면)
-    tel = None
-    tel_conf = 0.0
-    for ln in lines:
-        mm = TEL_PAT.search(ln["text"])
-        if not mm:
-            continue
-        tel = mm.group(0).replace(" ", "-")
-        tel_conf = max(tel_conf, ln["conf"])
     confidence["merchant_tel"] = round(tel_conf, 3)
 
     return {
@@ -277,4 +496,20 @@ def _extract_fields(lines: List[Dict[str, Any]]) -> Dict[str, Any]:
         "business_reg_no": biz,
         "confidence": confidence,
         "warnings": warnings,
-    }
\ No newline at end of file
+    }
+
+
+def _biz_from_next_line(ln: Dict[str, Any]) -> Tuple[Optional[str], float]:
+    """"사업자번호" 키워드 다음 라인에서 번호 추출 (OCR 오인식 문자 보정 포함)"""
+    text = ln["text"]
+    m = DIGITS_PAT.search(text)
+    # 첫 연속 숫자가 10자리 이상이면 우선 사용
+    if m and len(m.group(0)) >= 10:
+        num_str = m.group(0)
+        return f"{num_str[:3]}-{num_str[3:5]}-{num_str[5:10]}", ln["conf"]
+    num_only = NON_DIGIT_PAT.sub("", text.translate(OCR_DIGIT_TABLE))
+    if len(num_only) >= 10:
+        return f"{num_only[:3]}-{num_only[3:5]}-{num_only[5:10]}", ln["conf"]
+    if len(num_only) >= 8:
+        return num_only, ln["conf"]
+    return None, 0.0
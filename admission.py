@@ -0,0 +1,207 @@
+import asyncio
+import contextvars
+import functools
+import inspect
+import math
+import os
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Callable, Deque, Dict, Optional, Tuple
+
+from fastmcp.exceptions import ToolError
+
+import telemetry
+from ocr_pool import OCR_QUEUE_DEPTH, OCR_WORKERS
+
+# 도구 동시 실행 제한 (lane 별, 환경변수로 조정)
+# - ADMISSION_<LANE>_CONCURRENCY: 동시에 실행할 수 있는 작업 단위 수 (OCR 은 이미지 장 수, 0이면 제한 없음)
+# - ADMISSION_<LANE>_QUEUE: 자리가 날 때까지 기다릴 수 있는 요청 수 (넘으면 바로 busy 응답)
+# - ADMISSION_<LANE>_TIMEOUT: 대기열에서 기다리는 최대 시간(초, 넘으면 busy 응답, 0이면 무제한)
+# lane 마다 자리를 따로 두므로 OCR 요청이 몰려도 검색/가벼운 도구는 OCR 뒤에 줄 서지 않습니다.
+ADMISSION_DEFAULTS = {
+    # 영수증 추출 (요청마다 이미지 사본 여러 벌 + OCR 워커)
+    "ocr": (max(OCR_WORKERS, 1) * 2, OCR_QUEUE_DEPTH, 30.0),
+    # 내규 검색 (전용 스레드에서 실행해 이벤트 루프와 OCR 스레드를 막지 않음)
+    "search": (4, 32, 10.0),
+    # 지출결의서 일괄 생성 (파일 쓰기)
+    "reports": (1, 4, 60.0),
+}
+
+__all__ = ["Busy", "Lane", "lanes", "limit", "stats"]
+
+
+class Busy(ToolError):
+    """대기열이 가득 찼거나 대기 시간이 지나 요청을 받지 않음 (retry_after 초 후 재시도)"""
+
+    def __init__(self, lane: str, retry_after: int):
+        self.lane = lane
+        self.retry_after = retry_after
+        super().__init__(f"서버가 바쁩니다 ({lane}). {retry_after}초 후 다시 시도하세요. retry_after={retry_after}")
+
+
+class Lane:
+    """
+    가중치 세마포어 + 크기 제한 대기열 (FIFO).
+    자리가 없으면 queue 개까지만 기다리고, 그 이상이거나 timeout 이 지나면 Busy 를 던집니다.
+    동기 함수는 lane 전용 스레드 풀에서 실행합니다.
+    """
+
+    def __init__(self, name: str, concurrency: int, queue: int, timeout: float):
+        self.name = name
+        self.concurrency = concurrency
+        self.queue = queue
+        self.timeout = timeout
+        self.in_use = 0
+        self.admitted = 0
+        self.rejected = 0
+        self.timed_out = 0
+        # 작업 단위 1개를 처리하는 데 걸린 평균 시간 (retry_after 추정용 지수 이동 평균)
+        self.avg_seconds = 1.0
+        self._waiters: Deque[Tuple[int, asyncio.Future]] = deque()
+        self._executor: Optional[ThreadPoolExecutor] = None
+
+    @property
+    def executor(self) -> ThreadPoolExecutor:
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(
+                max_workers=self.concurrency or None, thread_name_prefix=f"admission-{self.name}"
+            )
+        return self._executor
+
+    def retry_after(self, weight: int = 1) -> int:
+        queued = sum(w for w, _ in self._waiters)
+        return max(1, math.ceil(self.avg_seconds * (queued + weight) / max(self.concurrency, 1)))
+
+    def _wake(self) -> None:
+        while self._waiters:
+            weight, fut = self._waiters[0]
+            if fut.done():
+                self._waiters.popleft()
+                continue
+            if self.in_use + weight > self.concurrency:
+                break
+            self._waiters.popleft()
+            self.in_use += weight
+            fut.set_result(None)
+
+    async def acquire(self, weight: int = 1) -> int:
+        """자리를 얻으면 실제로 잡은 가중치를 반환합니다 (제한 없는 lane 은 0)."""
+        if self.concurrency <= 0:
+            return 0
+        weight = min(max(weight, 1), self.concurrency)
+        if not self._waiters and self.in_use + weight <= self.concurrency:
+            self.in_use += weight
+            self.admitted += 1
+            return weight
+        if len(self._waiters) >= self.queue:
+            self.rejected += 1
+            raise Busy(self.name, self.retry_after(weight))
+
+        fut = asyncio.get_running_loop().create_future()
+        entry = (weight, fut)
+        self._waiters.append(entry)
+        try:
+            await asyncio.wait_for(asyncio.shield(fut), self.timeout or None)
+        except BaseException as e:
+            if fut.done() and not fut.cancelled():
+                # 깨어난 직후 취소/만료된 경우 받은 자리를 돌려준다
+                self.release(weight)
+            else:
+                fut.cancel()
+                try:
+                    self._waiters.remove(entry)
+                except ValueError:
+                    pass
+                # 앞에서 막고 있던 큰 요청이 빠졌으면 뒤 요청이 들어갈 수 있다
+                self._wake()
+            if isinstance(e, asyncio.TimeoutError):
+                self.timed_out += 1
+                raise Busy(self.name, self.retry_after(weight)) from None
+            raise
+        self.admitted += 1
+        return weight
+
+    def release(self, weight: int) -> None:
+        if weight:
+            self.in_use -= weight
+            self._wake()
+
+    @asynccontextmanager
+    async def admit(self, weight: int = 1) -> AsyncIterator[None]:
+        waited = time.perf_counter()
+        held = await self.acquire(weight)
+        telemetry.record(f"admission.{self.name}.wait", time.perf_counter() - waited)
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            if held:
+                per_unit = (time.perf_counter() - started) / held
+                self.avg_seconds = 0.8 * self.avg_seconds + 0.2 * per_unit
+            self.release(held)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "concurrency": self.concurrency,
+            "queue": self.queue,
+            "timeout_seconds": self.timeout,
+            "in_use": self.in_use,
+            "queued": len(self._waiters),
+            "admitted": self.admitted,
+            "rejected": self.rejected,
+            "timed_out": self.timed_out,
+        }
+
+
+def _lane_from_env(name: str, concurrency: int, queue: int, timeout: float) -> Lane:
+    prefix = f"ADMISSION_{name.upper()}_"
+    return Lane(
+        name,
+        int(os.getenv(prefix + "CONCURRENCY", str(concurrency))),
+        int(os.getenv(prefix + "QUEUE", str(queue))),
+        float(os.getenv(prefix + "TIMEOUT", str(timeout))),
+    )
+
+
+lanes: Dict[str, Lane] = {name: _lane_from_env(name, *defaults) for name, defaults in ADMISSION_DEFAULTS.items()}
+
+
+def limit(lane_name: str, weight: Optional[Callable[[Dict[str, Any]], int]] = None) -> Callable:
+    """
+    도구/엔드포인트를 lane 의 동시 실행 제한 아래에서 실행하는 데코레이터.
+    weight 는 호출 인자(dict)로 작업 단위 수를 계산합니다 (예: 배치 이미지 장 수).
+    동기 함수는 async 함수가 되어 lane 전용 스레드에서 실행됩니다.
+    """
+    lane = lanes[lane_name]
+
+    def decorator(fn: Callable) -> Callable:
+        signature = inspect.signature(fn)
+
+        def _weight(args: tuple, kwargs: dict) -> int:
+            if weight is None:
+                return 1
+            bound = signature.bind(*args, **kwargs)
+            bound.apply_defaults()
+            return weight(bound.arguments)
+
+        if inspect.iscoroutinefunction(fn):
+            @functools.wraps(fn)
+            async def async_wrapper(*args, **kwargs):
+                async with lane.admit(_weight(args, kwargs)):
+                    return await fn(*args, **kwargs)
+            return async_wrapper
+
+        @functools.wraps(fn)
+        async def wrapper(*args, **kwargs):
+            async with lane.admit(_weight(args, kwargs)):
+                call = functools.partial(contextvars.copy_context().run, fn, *args, **kwargs)
+                return await asyncio.get_running_loop().run_in_executor(lane.executor, call)
+        return wrapper
+
+    return decorator
+
+
+def stats() -> Dict[str, Any]:
+    return {name: lane.stats() for name, lane in lanes.items()}
@@ -0,0 +1,104 @@
+"""
+청킹 전략별 검색 적중률 / 반환 토큰 비교
+
+policies/ 의 PDF 를 전략별로 청킹해 임시(in-memory) Chroma 컬렉션에 넣고,
+benchmarks/policy_questions.json 의 질문마다 top_k 검색 결과에 정답 문구가 들어 있는지 확인합니다.
+정답 비교와 반환량 측정은 공백을 제거한 텍스트 기준입니다.
+토큰 수는 UTF-8 바이트 / 4 로 추정한 근사값입니다.
+
+사용법:
+    python -m benchmarks.chunking_eval [--top-k 3,5] [--configs fixed:500,structure:500:100,structure:300:60]
+"""
+import argparse
+import json
+import os
+import re
+from typing import Any, Dict, List
+
+import chromadb
+
+from pdf_chunking import ChunkingConfig, extract_chunks
+
+QUESTIONS_PATH = os.path.join(os.path.dirname(__file__), "policy_questions.json")
+WHITESPACE_PAT = re.compile(r"\s+")
+
+
+def _compact(text: str) -> str:
+    return WHITESPACE_PAT.sub("", text)
+
+
+def _approx_tokens(text: str) -> float:
+    return len(text.encode("utf-8")) / 4
+
+
+def parse_config(spec: str) -> ChunkingConfig:
+    """"fixed:500" 또는 "structure:500:100" 형식"""
+    parts = spec.split(":")
+    if parts[0] == "fixed":
+        return ChunkingConfig(strategy="fixed", chunk_size=int(parts[1]), chunk_overlap=0)
+    return ChunkingConfig(strategy=parts[0], chunk_size=int(parts[1]), chunk_overlap=int(parts[2]) if len(parts) > 2 else 0)
+
+
+def evaluate(config: ChunkingConfig, pdf_directory: str, questions: List[Dict[str, Any]], top_ks: List[int]) -> List[Dict[str, Any]]:
+    client = chromadb.EphemeralClient()
+    name = "eval_" + re.sub(r"[^a-zA-Z0-9]", "_", config.signature())
+    try:
+        client.delete_collection(name)
+    except Exception:
+        pass
+    coll = client.create_collection(name)
+
+    chunks = []
+    for filename in sorted(os.listdir(pdf_directory)):
+        if filename.lower().endswith(".pdf"):
+            chunks.extend(extract_chunks(os.path.join(pdf_directory, filename), config))
+    coll.add(ids=[c[0] for c in chunks], documents=[c[1] for c in chunks], metadatas=[c[2] for c in chunks])
+
+    rows = []
+    for k in top_ks:
+        res = coll.query(query_texts=[q["question"] for q in questions], n_results=k, include=["documents"])
+        hits, chars, tokens = 0, 0, 0.0
+        for q, docs in zip(questions, res["documents"]):
+            answer = _compact(q["answer"])
+            if any(answer in _compact(doc) for doc in docs):
+                hits += 1
+            chars += sum(len(_compact(doc)) for doc in docs)
+            tokens += sum(_approx_tokens(doc) for doc in docs)
+        rows.append({
+            "config": config.signature(),
+            "chunks": len(chunks),
+            "top_k": k,
+            "hit_rate": round(hits / len(questions), 3),
+            "avg_chars": round(chars / len(questions), 1),
+            "avg_tokens": round(tokens / len(questions), 1),
+        })
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description="청킹 전략 검색 품질 비교")
+    parser.add_argument("--pdf-dir", default="./policies")
+    parser.add_argument("--questions", default=QUESTIONS_PATH)
+    parser.add_argument("--top-k", default="3,5")
+    parser.add_argument("--configs", default="fixed:500,structure:500:100,structure:300:60")
+    parser.add_argument("--json", action="store_true", help="결과를 JSON 으로 출력")
+    args = parser.parse_args()
+
+    with open(args.questions, "r", encoding="utf-8") as f:
+        questions = json.load(f)
+    top_ks = [int(k) for k in args.top_k.split(",")]
+
+    rows = []
+    for spec in args.configs.split(","):
+        rows.extend(evaluate(parse_config(spec), args.pdf_dir, questions, top_ks))
+
+    if args.json:
+        print(json.dumps(rows, ensure_ascii=False, indent=2))
+        return
+    print(f"{'config':<22}{'chunks':>8}{'top_k':>7}{'hit_rate':>10}{'avg_chars':>11}{'avg_tokens':>12}")
+    for r in rows:
+        print(f"{r['config']:<22}{r['chunks']:>8}{r['top_k']:>7}{r['hit_rate']:>10.3f}{r['avg_chars']:>11.1f}{r['avg_tokens']:>12.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,132 @@
+"""
+임베딩 설정별 encode 처리량 / 검색 적중률 비교
+
+policies/ 의 PDF 를 현재 청킹 설정(CHUNKING)으로 나눈 뒤 설정마다
+문서 encode 처리량을 재고, 임시(in-memory) Chroma 컬렉션에 넣어
+benchmarks/policy_questions.json 질문의 top_k 적중률(정답 문구 포함 여부)을 비교합니다.
+
+설정 형식: <모델>[@torch|@int8|@onnx|@onnx-int8], "default" 는 Chroma 기본 임베딩
+질의/문서 접두어는 EMBEDDING_QUERY_PREFIX / EMBEDDING_DOCUMENT_PREFIX 환경변수를 따릅니다.
+
+사용법:
+    python -m benchmarks.embedding_bench --models default,jhgan/ko-sroberta-multitask,jhgan/ko-sroberta-multitask@int8
+    python -m benchmarks.embedding_bench --models intfloat/multilingual-e5-small@onnx --batch-size 32 --threads 4
+"""
+import argparse
+import json
+import os
+import re
+import time
+from dataclasses import replace
+from typing import Any, Dict, List
+
+import chromadb
+
+from benchmarks.chunking_eval import QUESTIONS_PATH, _compact
+from embeddings import EMBEDDING, EmbeddingConfig, create_embedding_function
+from pdf_chunking import CHUNKING, extract_chunks
+
+# 설정 접미어 → (backend, quantize)
+VARIANTS = {"torch": ("torch", ""), "int8": ("torch", "int8"), "onnx": ("onnx", ""), "onnx-int8": ("onnx", "int8")}
+
+
+def parse_spec(spec: str, batch_size: int, threads: int) -> EmbeddingConfig:
+    model, _, variant = spec.partition("@")
+    if model == "default":
+        return EmbeddingConfig()
+    if variant and variant not in VARIANTS:
+        raise SystemExit(f"알 수 없는 설정: {spec} (가능: {', '.join(VARIANTS)})")
+    backend, quantize = VARIANTS[variant or "torch"]
+    return replace(EMBEDDING, model=model, backend=backend, quantize=quantize, batch_size=batch_size, threads=threads)
+
+
+def evaluate(spec: str, config: EmbeddingConfig, chunks: List[Any], questions: List[Dict[str, Any]],
+             top_ks: List[int]) -> Dict[str, Any]:
+    ef = create_embedding_function(config)
+    ids = [c[0] for c in chunks]
+    docs = [c[1] for c in chunks]
+
+    started = time.perf_counter()
+    ef(["warm-up"])  # 모델 로드
+    load_seconds = time.perf_counter() - started
+
+    started = time.perf_counter()
+    doc_vectors = ef(docs)
+    encode_seconds = time.perf_counter() - started
+
+    started = time.perf_counter()
+    query_vectors = ef.embed_query([q["question"] for q in questions])
+    query_ms = (time.perf_counter() - started) * 1000 / len(questions)
+
+    client = chromadb.EphemeralClient()
+    name = "emb_" + re.sub(r"[^a-zA-Z0-9]", "_", spec)[:50]
+    try:
+        client.delete_collection(name)
+    except Exception:
+        pass
+    # 벡터는 위에서 직접 계산해 넣으므로 컬렉션의 임베딩 함수는 쓰이지 않는다
+    coll = client.create_collection(name, embedding_function=ef)
+    max_batch = client.get_max_batch_size()
+    for start in range(0, len(ids), max_batch):
+        coll.add(
+            ids=ids[start:start + max_batch],
+            documents=docs[start:start + max_batch],
+            embeddings=doc_vectors[start:start + max_batch],
+        )
+
+    res = coll.query(query_embeddings=query_vectors, n_results=max(top_ks), include=["documents"])
+    row: Dict[str, Any] = {
+        "config": spec,
+        "dim": len(doc_vectors[0]) if doc_vectors else 0,
+        "load_s": round(load_seconds, 2),
+        "docs_per_s": round(len(docs) / encode_seconds, 1) if encode_seconds else 0.0,
+        "query_ms": round(query_ms, 2),
+    }
+    for k in top_ks:
+        hits = sum(
+            any(_compact(q["answer"]) in _compact(doc) for doc in found[:k])
+            for q, found in zip(questions, res["documents"])
+        )
+        row[f"hit@{k}"] = round(hits / len(questions), 3)
+    return row
+
+
+def main():
+    parser = argparse.ArgumentParser(description="임베딩 설정별 처리량 / 적중률 비교")
+    parser.add_argument("--models", default="default", help="쉼표 구분 설정 목록 (예: default,jhgan/ko-sroberta-multitask@int8)")
+    parser.add_argument("--pdf-dir", default="./policies")
+    parser.add_argument("--questions", default=QUESTIONS_PATH)
+    parser.add_argument("--top-k", default="3,5")
+    parser.add_argument("--batch-size", type=int, default=EMBEDDING.batch_size)
+    parser.add_argument("--threads", type=int, default=EMBEDDING.threads)
+    parser.add_argument("--json", action="store_true", help="결과를 JSON 으로 출력")
+    args = parser.parse_args()
+
+    with open(args.questions, "r", encoding="utf-8") as f:
+        questions = json.load(f)
+    top_ks = [int(k) for k in args.top_k.split(",")]
+    chunks = []
+    for filename in sorted(os.listdir(args.pdf_dir)):
+        if filename.lower().endswith(".pdf"):
+            chunks.extend(extract_chunks(os.path.join(args.pdf_dir, filename), CHUNKING))
+
+    rows = [
+        evaluate(spec, parse_spec(spec, args.batch_size, args.threads), chunks, questions, top_ks)
+        for spec in args.models.split(",")
+    ]
+
+    if args.json:
+        print(json.dumps(rows, ensure_ascii=False, indent=2))
+        return
+    print(f"chunks: {len(chunks)}, questions: {len(questions)}")
+    header = f"{'config':<44}{'dim':>5}{'load_s':>8}{'docs/s':>9}{'query_ms':>10}" + "".join(f"{'hit@' + str(k):>8}" for k in top_ks)
+    print(header)
+    for r in rows:
+        print(
+            f"{r['config']:<44}{r['dim']:>5}{r['load_s']:>8.2f}{r['docs_per_s']:>9.1f}{r['query_ms']:>10.2f}"
+            + "".join(f"{r['hit@' + str(k)]:>8.3f}" for k in top_ks)
+        )
+
+
+if __name__ == "__main__":
+    main()
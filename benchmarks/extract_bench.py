@@ -0,0 +1,155 @@
+"""
+_extract_fields 마이크로 벤치마크 + 골든 비교
+
+단일 패스 구현(Ocr_Recorder._extract_fields)과 원본 구현(benchmarks.legacy_extract)의
+출력이 JSON 직렬화 기준으로 완전히 같은지 확인한 뒤 처리량을 비교합니다.
+
+사용법:
+    python -m benchmarks.extract_bench [--samples 5000] [--repeat 5] [--from-cache ./ocr_cache.sqlite3]
+
+--from-cache 를 주면 OCR 캐시에 저장된 실제 영수증 라인도 골든 코퍼스에 포함합니다.
+"""
+import argparse
+import json
+import random
+import sqlite3
+import time
+from typing import Any, Dict, List
+
+from Ocr_Recorder import _extract_fields
+from benchmarks.legacy_extract import legacy_extract_fields
+
+MERCHANTS = ["스타벅스 강남점", "김밥천국", "(주)한솔식당", "GS25 역삼점", "서울개인택시", "CU", "A"]
+NOISE = ["영수증", "매출전표", "부가세 2,909", "대표자 홍길동", "감사합니다", "VAT", "", "-----", "합 계", "결제"]
+PAYMENTS = ["신용카드 승인", "현금영수증", "카카오페이", "체크카드", "VISA 1234", "네이버페이 간편결제", ""]
+
+
+def _biz_line(rng: random.Random) -> List[str]:
+    a, b, c = rng.randint(100, 999), rng.randint(10, 99), rng.randint(10000, 99999)
+    choice = rng.randrange(7)
+    if choice == 0:
+        return [f"사업자번호 {a}-{b}-{c}"]
+    if choice == 1:
+        return ["사업자 번호", f"{a}{b}{c}"]
+    if choice == 2:
+        # OCR 오인식 문자
+        raw = f"{a}{b}{c}"
+        noisy = raw.replace("0", "O").replace("3", "D").replace("1", "l").replace("5", "S")
+        return ["사업자등록번호", noisy]
+    if choice == 3:
+        return [f"No.{a} {b} {c}"]
+    if choice == 4:
+        return [f"TID{a}{b}{c}00"]
+    if choice == 5:
+        return ["사업자번호", f"{a}-{b}"]
+    return []
+
+
+def _amount_lines(rng: random.Random) -> List[str]:
+    amt = rng.choice([rng.randint(1, 999), rng.randint(1000, 200000)])
+    fmt = f"{amt:,}"
+    choice = rng.randrange(8)
+    if choice == 0:
+        return [f"합계 {fmt}원"]
+    if choice == 1:
+        return ["결제금액", fmt]
+    if choice == 2:
+        return [f"합 계 : {fmt} 원"]
+    if choice == 3:
+        return [f"미터 요금 {fmt}"]
+    if choice == 4:
+        return [f"{fmt}원", f"{amt * 2:,}O"]
+    if choice == 5:
+        return [f"총액 {fmt}", f"받은금액 {amt * 3:,}원"]
+    if choice == 6:
+        return [f"합계 ,,,원"]
+    return [f"{fmt}온"]
+
+
+def _date_line(rng: random.Random) -> List[str]:
+    y, m, d = rng.randint(2019, 2026), rng.randint(1, 12), rng.randint(1, 28)
+    sep = rng.choice([".", "-", "/", " "])
+    choice = rng.randrange(4)
+    if choice == 0:
+        return [f"{y}{sep}{m}{sep}{d}"]
+    if choice == 1:
+        return [f"{y}년 {m}월 {d}일 12:30"]
+    if choice == 2:
+        return [f"거래일시 {y}{sep}{m:02d}{sep}{d:02d}", f"{y}{sep}{m}{sep}{d}"]
+    return []
+
+
+def _tel_line(rng: random.Random) -> List[str]:
+    choice = rng.randrange(3)
+    if choice == 0:
+        return [f"TEL 02-{rng.randint(100, 9999)}-{rng.randint(1000, 9999)}"]
+    if choice == 1:
+        return [f"0{rng.randint(10, 99)} {rng.randint(100, 9999)} {rng.randint(1000, 9999)}"]
+    return []
+
+
+def synthetic_corpus(samples: int, seed: int = 1234) -> List[List[Dict[str, Any]]]:
+    """모든 분기(사업자번호 1~4단계, 금액 1~3단계 등)를 고루 타도록 만든 합성 라인 목록"""
+    rng = random.Random(seed)
+    corpus = []
+    for _ in range(samples):
+        parts = [[rng.choice(MERCHANTS)], _biz_line(rng), _date_line(rng), _amount_lines(rng),
+                 [rng.choice(PAYMENTS)], _tel_line(rng)]
+        rng.shuffle(parts)
+        texts = [t for part in parts for t in part]
+        texts += rng.sample(NOISE, rng.randint(0, 4))
+        if rng.random() < 0.2:
+            rng.shuffle(texts)
+        corpus.append([
+            {"text": t, "conf": round(rng.choice([rng.random(), 0.0, 0.5, 1.0]), 6), "bbox": [[0, 0], [1, 0], [1, 1], [0, 1]]}
+            for t in texts
+        ])
+    return corpus
+
+
+def cached_corpus(path: str) -> List[List[Dict[str, Any]]]:
+    conn = sqlite3.connect(path)
+    try:
+        return [json.loads(row[0]) for row in conn.execute("SELECT lines FROM ocr_lines")]
+    finally:
+        conn.close()
+
+
+def _dump(result: Dict[str, Any]) -> str:
+    return json.dumps(result, ensure_ascii=False)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="_extract_fields 벤치마크")
+    parser.add_argument("--samples", type=int, default=5000)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--from-cache", help="OCR 캐시 SQLite 경로 (실제 영수증 라인 포함)")
+    args = parser.parse_args()
+
+    corpus = synthetic_corpus(args.samples)
+    if args.from_cache:
+        corpus += cached_corpus(args.from_cache)
+
+    mismatches = 0
+    for lines in corpus:
+        if _dump(_extract_fields(lines)) != _dump(legacy_extract_fields(lines)):
+            mismatches += 1
+            if mismatches <= 3:
+                print("MISMATCH:", json.dumps([l["text"] for l in lines], ensure_ascii=False))
+    print(f"golden: {len(corpus) - mismatches}/{len(corpus)} identical")
+
+    for name, fn in (("legacy", legacy_extract_fields), ("single-pass", _extract_fields)):
+        best = float("inf")
+        for _ in range(args.repeat):
+            started = time.perf_counter()
+            for lines in corpus:
+                fn(lines)
+            best = min(best, time.perf_counter() - started)
+        print(f"{name:<12} {len(corpus) / best:>12,.0f} receipts/s  ({best * 1e6 / len(corpus):.1f} us/receipt)")
+
+    if mismatches:
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+"""
+OCR 전처리 해상도별 지연시간 / 필드 추출 정확도 비교
+
+사용법:
+    python -m benchmarks.preprocess_bench <영수증 이미지 폴더> [--truth truth.json] [--sides 0,2560,2048,1600,1280,1024] [--grayscale]
+
+truth.json 형식 (없으면 원본 해상도(0) 결과를 정답으로 사용):
+    {"receipt1.jpg": {"amount": 32000, "business_reg_no": "123-45-67890"}, ...}
+"""
+import argparse
+import json
+import os
+import statistics
+import time
+from dataclasses import replace
+from typing import Any, Dict, List
+
+from Ocr_Recorder import PREPROCESS, _decode_image_bytes, _extract_fields, _ocr_lines, get_reader
+
+IMAGE_EXTS = (".jpg", ".jpeg", ".png", ".webp", ".bmp")
+CHECK_FIELDS = ("amount", "business_reg_no")
+
+
+def _run(images: Dict[str, bytes], max_side: int, grayscale: bool, auto_crop: bool) -> Dict[str, Any]:
+    config = replace(PREPROCESS, max_side=max_side, grayscale=grayscale, auto_crop=auto_crop)
+    latencies: List[float] = []
+    fields: Dict[str, Dict[str, Any]] = {}
+    for name, img_bytes in images.items():
+        started = time.perf_counter()
+        img_np = _decode_image_bytes(img_bytes, config)
+        lines = _ocr_lines(img_np)
+        parsed = _extract_fields(lines)
+        latencies.append(time.perf_counter() - started)
+        fields[name] = {f: parsed.get(f) for f in CHECK_FIELDS}
+    return {"config": config.signature(), "latencies": latencies, "fields": fields}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="OCR 전처리 해상도 벤치마크")
+    parser.add_argument("image_dir")
+    parser.add_argument("--truth", help="파일명별 정답 필드 JSON")
+    parser.add_argument("--sides", default="0,2560,2048,1600,1280,1024", help="비교할 max_side 목록")
+    parser.add_argument("--grayscale", action="store_true", help="흑백 변환해서 측정")
+    parser.add_argument("--auto-crop", action="store_true", help="영수증 영역 자동 crop 적용")
+    args = parser.parse_args()
+
+    images = {}
+    for filename in sorted(os.listdir(args.image_dir)):
+        if filename.lower().endswith(IMAGE_EXTS):
+            with open(os.path.join(args.image_dir, filename), "rb") as f:
+                images[filename] = f.read()
+    if not images:
+        raise SystemExit(f"이미지가 없습니다: {args.image_dir}")
+
+    get_reader()  # 모델 로드 시간은 측정에서 제외
+    sides = [int(s) for s in args.sides.split(",")]
+    runs = [_run(images, side, args.grayscale, args.auto_crop) for side in sides]
+
+    if args.truth:
+        with open(args.truth, "r", encoding="utf-8") as f:
+            truth = json.load(f)
+    else:
+        # 정답이 없으면 첫 번째(가장 큰) 설정의 결과를 기준으로 비교
+        truth = runs[0]["fields"]
+
+    base_mean = statistics.mean(runs[0]["latencies"])
+    print(f"{'config':<24}{'mean(s)':>10}{'p95(s)':>10}{'speedup':>10}" + "".join(f"{f:>18}" for f in CHECK_FIELDS))
+    for run in runs:
+        lat = sorted(run["latencies"])
+        mean = statistics.mean(lat)
+        p95 = lat[min(len(lat) - 1, int(len(lat) * 0.95))]
+        hits = []
+        for field in CHECK_FIELDS:
+            expected = [n for n in images if truth.get(n, {}).get(field)]
+            ok = sum(1 for n in expected if run["fields"][n][field] == truth[n][field])
+            hits.append(f"{ok}/{len(expected)}")
+        print(f"{run['config']:<24}{mean:>10.3f}{p95:>10.3f}{base_mean / mean:>9.2f}x" + "".join(f"{h:>18}" for h in hits))
+
+
+if __name__ == "__main__":
+    main()
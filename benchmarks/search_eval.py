@@ -0,0 +1,48 @@
+"""
+검색 방식별(vector / lexical / hybrid) 적중률 비교
+
+적재된 pdf_documents 컬렉션과 BM25 키워드 인덱스를 대상으로
+benchmarks/policy_questions.json 의 질문마다 top_k 결과에 정답 문구가 들어 있는지 확인합니다.
+--filtered 를 주면 질문의 policy_id 접두어로 policy_prefix 필터를 걸어 같은 비교를 합니다.
+
+사용법:
+    python pdf_chunking.py   # 먼저 적재
+    python -m benchmarks.search_eval [--top-k 3,5] [--modes vector,lexical,hybrid] [--filtered]
+"""
+import argparse
+import json
+import time
+
+from benchmarks.chunking_eval import QUESTIONS_PATH, _compact
+from policy_search import SEARCH_MODES, search
+from query_cache import normalize_query
+
+
+def main():
+    parser = argparse.ArgumentParser(description="검색 방식별 적중률 비교")
+    parser.add_argument("--questions", default=QUESTIONS_PATH)
+    parser.add_argument("--top-k", default="3,5")
+    parser.add_argument("--modes", default=",".join(SEARCH_MODES))
+    parser.add_argument("--filtered", action="store_true", help="질문의 정책 코드 접두어로 필터링")
+    args = parser.parse_args()
+
+    with open(args.questions, "r", encoding="utf-8") as f:
+        questions = json.load(f)
+
+    print(f"{'mode':<10}{'top_k':>7}{'hit_rate':>10}{'ms/query':>10}")
+    for mode in args.modes.split(","):
+        for k in (int(x) for x in args.top_k.split(",")):
+            hits = 0
+            started = time.perf_counter()
+            for q in questions:
+                prefix = q["policy_id"].split("-")[0] if args.filtered else None
+                docs = search(normalize_query(q["question"]), k, mode, policy_prefix=prefix)
+                answer = _compact(q["answer"])
+                if any(answer in _compact(d["document"]) for d in docs):
+                    hits += 1
+            elapsed_ms = (time.perf_counter() - started) * 1000 / len(questions)
+            print(f"{mode:<10}{k:>7}{hits / len(questions):>10.3f}{elapsed_ms:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,370 @@
+"""
+오프라인 벤치마크 모음 (EasyOCR / chromadb 업그레이드 회귀 확인용)
+
+저장소 안의 픽스처만 사용하며 운영 데이터(chroma_data, OCR 캐시, 중복 색인)는 건드리지 않습니다.
+모든 단계는 임시 작업 디렉터리에서 실행합니다.
+- ocr:     로컬에서 그린 합성 영수증 이미지로 _ocr_lines 지연시간 + 필드 정확도
+- extract: 합성 OCR 라인(+ ocr 단계에서 얻은 라인)으로 _extract_fields 처리량
+- ingest:  policies/ 의 PDF 를 빈 컬렉션에 chunking_pdf 로 적재하는 속도
+- search:  benchmarks/policy_questions.json 으로 searcing_chromadb 지연시간(캐시 없이) / 적중률
+- render:  generate_cost_html 렌더링 지연시간
+
+사용법:
+    python -m benchmarks.suite --out bench.json                      # 측정 후 JSON 저장
+    python -m benchmarks.suite --compare baseline.json               # 측정 후 기준과 비교 (회귀 시 exit 1)
+    python -m benchmarks.suite --current bench.json --compare baseline.json --threshold 0.2
+    python -m benchmarks.suite --only extract,render
+
+EasyOCR 이 없으면 ocr 단계는 skipped 로 기록됩니다. 합성 영수증의 한글은 --font 로 준 한글 글꼴
+(없으면 맑은 고딕/나눔고딕/Noto CJK 를 찾아봄)로 그리며, 한글 글꼴이 없으면 숫자 필드만 그립니다.
+"""
+import argparse
+import asyncio
+import io
+import json
+import os
+import platform
+import random
+import statistics
+import sys
+import tempfile
+import time
+from importlib.metadata import PackageNotFoundError, version
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from PIL import Image, ImageDraw, ImageFont
+
+# 저장소 모듈(pdf_chunking 등)은 import 시점의 작업 디렉터리에 chroma_data 를 만들므로
+# 반드시 임시 디렉터리로 chdir 한 뒤 각 벤치마크 함수 안에서 import 한다
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if REPO_ROOT not in sys.path:
+    sys.path.insert(0, REPO_ROOT)
+
+QUESTIONS_PATH = os.path.join(REPO_ROOT, "benchmarks", "policy_questions.json")
+BENCHES = ("ocr", "extract", "ingest", "search", "render")
+# 비교 시 기본 허용 악화 비율 (0.15 = 15%)
+DEFAULT_THRESHOLD = 0.15
+HANGUL_FONTS = (
+    "C:/Windows/Fonts/malgun.ttf",
+    "/usr/share/fonts/truetype/nanum/NanumGothic.ttf",
+    "/usr/share/fonts/opentype/noto/NotoSansCJK-Regular.ttc",
+    "/usr/share/fonts/noto-cjk/NotoSansCJK-Regular.ttc",
+    "/System/Library/Fonts/AppleSDGothicNeo.ttc",
+)
+MERCHANTS = ("스타벅스 강남점", "김밥천국 역삼점", "한솔식당", "GS25 선릉점", "서울개인택시")
+
+
+class Results:
+    """지표 이름 → {"value", "unit", "better"("lower"|"higher")}"""
+
+    def __init__(self):
+        self.metrics: Dict[str, Dict[str, Any]] = {}
+        self.skipped: Dict[str, str] = {}
+
+    def add(self, name: str, value: float, unit: str, better: str = "lower") -> None:
+        self.metrics[name] = {"value": round(value, 4), "unit": unit, "better": better}
+
+    def add_latencies(self, prefix: str, seconds: List[float]) -> None:
+        ms = sorted(s * 1000 for s in seconds)
+        self.add(f"{prefix}.p50_ms", statistics.median(ms), "ms")
+        self.add(f"{prefix}.p95_ms", ms[min(len(ms) - 1, int(0.95 * len(ms)))], "ms")
+
+
+def _package_version(name: str) -> str:
+    try:
+        return version(name)
+    except PackageNotFoundError:
+        return "not installed"
+
+
+def _find_font(path: Optional[str]) -> Optional[str]:
+    for candidate in ([path] if path else []) + list(HANGUL_FONTS):
+        if candidate and os.path.exists(candidate):
+            return candidate
+    return None
+
+
+def receipt_fixtures(count: int, font_path: Optional[str], seed: int = 7) -> List[Tuple[bytes, Dict[str, Any]]]:
+    """합성 영수증 PNG 와 정답 필드 목록. 한글 글꼴이 없으면 한글 줄과 금액(키워드가 한글) 정답은 뺀다."""
+    rng = random.Random(seed)
+    hangul = font_path is not None
+    font = ImageFont.truetype(font_path, 28) if hangul else ImageFont.load_default(size=28)
+    fixtures = []
+    for _ in range(count):
+        biz = f"{rng.randint(100, 999)}-{rng.randint(10, 99)}-{rng.randint(10000, 99999)}"
+        date = f"2025-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}"
+        amount = rng.randint(10, 2000) * 100
+        lines = [f"{date} 12:{rng.randint(10, 59)}", biz, f"TEL 02-{rng.randint(100, 999)}-{rng.randint(1000, 9999)}"]
+        truth: Dict[str, Any] = {"business_reg_no": biz, "trade_date": date}
+        if hangul:
+            lines = [rng.choice(MERCHANTS), f"사업자번호 {biz}", f"거래일시 {lines[0]}", lines[2],
+                     f"합계 {amount:,}원", "신용카드 승인"]
+            truth["amount"] = amount
+        img = Image.new("L", (720, 80 + 60 * len(lines)), 255)
+        draw = ImageDraw.Draw(img)
+        for i, text in enumerate(lines):
+            draw.text((40, 40 + 60 * i), text, fill=0, font=font)
+        buf = io.BytesIO()
+        img.save(buf, "PNG")
+        fixtures.append((buf.getvalue(), truth))
+    return fixtures
+
+
+def bench_ocr(results: Results, args: argparse.Namespace, state: Dict[str, Any]) -> None:
+    try:
+        import easyocr  # noqa: F401
+    except ImportError:
+        results.skipped["ocr"] = "easyocr not installed"
+        return
+    from Ocr_Recorder import _decode_image_bytes, _extract_fields, _ocr_lines, get_reader
+
+    started = time.perf_counter()
+    get_reader()
+    results.add("ocr.model_load_s", time.perf_counter() - started, "s")
+
+    font_path = _find_font(args.font)
+    fixtures = receipt_fixtures(args.images, font_path)
+    decode, recognize, all_lines = [], [], []
+    correct: Dict[str, int] = {}
+    for img_bytes, truth in fixtures:
+        started = time.perf_counter()
+        img_np = _decode_image_bytes(img_bytes)
+        decode.append(time.perf_counter() - started)
+        started = time.perf_counter()
+        lines = _ocr_lines(img_np)
+        recognize.append(time.perf_counter() - started)
+        all_lines.append(lines)
+        parsed = _extract_fields(lines)
+        for field, expected in truth.items():
+            correct[field] = correct.get(field, 0) + (parsed.get(field) == expected)
+    state["ocr_lines"] = all_lines
+    state["font"] = font_path or "PIL default (no Hangul)"
+    results.add_latencies("ocr.decode", decode)
+    results.add_latencies("ocr.lines", recognize)
+    for field, hits in sorted(correct.items()):
+        results.add(f"ocr.accuracy.{field}", hits / len(fixtures), "ratio", "higher")
+
+
+def bench_extract(results: Results, args: argparse.Namespace, state: Dict[str, Any]) -> None:
+    from Ocr_Recorder import _extract_fields
+    from benchmarks.extract_bench import synthetic_corpus
+
+    corpus = synthetic_corpus(args.samples) + state.get("ocr_lines", [])
+    best = float("inf")
+    for _ in range(args.repeat):
+        started = time.perf_counter()
+        for lines in corpus:
+            _extract_fields(lines)
+        best = min(best, time.perf_counter() - started)
+    results.add("extract.receipts_per_s", len(corpus) / best, "receipts/s", "higher")
+
+
+def bench_ingest(results: Results, args: argparse.Namespace, state: Dict[str, Any]) -> None:
+    from pdf_chunking import chunking_pdf, collection, embedding_function
+
+    files = sorted(f for f in os.listdir(args.policies) if f.lower().endswith(".pdf"))
+    if not files:
+        results.skipped["ingest"] = f"no PDFs in {args.policies}"
+        return
+    embedding_function(["warm-up"])  # 임베딩 모델 로드 시간은 제외
+    started = time.perf_counter()
+    for filename in files:
+        chunking_pdf(os.path.join(args.policies, filename))
+    elapsed = time.perf_counter() - started
+    chunks = collection.count()
+    results.add("ingest.seconds", elapsed, "s")
+    results.add("ingest.files_per_s", len(files) / elapsed, "files/s", "higher")
+    results.add("ingest.chunks_per_s", chunks / elapsed, "chunks/s", "higher")
+    state["ingested"] = True
+
+
+def bench_search(results: Results, args: argparse.Namespace, state: Dict[str, Any]) -> None:
+    if not state.get("ingested"):
+        results.skipped["search"] = "requires the ingest benchmark"
+        return
+    import main
+    from benchmarks.chunking_eval import _compact
+    from policy_search import SEARCH_MODES
+    from query_cache import embedding_cache, result_cache
+
+    with open(args.questions, "r", encoding="utf-8") as f:
+        questions = json.load(f)
+    for mode in SEARCH_MODES:
+        latencies, hits = [], 0
+        for q in questions:
+            # 캐시 적중 없이 임베딩 + 검색 전체를 잰다
+            embedding_cache.clear()
+            result_cache.clear()
+            started = time.perf_counter()
+            payload = asyncio.run(main.searcing_chromadb.fn(q["question"], top_k=args.top_k, mode=mode))
+            latencies.append(time.perf_counter() - started)
+            answer = _compact(q["answer"])
+            hits += any(answer in _compact(d["document"]) for d in json.loads(payload))
+        results.add_latencies(f"search.{mode}", latencies)
+        results.add(f"search.{mode}.hit_rate@{args.top_k}", hits / len(questions), "ratio", "higher")
+
+
+def bench_render(results: Results, args: argparse.Namespace, state: Dict[str, Any]) -> None:
+    import main
+
+    rng = random.Random(11)
+    receipts = [
+        {
+            "trade_date": f"2025-03-{rng.randint(1, 28):02d}",
+            "amount": rng.randint(10, 2000) * 100,
+            "merchant": {"name": rng.choice(MERCHANTS), "tel": "02-123-4567"},
+            "business_reg_no": "123-45-67890",
+            "payment_method": rng.choice(("card", "cash", "app_pay")),
+        }
+        for _ in range(args.receipts_per_form)
+    ]
+    user_info = {"문서번호": "EXP-202503-0001", "작성자": "홍길동", "신청부서": "생산기술팀", "신청월": "2025년 03월"}
+    main.generate_cost_html.fn(receipts=receipts, user_info=user_info)
+    latencies = []
+    for _ in range(args.renders):
+        started = time.perf_counter()
+        main.generate_cost_html.fn(receipts=receipts, user_info=user_info)
+        latencies.append(time.perf_counter() - started)
+    results.add_latencies("render.cost_html", latencies)
+
+
+RUNNERS: Dict[str, Callable[[Results, argparse.Namespace, Dict[str, Any]], None]] = {
+    "ocr": bench_ocr,
+    "extract": bench_extract,
+    "ingest": bench_ingest,
+    "search": bench_search,
+    "render": bench_render,
+}
+
+
+def run(args: argparse.Namespace) -> Dict[str, Any]:
+    selected = [b for b in args.only.split(",") if b] if args.only else list(BENCHES)
+    unknown = set(selected) - set(BENCHES)
+    if unknown:
+        raise SystemExit(f"알 수 없는 벤치마크: {', '.join(sorted(unknown))} (가능: {', '.join(BENCHES)})")
+    if "search" in selected and "ingest" not in selected:
+        selected.append("ingest")
+
+    results = Results()
+    state: Dict[str, Any] = {}
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory(prefix="mes-bench-", ignore_cleanup_errors=True) as workdir:
+        # chroma_data / 캐시 / 색인이 모두 상대 경로라 작업 디렉터리만 바꾸면 운영 데이터와 분리된다
+        os.chdir(workdir)
+        try:
+            for name in BENCHES:
+                if name in selected:
+                    print(f"[bench] {name} ...", file=sys.stderr)
+                    RUNNERS[name](results, args, state)
+        finally:
+            os.chdir(cwd)
+
+    return {
+        "meta": {
+            "created_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "packages": {name: _package_version(name) for name in ("easyocr", "torch", "chromadb", "jinja2", "pypdf")},
+            "font": state.get("font"),
+        },
+        "metrics": results.metrics,
+        "skipped": results.skipped,
+    }
+
+
+def compare(current: Dict[str, Any], baseline: Dict[str, Any], threshold: float,
+            thresholds: Dict[str, float], allow_missing: bool = False) -> List[Dict[str, Any]]:
+    """
+    기준 대비 지표 변화. 악화 비율이 threshold(지표 이름 접두어별 덮어쓰기 가능)를 넘으면 regressed.
+    lower 지표(지연시간)는 (현재 - 기준) / 기준, higher 지표(처리량/정확도)는 (기준 - 현재) / 기준.
+    기준에 있는데 이번 실행에 없는 지표(벤치마크가 건너뛰어졌거나 실패)도 allow_missing 이 아니면 regressed.
+    """
+    rows = []
+    for name, base in sorted(baseline["metrics"].items()):
+        cur = current["metrics"].get(name)
+        if cur is None:
+            rows.append({"metric": name, "baseline": base["value"], "current": None, "change": None,
+                         "regressed": not allow_missing})
+            continue
+        limit = next((v for prefix, v in sorted(thresholds.items(), key=lambda kv: -len(kv[0]))
+                      if name.startswith(prefix)), threshold)
+        if base["value"] == 0:
+            worse = 0.0 if cur["value"] == 0 else (1.0 if base["better"] == "lower" else -1.0)
+        elif base["better"] == "lower":
+            worse = (cur["value"] - base["value"]) / base["value"]
+        else:
+            worse = (base["value"] - cur["value"]) / base["value"]
+        rows.append({
+            "metric": name, "baseline": base["value"], "current": cur["value"], "unit": cur["unit"],
+            "change": round(worse, 4), "threshold": limit, "regressed": worse > limit,
+        })
+    return rows
+
+
+def _parse_thresholds(specs: List[str]) -> Dict[str, float]:
+    # "search.=0.3" → 이름이 search. 로 시작하는 지표는 30% 까지 허용
+    thresholds = {}
+    for spec in specs:
+        prefix, _, value = spec.partition("=")
+        thresholds[prefix] = float(value)
+    return thresholds
+
+
+def main():
+    parser = argparse.ArgumentParser(description="오프라인 벤치마크 (OCR / 필드 추출 / 적재 / 검색 / 렌더링)")
+    parser.add_argument("--only", help=f"실행할 벤치마크 (쉼표 구분, 기본 전체: {','.join(BENCHES)})")
+    parser.add_argument("--out", help="결과 JSON 저장 경로 (없으면 표준 출력)")
+    parser.add_argument("--current", help="측정 대신 이 결과 JSON 을 --compare 에 사용")
+    parser.add_argument("--compare", help="기준 결과 JSON. 악화가 임계값을 넘으면 exit 1")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD, help="허용 악화 비율 (기본 0.15)")
+    parser.add_argument("--metric-threshold", action="append", default=[],
+                        help="지표 접두어별 허용 비율 (예: ocr.=0.3, 여러 번 지정 가능)")
+    parser.add_argument("--allow-missing", action="store_true",
+                        help="기준에 있는데 이번 실행에 없는 지표를 회귀로 보지 않음 (--only 로 일부만 비교할 때)")
+    parser.add_argument("--policies", default=os.path.join(REPO_ROOT, "policies"))
+    parser.add_argument("--questions", default=QUESTIONS_PATH)
+    parser.add_argument("--font", help="합성 영수증에 쓸 한글 TTF/TTC 글꼴")
+    parser.add_argument("--images", type=int, default=10, help="합성 영수증 이미지 수")
+    parser.add_argument("--samples", type=int, default=5000, help="_extract_fields 합성 라인 수")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--top-k", type=int, default=5)
+    parser.add_argument("--renders", type=int, default=200)
+    parser.add_argument("--receipts-per-form", type=int, default=12)
+    args = parser.parse_args()
+    for attr in ("policies", "questions", "out", "current", "compare", "font"):
+        if getattr(args, attr):
+            setattr(args, attr, os.path.abspath(getattr(args, attr)))
+
+    if args.current:
+        with open(args.current, "r", encoding="utf-8") as f:
+            current = json.load(f)
+    else:
+        current = run(args)
+        text = json.dumps(current, ensure_ascii=False, indent=2)
+        if args.out:
+            with open(args.out, "w", encoding="utf-8") as f:
+                f.write(text + "\n")
+        else:
+            print(text)
+
+    if not args.compare:
+        return
+    with open(args.compare, "r", encoding="utf-8") as f:
+        baseline = json.load(f)
+    rows = compare(current, baseline, args.threshold, _parse_thresholds(args.metric_threshold), args.allow_missing)
+    print(f"{'metric':<36}{'baseline':>12}{'current':>12}{'change':>9}", file=sys.stderr)
+    for r in rows:
+        if r["current"] is None:
+            flag = "  MISSING" if r["regressed"] else ""
+            print(f"{r['metric']:<36}{r['baseline']:>12}{'-':>12}{'skipped':>9}{flag}", file=sys.stderr)
+            continue
+        flag = "  REGRESSED" if r["regressed"] else ""
+        print(f"{r['metric']:<36}{r['baseline']:>12}{r['current']:>12}{r['change']:>+9.1%}{flag}", file=sys.stderr)
+    regressed = [r["metric"] for r in rows if r["regressed"]]
+    if regressed:
+        raise SystemExit(f"회귀 {len(regressed)}건: {', '.join(regressed)}")
+
+
+if __name__ == "__main__":
+    main()
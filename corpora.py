@@ -0,0 +1,75 @@
+import os
+import re
+from dataclasses import dataclass, replace
+from typing import Dict, List, Optional
+
+from embeddings import EMBEDDING
+
+# 검색 대상 문서 묶음(corpus). corpus 마다 PDF 폴더, Chroma 컬렉션, BM25 키워드 인덱스를 따로 둡니다.
+# - policies: 회사 내규 (기존 pdf_documents 컬렉션 그대로)
+# - scenarios: 제조 의사결정 시나리오 (공장 현황, 잔업/교대, 설비 증설, 외주, 납기 재협상)
+# - DOCUMENT_CORPORA: 추가/변경할 corpus "이름=폴더" 쉼표 구분 (예: "manuals=./manuals,scenarios=./input_file")
+#   새 corpus 의 컬렉션 이름은 <이름>_documents
+DEFAULT_CORPUS = "policies"
+DOCUMENT_CORPORA = os.getenv("DOCUMENT_CORPORA", "")
+
+CORPUS_NAME_PAT = re.compile(r"^[a-z][a-z0-9_]*$")
+
+__all__ = ["DEFAULT_CORPUS", "Corpus", "CORPORA", "get_corpus", "resolve_corpora"]
+
+
+@dataclass(frozen=True)
+class Corpus:
+    """
+    문서 묶음
+    - directory: 적재할 PDF 폴더
+    - base_collection: 컬렉션 기본 이름 (임베딩 모델을 바꾸면 모델별 접미어가 붙음)
+    """
+    name: str
+    directory: str
+    base_collection: str
+    description: str = ""
+
+    def collection_name(self) -> str:
+        return EMBEDDING.collection_name(self.base_collection)
+
+    def lexical_index_path(self) -> str:
+        default = f"./chroma_data/lexical_{self.collection_name()}.json"
+        if self.name == DEFAULT_CORPUS:
+            # 기존 설정(LEXICAL_INDEX_PATH)은 내규 corpus 에만 적용
+            return os.getenv("LEXICAL_INDEX_PATH", default)
+        return default
+
+
+def _load_corpora(spec: str) -> Dict[str, Corpus]:
+    corpora = {
+        "policies": Corpus("policies", "./policies", "pdf_documents", "회사 내규 (결재/경비/구매/품질/보안/근태)"),
+        "scenarios": Corpus("scenarios", "./input_file", "scenario_documents", "제조 의사결정 시나리오"),
+    }
+    for entry in filter(None, (e.strip() for e in spec.split(","))):
+        name, _, directory = entry.partition("=")
+        name = name.strip().lower()
+        if not CORPUS_NAME_PAT.match(name) or not directory.strip():
+            raise ValueError(f"DOCUMENT_CORPORA 형식 오류: {entry} (예: manuals=./manuals)")
+        if name in corpora:
+            corpora[name] = replace(corpora[name], directory=directory.strip())
+        else:
+            corpora[name] = Corpus(name, directory.strip(), f"{name}_documents")
+    return corpora
+
+
+CORPORA = _load_corpora(DOCUMENT_CORPORA)
+
+
+def get_corpus(name: str) -> Corpus:
+    corpus = CORPORA.get(name)
+    if corpus is None:
+        raise ValueError(f"알 수 없는 corpus: {name} (가능: {', '.join(CORPORA)})")
+    return corpus
+
+
+def resolve_corpora(names: Optional[List[str]] = None) -> List[Corpus]:
+    """corpus 이름 목록 → Corpus 목록 (중복 제거, 비어 있으면 전체)"""
+    if not names:
+        return list(CORPORA.values())
+    return [get_corpus(name) for name in dict.fromkeys(names)]
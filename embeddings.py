@@ -0,0 +1,168 @@
+import os
+import re
+import threading
+from dataclasses import asdict, dataclass
+from typing import Any, Dict, List
+
+from chromadb.api.types import Documents, EmbeddingFunction, Embeddings
+from chromadb.utils.embedding_functions import DefaultEmbeddingFunction, register_embedding_function
+
+# 임베딩 설정 (적재와 질의가 같은 설정을 사용)
+# - EMBEDDING_MODEL: sentence-transformers 모델 이름/경로 (빈 값이면 Chroma 기본 all-MiniLM-L6-v2 ONNX)
+#   한국어 문서는 jhgan/ko-sroberta-multitask, intfloat/multilingual-e5-small 등 다국어/한국어 모델 권장
+# - EMBEDDING_BACKEND: "torch" 또는 "onnx" (onnx 는 optimum[onnxruntime] 필요)
+# - EMBEDDING_QUANTIZE: "int8" 이면 CPU int8 추론 (torch: Linear 층 동적 양자화 / onnx: 양자화 모델 파일)
+# - EMBEDDING_BATCH_SIZE: encode 배치 크기
+# - EMBEDDING_THREADS: CPU 추론 스레드 수 (0이면 라이브러리 기본값)
+# - EMBEDDING_QUERY_PREFIX / EMBEDDING_DOCUMENT_PREFIX: 질의/문서 앞에 붙일 문자열 (e5 계열은 "query: " / "passage: ")
+EMBEDDING_MODEL = os.getenv("EMBEDDING_MODEL", "")
+EMBEDDING_BACKEND = os.getenv("EMBEDDING_BACKEND", "torch")
+EMBEDDING_QUANTIZE = os.getenv("EMBEDDING_QUANTIZE", "")
+EMBEDDING_BATCH_SIZE = int(os.getenv("EMBEDDING_BATCH_SIZE", "64"))
+EMBEDDING_THREADS = int(os.getenv("EMBEDDING_THREADS", "0"))
+EMBEDDING_QUERY_PREFIX = os.getenv("EMBEDDING_QUERY_PREFIX", "")
+EMBEDDING_DOCUMENT_PREFIX = os.getenv("EMBEDDING_DOCUMENT_PREFIX", "")
+# onnx + int8 일 때 읽을 양자화 모델 파일 (sentence-transformers 허브 모델은 CPU 명령어셋별로 제공)
+EMBEDDING_ONNX_INT8_FILE = os.getenv("EMBEDDING_ONNX_INT8_FILE", "onnx/model_qint8_avx512_vnni.onnx")
+
+BASE_COLLECTION = "pdf_documents"
+BACKENDS = ("torch", "onnx")
+QUANTIZE_MODES = ("", "int8")
+SLUG_PAT = re.compile(r"[^a-zA-Z0-9]+")
+
+__all__ = [
+    "EMBEDDING_MODEL", "EmbeddingConfig", "EMBEDDING", "SentenceTransformerEmbedding", "create_embedding_function",
+]
+
+
+@dataclass(frozen=True)
+class EmbeddingConfig:
+    """
+    임베딩 설정
+    - model: sentence-transformers 모델 (빈 값이면 Chroma 기본 임베딩)
+    - backend / quantize: 추론 방식 (벡터 값이 달라지므로 컬렉션을 따로 씀)
+    - batch_size / threads: 처리량 조정 (벡터 값은 같음)
+    - query_prefix / document_prefix: 비대칭 검색 모델용 접두어
+    """
+    model: str = ""
+    backend: str = "torch"
+    quantize: str = ""
+    batch_size: int = 64
+    threads: int = 0
+    query_prefix: str = ""
+    document_prefix: str = ""
+
+    def __post_init__(self):
+        if self.backend not in BACKENDS:
+            raise ValueError(f"알 수 없는 임베딩 backend: {self.backend} (가능: {', '.join(BACKENDS)})")
+        if self.quantize not in QUANTIZE_MODES:
+            raise ValueError(f"알 수 없는 양자화 방식: {self.quantize} (가능: int8)")
+
+    def signature(self) -> str:
+        """벡터 값을 바꾸는 설정만 포함 (배치 크기/스레드 수는 제외)"""
+        if not self.model:
+            return "default"
+        parts = [self.model, self.backend] + ([self.quantize] if self.quantize else [])
+        if self.query_prefix or self.document_prefix:
+            parts.append("prefixed")
+        return "-".join(parts)
+
+    def collection_name(self, base: str = BASE_COLLECTION) -> str:
+        """
+        모델마다 벡터 차원/공간이 다르므로 기본 임베딩이 아니면 컬렉션을 분리합니다.
+        (기본 설정은 기존 pdf_documents 그대로)
+        """
+        if not self.model:
+            return base
+        slug = SLUG_PAT.sub("-", self.signature()).strip("-").lower()
+        return f"{base}__{slug}"[:512]
+
+
+EMBEDDING = EmbeddingConfig(
+    model=EMBEDDING_MODEL,
+    backend=EMBEDDING_BACKEND,
+    quantize=EMBEDDING_QUANTIZE,
+    batch_size=EMBEDDING_BATCH_SIZE,
+    threads=EMBEDDING_THREADS,
+    query_prefix=EMBEDDING_QUERY_PREFIX,
+    document_prefix=EMBEDDING_DOCUMENT_PREFIX,
+)
+
+
+@register_embedding_function
+class SentenceTransformerEmbedding(EmbeddingFunction[Documents]):
+    """
+    sentence-transformers 임베딩 함수 (정규화 벡터).
+    모델은 첫 encode 때 로드하므로 Chroma 가 컬렉션 설정에서 이 객체를 다시 만들어도 모델을 두 번 읽지 않습니다.
+    """
+
+    def __init__(self, config: EmbeddingConfig):
+        self.config = config
+        self._model = None
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def name() -> str:
+        return "mes_sentence_transformer"
+
+    def get_config(self) -> Dict[str, Any]:
+        return asdict(self.config)
+
+    @staticmethod
+    def build_from_config(config: Dict[str, Any]) -> "SentenceTransformerEmbedding":
+        return SentenceTransformerEmbedding(EmbeddingConfig(**config))
+
+    def _load(self):
+        if self._model is not None:
+            return self._model
+        with self._lock:
+            if self._model is None:
+                from sentence_transformers import SentenceTransformer
+
+                config = self.config
+                if config.backend == "onnx":
+                    import onnxruntime
+
+                    model_kwargs: Dict[str, Any] = {"provider": "CPUExecutionProvider"}
+                    if config.threads:
+                        options = onnxruntime.SessionOptions()
+                        options.intra_op_num_threads = config.threads
+                        model_kwargs["session_options"] = options
+                    if config.quantize == "int8":
+                        model_kwargs["file_name"] = EMBEDDING_ONNX_INT8_FILE
+                    model = SentenceTransformer(config.model, device="cpu", backend="onnx", model_kwargs=model_kwargs)
+                else:
+                    import torch
+
+                    if config.threads:
+                        torch.set_num_threads(config.threads)
+                    model = SentenceTransformer(config.model, device="cpu")
+                    if config.quantize == "int8":
+                        # Linear 층 가중치를 int8 로 바꿔 CPU 추론 (정확도 약간 ↓, 속도/메모리 ↑)
+                        model = torch.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+                self._model = model
+        return self._model
+
+    def _encode(self, texts: List[str], prefix: str) -> Embeddings:
+        model = self._load()
+        vectors = model.encode(
+            [prefix + t for t in texts],
+            batch_size=self.config.batch_size,
+            normalize_embeddings=True,
+            convert_to_numpy=True,
+            show_progress_bar=False,
+        )
+        return list(vectors)
+
+    def __call__(self, input: Documents) -> Embeddings:
+        return self._encode(list(input), self.config.document_prefix)
+
+    def embed_query(self, input: Documents) -> Embeddings:
+        return self._encode(list(input), self.config.query_prefix)
+
+
+def create_embedding_function(config: EmbeddingConfig = EMBEDDING) -> EmbeddingFunction:
+    """설정에 맞는 임베딩 함수. 모델을 지정하지 않으면 기존 Chroma 기본 임베딩을 그대로 사용합니다."""
+    if not config.model:
+        return DefaultEmbeddingFunction()
+    return SentenceTransformerEmbedding(config)
@@ -0,0 +1,189 @@
+"""
+월별 지출결의서 일괄 생성
+
+추출이 끝난 영수증(extract_receipt_core_fields 결과 + user/department)을
+(사용자, 부서, 월) 단위로 묶고, 가맹점명으로 비용 구분을 분류해 그룹마다 지출결의서 HTML 한 장을 씁니다.
+각 서식은 템플릿 조각 단위로 파일에 바로 쓰며, 그룹별 합계는 manifest.json 에 기록합니다.
+
+사용법:
+    python expense_reports.py receipts.jsonl --out ./reports/2025-01
+
+입력은 JSON 배열 또는 JSONL 입니다. 항목에 image_path 만 있고 추출 필드가 없으면
+OCR(캐시 우선) 후 _extract_fields 로 필드를 채웁니다.
+"""
+import argparse
+import asyncio
+import hashlib
+import json
+import os
+import re
+import time
+from collections import defaultdict
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+from forms import DEFAULT_CATEGORY, parse_amount, stream_cost_html
+
+# generate_expense_reports 도구가 서식을 쓸 수 있는 루트 디렉터리
+REPORT_OUTPUT_ROOT = os.path.abspath(os.getenv("REPORT_OUTPUT_ROOT", "./reports"))
+
+__all__ = ["REPORT_OUTPUT_ROOT", "CATEGORY_RULES", "categorize", "group_key", "generate_reports", "load_receipts"]
+
+# 가맹점명 → 비용 구분 (위에서부터 먼저 맞는 규칙 적용, 접대비는 영수증만으로 알 수 없어 category 로 직접 지정)
+CATEGORY_RULES: Tuple[Tuple[str, "re.Pattern[str]"], ...] = (
+    ("교통비", re.compile(r"택시|KTX|SRT|코레일|철도|버스|지하철|티머니|주유|오일|주차|하이패스|도로공사|카카오\s*T", re.I)),
+    ("출장비", re.compile(r"호텔|모텔|숙박|리조트|게스트하우스|항공|에어", re.I)),
+    ("사무용품", re.compile(r"문구|오피스|다이소|알파|모닝글로리|핫트랙스", re.I)),
+    ("교육비", re.compile(r"교육|학원|아카데미|강의|클래스|서점|문고|도서", re.I)),
+    ("식대", re.compile(r"식당|김밥|분식|카페|커피|스타벅스|이디야|투썸|베이커리|치킨|피자|버거|국밥|한식|중식|일식|GS25|CU|세븐일레븐|편의점", re.I)),
+)
+
+UNKNOWN = "미지정"
+FILENAME_UNSAFE_PAT = re.compile(r'[\\/:*?"<>|\s]+')
+MONTH_PAT = re.compile(r"^(\d{4})-(\d{2})")
+
+
+def categorize(receipt: Dict[str, Any]) -> str:
+    """영수증의 category 가 있으면 그대로, 없으면 가맹점명 규칙으로, 그래도 없으면 식대"""
+    if receipt.get("category"):
+        return receipt["category"]
+    name = (receipt.get("merchant") or {}).get("name") or ""
+    for category, pattern in CATEGORY_RULES:
+        if pattern.search(name):
+            return category
+    return DEFAULT_CATEGORY
+
+
+def group_key(receipt: Dict[str, Any]) -> Tuple[str, str, str]:
+    """(사용자, 부서, 월 YYYY-MM)"""
+    m = MONTH_PAT.match(receipt.get("trade_date") or "")
+    month = f"{m.group(1)}-{m.group(2)}" if m else UNKNOWN
+    return receipt.get("user") or UNKNOWN, receipt.get("department") or UNKNOWN, month
+
+
+def _safe(name: str) -> str:
+    return FILENAME_UNSAFE_PAT.sub("_", name).strip("_") or UNKNOWN
+
+
+def _report_filename(key: Tuple[str, str, str], used: Set[str]) -> str:
+    """
+    <월>_<부서>_<사용자>.html. 다른 그룹이 같은 이름으로 정리되면(공백/_ 차이, 미지정 등)
+    원래 키의 짧은 해시를 붙여 앞 그룹의 서식을 덮어쓰지 않게 합니다.
+    """
+    user, department, month = key
+    stem = f"{_safe(month)}_{_safe(department)}_{_safe(user)}"
+    if stem.lower() in used:
+        stem += "_" + hashlib.sha1("\0".join(key).encode("utf-8")).hexdigest()[:8]
+    used.add(stem.lower())
+    return f"{stem}.html"
+
+
+def generate_reports(receipts: Iterable[Dict[str, Any]], output_dir: str,
+                     user_info: Optional[Dict[str, str]] = None) -> Dict[str, Any]:
+    """
+    영수증을 (사용자, 부서, 월) 로 묶어 그룹마다 지출결의서를 output_dir 에 쓰고 manifest 를 반환합니다.
+    user_info 는 모든 서식에 공통으로 들어갈 값(결재자 등)이며, 작성자/신청부서/신청월/문서번호는 그룹 값으로 채웁니다.
+    """
+    started = time.perf_counter()
+    groups: Dict[Tuple[str, str, str], List[Dict[str, Any]]] = defaultdict(list)
+    count = 0
+    for receipt in receipts:
+        # 금액은 묶을 때 한 번 정수로 맞춰 둔다 ("32,000" 같은 OCR/사용자 입력 문자열 포함)
+        groups[group_key(receipt)].append(
+            {**receipt, "category": categorize(receipt), "amount": parse_amount(receipt.get("amount"))}
+        )
+        count += 1
+
+    os.makedirs(output_dir, exist_ok=True)
+    reports = []
+    used_names: Set[str] = set()
+    for seq, ((user, department, month), items) in enumerate(sorted(groups.items()), start=1):
+        items.sort(key=lambda r: r.get("trade_date") or "")
+        info = {**(user_info or {}), "작성자": user, "신청부서": department}
+        if month != UNKNOWN:
+            info["신청월"] = f"{month[:4]}년 {month[5:]}월"
+            info["문서번호"] = f"EXP-{month.replace('-', '')}-{seq:04d}"
+        filename = _report_filename((user, department, month), used_names)
+        with open(os.path.join(output_dir, filename), "w", encoding="utf-8") as f:
+            stream_cost_html(items, f, info)
+
+        by_category: Dict[str, int] = defaultdict(int)
+        for r in items:
+            by_category[r["category"]] += r["amount"]
+        reports.append({
+            "file": filename,
+            "user": user,
+            "department": department,
+            "month": month,
+            "receipts": len(items),
+            "total": sum(by_category.values()),
+            "by_category": dict(by_category),
+        })
+
+    elapsed = time.perf_counter() - started
+    manifest = {
+        "output_dir": output_dir,
+        "receipts": count,
+        "reports": reports,
+        "elapsed_seconds": round(elapsed, 3),
+        "receipts_per_second": round(count / elapsed, 1) if elapsed else 0.0,
+    }
+    with open(os.path.join(output_dir, "manifest.json"), "w", encoding="utf-8") as f:
+        json.dump(manifest, f, ensure_ascii=False, indent=2)
+    return manifest
+
+
+async def _fill_from_images(receipts: List[Dict[str, Any]]) -> None:
+    # image_path 만 있는 항목은 OCR(캐시 우선) 후 필드 추출
+    import ocr_pool
+    from Ocr_Recorder import _extract_fields
+
+    pending = [r for r in receipts if r.get("image_path") and "amount" not in r]
+    if not pending:
+        return
+    # 워커 수만큼만 풀에 넣는다 (한꺼번에 넣으면 OCR_QUEUE_DEPTH 를 넘는 이미지가 busy 로 거절됨)
+    slots = asyncio.Semaphore(max(ocr_pool.OCR_WORKERS, 1))
+
+    async def _fill(receipt: Dict[str, Any]) -> None:
+        async with slots:
+            lines = await ocr_pool.ocr_image_file(receipt["image_path"])
+        for key, value in _extract_fields(lines).items():
+            receipt.setdefault(key, value)
+
+    tasks = [asyncio.ensure_future(_fill(r)) for r in pending]
+    try:
+        results = await asyncio.gather(*tasks, return_exceptions=True)
+    finally:
+        # 풀은 모든 작업이 끝나거나 취소된 뒤에 닫는다
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        ocr_pool.shutdown()
+    for receipt, result in zip(pending, results):
+        if isinstance(result, Exception):
+            print(f"OCR 실패 (필드 없이 진행): {receipt['image_path']}: {result}")
+
+
+def load_receipts(path: str) -> List[Dict[str, Any]]:
+    with open(path, "r", encoding="utf-8") as f:
+        text = f.read()
+    if text.lstrip().startswith("["):
+        return json.loads(text)
+    return [json.loads(line) for line in text.splitlines() if line.strip()]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="월별 지출결의서 일괄 생성")
+    parser.add_argument("input", help="영수증 JSON 배열 또는 JSONL 파일")
+    parser.add_argument("--out", default=REPORT_OUTPUT_ROOT, help="서식을 쓸 디렉터리")
+    parser.add_argument("--user-info", help="모든 서식 공통 값 JSON (예: '{\"결재자\": \"홍길동\"}')")
+    args = parser.parse_args()
+
+    receipts = load_receipts(args.input)
+    asyncio.run(_fill_from_images(receipts))
+    manifest = generate_reports(receipts, args.out, json.loads(args.user_info) if args.user_info else None)
+    print(f"영수증 {manifest['receipts']}개 → 서식 {len(manifest['reports'])}개 ({args.out})")
+    print(f"{manifest['elapsed_seconds']}s ({manifest['receipts_per_second']} receipts/s)")
+
+
+if __name__ == "__main__":
+    main()
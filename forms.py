@@ -0,0 +1,131 @@
+import os
+import re
+from typing import Any, Dict, Iterable, List, Optional, TextIO, Tuple
+
+from jinja2 import Environment, FileSystemLoader, select_autoescape
+
+TEMPLATE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "template")
+
+# 템플릿은 서버 시작 시 한 번만 읽어 컴파일 (요청마다 파일을 다시 읽지 않음)
+_env = Environment(
+    loader=FileSystemLoader(TEMPLATE_DIR),
+    autoescape=select_autoescape(["html"]),
+    trim_blocks=True,
+    lstrip_blocks=True,
+    auto_reload=False,
+)
+COST_TEMPLATE = _env.get_template("cost.html")
+CLAIM_TEMPLATE = _env.get_template("claim.html")
+
+__all__ = [
+    "EXPENSE_CATEGORIES", "DEFAULT_CATEGORY", "PAYMENT_LABELS", "CLAIM_TYPES",
+    "parse_amount", "expense_rows", "render_cost_html", "stream_cost_html", "render_claim_html",
+]
+
+# 지출결의서 기본 구분 행 (구분, 비용 항목 placeholder)
+EXPENSE_CATEGORIES: Tuple[Tuple[str, str], ...] = (
+    ("교통비", "예: KTX 왕복"),
+    ("식대", "예: 회의 식비"),
+    ("사무용품", "예: 프린터 용지"),
+    ("접대비", "예: 고객 미팅"),
+    ("교육비", "예: 온라인 강의"),
+    ("출장비", "예: 숙박/교통"),
+)
+# 영수증에 category 가 없을 때의 구분
+DEFAULT_CATEGORY = "식대"
+
+# 결제수단(payment_method) → 지출결의서 체크박스
+PAYMENT_LABELS = {"card": "법인카드", "app_pay": "개인카드", "cash": "현금"}
+
+CLAIM_TYPES = ("품질", "납기", "서비스", "Critical")
+
+# 금액 문자열에서 숫자와 부호 외의 문자 (쉼표, 원, 공백 등)
+AMOUNT_UNSAFE_PAT = re.compile(r"[^0-9-]")
+
+
+def parse_amount(value: Any) -> int:
+    """금액 값을 정수로 (32000, "32,000", "32,000원" 모두 32000, 읽을 수 없으면 0)"""
+    if isinstance(value, (int, float)):
+        return int(value)
+    digits = AMOUNT_UNSAFE_PAT.sub("", str(value or ""))
+    try:
+        return int(digits) if digits else 0
+    except ValueError:
+        return 0
+
+
+def _amount(receipt: Dict[str, Any]) -> int:
+    return parse_amount(receipt.get("amount"))
+
+
+def expense_rows(receipts: Iterable[Dict[str, Any]]) -> Tuple[List[Dict[str, Any]], int]:
+    """
+    영수증 목록을 지출 내역 행으로 바꿉니다. (행 목록, 합계) 반환.
+    영수증은 category(없으면 식대) 구분 자리에 순서대로 들어가고, 영수증이 없는 기본 구분은 빈 행으로 남습니다.
+    """
+    placeholders = dict(EXPENSE_CATEGORIES)
+    by_category: Dict[str, List[Dict[str, Any]]] = {}
+    total = 0
+    for receipt in receipts:
+        merchant = receipt.get("merchant") or {}
+        amount = _amount(receipt)
+        total += amount
+        note = receipt.get("note")
+        if note is None:
+            note = f"사업자: {receipt.get('business_reg_no') or ''}, 전화: {merchant.get('tel') or ''}"
+        category = receipt.get("category") or DEFAULT_CATEGORY
+        by_category.setdefault(category, []).append({
+            "checked": True,
+            "category": category,
+            "date": receipt.get("trade_date") or "",
+            "item": receipt.get("item") or merchant.get("name") or "",
+            "placeholder": placeholders.get(category, ""),
+            "amount": f"{amount:,}",
+            "note": note,
+        })
+
+    rows: List[Dict[str, Any]] = []
+    for category, placeholder in EXPENSE_CATEGORIES:
+        rows.extend(by_category.pop(category, None) or [{
+            "checked": False, "category": category, "date": "", "item": "",
+            "placeholder": placeholder, "amount": "", "note": "",
+        }])
+    # 기본 구분에 없는 category 는 뒤에 덧붙임
+    for extra in by_category.values():
+        rows.extend(extra)
+    return rows, total
+
+
+def _cost_context(receipts: List[Dict[str, Any]], user_info: Optional[Dict[str, str]]) -> Dict[str, Any]:
+    rows, total = expense_rows(receipts)
+    payment_checked = {
+        PAYMENT_LABELS[r["payment_method"]] for r in receipts if r.get("payment_method") in PAYMENT_LABELS
+    }
+    return {
+        "info": user_info or {},
+        "rows": rows,
+        "total_amount": f"{total:,}" if receipts else "",
+        "total_text": f"{total:,} 원" if receipts else "",
+        "payment_labels": list(PAYMENT_LABELS.values()),
+        "payment_checked": payment_checked,
+        "receipt_count": len(receipts),
+    }
+
+
+def render_cost_html(receipts: List[Dict[str, Any]], user_info: Optional[Dict[str, str]] = None) -> str:
+    """영수증 목록(extract_receipt_core_fields 결과)으로 지출결의서 HTML 을 만듭니다."""
+    return COST_TEMPLATE.render(**_cost_context(receipts, user_info))
+
+
+def stream_cost_html(receipts: List[Dict[str, Any]], fp: TextIO, user_info: Optional[Dict[str, str]] = None) -> None:
+    """render_cost_html 과 같은 결과를 문서 전체 문자열을 만들지 않고 fp 에 조각 단위로 씁니다."""
+    fp.writelines(COST_TEMPLATE.generate(**_cost_context(receipts, user_info)))
+
+
+def render_claim_html(claim_data: Optional[Dict[str, Any]] = None) -> str:
+    """클레임 정보로 고객 클레임 보고서 HTML 을 만듭니다."""
+    claim_data = claim_data or {}
+    claim_types = claim_data.get("클레임유형") or []
+    if isinstance(claim_types, str):
+        claim_types = [t.strip() for t in claim_types.split(",")]
+    return CLAIM_TEMPLATE.render(f=claim_data, claim_types=claim_types)
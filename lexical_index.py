@@ -0,0 +1,174 @@
+import json
+import math
+import os
+import re
+import tempfile
+import unicodedata
+from collections import Counter, defaultdict
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+from corpora import DEFAULT_CORPUS, get_corpus
+
+# 내규 corpus 의 BM25 키워드 인덱스 파일 경로 (pdf_chunking 적재 시 함께 생성, corpus·임베딩 모델별 컬렉션마다 따로)
+LEXICAL_INDEX_PATH = get_corpus(DEFAULT_CORPUS).lexical_index_path()
+
+__all__ = ["LEXICAL_INDEX_PATH", "BM25Index", "tokenize", "load_index"]
+
+# 정책 코드(PRC-301), 조항(제3조), 영문/숫자 토큰(CAPA, 5Why, 18:00 등), 한글 연속 구간
+TOKEN_PAT = re.compile(
+    r"(?P<code>[A-Za-z]+-\d+)"
+    r"|(?P<article>제\s*\d+\s*[장절조항])"
+    r"|(?P<alnum>[A-Za-z0-9]+(?:[.:][0-9]+)*)"
+    r"|(?P<hangul>[가-힣]+)"
+)
+
+# 필터에 쓰는 메타데이터 필드
+FILTER_FIELDS = ("source_file", "policy_id", "version")
+
+
+def tokenize(text: str) -> List[str]:
+    """
+    한국어 형태소 분석기 없이 쓰는 토크나이저.
+    PDF 추출 텍스트는 띄어쓰기가 자주 빠지므로 한글은 글자 bigram 으로,
+    정책 코드/조항 번호/영문·숫자는 통째로(코드는 앞뒤 부분도) 토큰화합니다.
+    """
+    tokens: List[str] = []
+    for m in TOKEN_PAT.finditer(unicodedata.normalize("NFKC", text)):
+        kind, tok = m.lastgroup, m.group(0)
+        if kind == "code":
+            tok = tok.lower()
+            tokens.append(tok)
+            tokens.extend(tok.split("-"))
+        elif kind == "article":
+            tokens.append(re.sub(r"\s+", "", tok))
+        elif kind == "alnum":
+            tokens.append(tok.lower())
+        elif len(tok) == 1:
+            tokens.append(tok)
+        else:
+            tokens.extend(tok[i:i + 2] for i in range(len(tok) - 1))
+    return tokens
+
+
+class BM25Index:
+    """청크 ID 단위 BM25 역색인. 메타데이터 필터를 먼저 적용해 후보 문서만 점수를 계산합니다."""
+
+    def __init__(self, k1: float = 1.5, b: float = 0.75):
+        self.k1 = k1
+        self.b = b
+        self.ids: List[str] = []
+        self.doc_len: List[int] = []
+        self.meta: List[Dict[str, Any]] = []
+        self.postings: Dict[str, List[Tuple[int, int]]] = {}
+        self.source_version = ""
+        self._avgdl = 0.0
+        self._by_field: Dict[str, Dict[Any, Set[int]]] = {}
+
+    @classmethod
+    def build(cls, ids: List[str], documents: List[str], metadatas: List[Dict[str, Any]],
+              source_version: str = "") -> "BM25Index":
+        index = cls()
+        postings: Dict[str, List[Tuple[int, int]]] = defaultdict(list)
+        for idx, (doc, md) in enumerate(zip(documents, metadatas)):
+            counts = Counter(tokenize(doc or ""))
+            for term, tf in counts.items():
+                postings[term].append((idx, tf))
+            index.ids.append(ids[idx])
+            index.doc_len.append(sum(counts.values()))
+            index.meta.append({f: (md or {}).get(f) for f in FILTER_FIELDS})
+        index.postings = dict(postings)
+        index.source_version = source_version
+        index._prepare()
+        return index
+
+    def _prepare(self) -> None:
+        self._avgdl = (sum(self.doc_len) / len(self.doc_len)) if self.doc_len else 0.0
+        self._by_field = {f: defaultdict(set) for f in FILTER_FIELDS}
+        for idx, md in enumerate(self.meta):
+            for f in FILTER_FIELDS:
+                self._by_field[f][md.get(f)].add(idx)
+
+    def policy_ids(self, prefix: Optional[str] = None) -> List[str]:
+        """인덱스에 있는 정책 ID 목록 (prefix 가 있으면 "HR" → HR-001 처럼 코드 앞부분이 같은 것만)"""
+        ids = [pid for pid in self._by_field.get("policy_id", {}) if pid]
+        if prefix:
+            prefix = prefix.upper().rstrip("-")
+            ids = [pid for pid in ids if pid.upper().split("-")[0] == prefix]
+        return sorted(ids)
+
+    def candidates(self, filters: Dict[str, Any]) -> Optional[Set[int]]:
+        """필터에 맞는 문서 번호 집합 (필터가 없으면 None = 전체)"""
+        result: Optional[Set[int]] = None
+        for field, value in filters.items():
+            values = value if isinstance(value, (list, tuple, set)) else [value]
+            matched: Set[int] = set()
+            for v in values:
+                matched |= self._by_field.get(field, {}).get(v, set())
+            result = matched if result is None else result & matched
+        return result
+
+    def search(self, query: str, top_k: int, filters: Optional[Dict[str, Any]] = None) -> List[Tuple[str, float]]:
+        allowed = self.candidates(filters) if filters else None
+        if allowed is not None and not allowed:
+            return []
+        n = len(self.ids)
+        scores: Dict[int, float] = defaultdict(float)
+        for term in set(tokenize(query)):
+            plist = self.postings.get(term)
+            if not plist:
+                continue
+            idf = math.log(1 + (n - len(plist) + 0.5) / (len(plist) + 0.5))
+            for idx, tf in plist:
+                if allowed is not None and idx not in allowed:
+                    continue
+                norm = self.k1 * (1 - self.b + self.b * self.doc_len[idx] / self._avgdl)
+                scores[idx] += idf * tf * (self.k1 + 1) / (tf + norm)
+        best = sorted(scores.items(), key=lambda x: -x[1])[:top_k]
+        return [(self.ids[idx], score) for idx, score in best]
+
+    def save(self, path: str = LEXICAL_INDEX_PATH) -> None:
+        data = {
+            "source_version": self.source_version,
+            "k1": self.k1,
+            "b": self.b,
+            "ids": self.ids,
+            "doc_len": self.doc_len,
+            "meta": self.meta,
+            "postings": self.postings,
+        }
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        # 검색 중인 서버가 쓰다 만 파일을 읽지 않도록 임시 파일에 쓰고 교체
+        fd, tmp = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(path)), suffix=".tmp")
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(data, f, ensure_ascii=False, separators=(",", ":"))
+        os.replace(tmp, path)
+
+    @classmethod
+    def load(cls, path: str = LEXICAL_INDEX_PATH) -> "BM25Index":
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        index = cls(k1=data["k1"], b=data["b"])
+        index.ids = data["ids"]
+        index.doc_len = data["doc_len"]
+        index.meta = data["meta"]
+        index.postings = {term: [tuple(p) for p in plist] for term, plist in data["postings"].items()}
+        index.source_version = data.get("source_version", "")
+        index._prepare()
+        return index
+
+
+# 경로 → (mtime, 인덱스)
+_loaded: Dict[str, Tuple[int, BM25Index]] = {}
+
+
+def load_index(path: str = LEXICAL_INDEX_PATH) -> Optional[BM25Index]:
+    """인덱스 파일을 읽어 둡니다 (파일별). 파일이 바뀌면(재적재) 다시 읽고, 없으면 None."""
+    try:
+        mtime = os.stat(path).st_mtime_ns
+    except FileNotFoundError:
+        return None
+    cached = _loaded.get(path)
+    if cached is None or cached[0] != mtime:
+        cached = (mtime, BM25Index.load(path))
+        _loaded[path] = cached
+    return cached[1]
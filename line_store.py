@@ -0,0 +1,390 @@
+"""
+OCR 라인 보관소 (감사용, 장기 보관)
+
+영수증마다 OCR 라인(text/conf/bbox)을 열(column) 단위 바이너리 파일에 이어 씁니다.
+JSON 대비 크기가 작고, 읽을 때는 파일을 메모리 매핑(mmap)하므로 보관소 전체를 RAM 에 올리지 않고
+영수증 단위로 흘려 읽을 수 있습니다. 개선된 _extract_fields 를 보관소 전체에 다시 돌릴 때 사용합니다.
+
+세그먼트 디렉터리(seg-00000, seg-00001, ...) 하나의 파일 구성 (모두 little-endian):
+- 라인 단위: conf.f32 (float32), bbox.i32 (int32 x 8 = 네 꼭짓점 x,y), flags.u8 (bit0: refined),
+             text.bin (UTF-8 본문을 이어 붙인 것) + text_end.u64 (라인별 본문 끝 오프셋)
+- 영수증 단위: keys.bin + key_end.u64 (영수증 키: 이미지 sha256, import-cache 로 옮긴 것은 "ocr_cache:<캐시 키>"), ts.f64 (보관 시각),
+               line_end.u64 (영수증별 마지막 라인 다음 번호)
+line_end 를 가장 마지막에 쓰므로 쓰는 도중 프로세스가 죽어도 line_end 에 기록된 영수증까지만 읽힙니다.
+쓰는 프로세스는 각자 새 세그먼트를 만들어(디렉터리 생성은 원자적) 쓰므로, 여러 uvicorn 워커나 서버와 CLI 가
+같은 보관소에 동시에 써도 서로의 파일에 끼어 쓰지 않습니다. 기존 세그먼트에는 이어 쓰지 않습니다.
+
+사용법:
+    python line_store.py import-cache ./ocr_cache.sqlite3          # 기존 OCR 캐시의 라인을 보관소로 옮기기 (다시 실행해도 중복 없음)
+    python line_store.py reextract --workers 8 --out reextract.jsonl  # 전체 재추출 (여러 프로세스)
+    python line_store.py stats
+"""
+import argparse
+import json
+import mmap
+import os
+import re
+import sqlite3
+import threading
+import time
+from collections import Counter, deque
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+import numpy as np
+
+# 보관소 설정
+# - LINE_STORE_PATH: 보관소 디렉터리 (빈 문자열이면 보관하지 않음)
+# - LINE_STORE_SEGMENT_LINES: 세그먼트 하나에 넣을 최대 라인 수 (넘으면 다음 세그먼트로)
+# - LINE_STORE_STATS_TTL: stats() 결과를 다시 쓰는 시간(초). 세그먼트를 모두 훑으므로 /metrics 수집마다 다시 세지 않음
+LINE_STORE_PATH = os.getenv("LINE_STORE_PATH", "./ocr_lines")
+LINE_STORE_SEGMENT_LINES = int(os.getenv("LINE_STORE_SEGMENT_LINES", "2000000"))
+LINE_STORE_STATS_TTL = float(os.getenv("LINE_STORE_STATS_TTL", "30"))
+
+__all__ = ["LineStore", "Segment", "line_store"]
+
+SEGMENT_PAT = re.compile(r"^seg-(\d{5})$")
+# 파일 이름 → (dtype, 항목 하나의 값 개수)
+COLUMNS = {
+    "conf.f32": ("<f4", 1),
+    "bbox.i32": ("<i4", 8),
+    "flags.u8": ("u1", 1),
+    "text_end.u64": ("<u8", 1),
+    "key_end.u64": ("<u8", 1),
+    "ts.f64": ("<f8", 1),
+    "line_end.u64": ("<u8", 1),
+}
+BLOBS = ("text.bin", "keys.bin")
+FLAG_REFINED = 1
+# import-cache 로 옮긴 영수증의 키 접두어 (서버가 쓰는 이미지 sha256 키와 구분)
+IMPORTED_KEY_PREFIX = "ocr_cache:"
+# 재추출 작업 하나가 맡는 영수증 수
+REEXTRACT_BATCH = 20000
+
+
+def _column(directory: str, name: str, count: Optional[int] = None) -> np.ndarray:
+    """열 파일을 읽기 전용 메모리 매핑 (count 를 주면 앞 count 항목만)"""
+    dtype, width = COLUMNS[name]
+    path = os.path.join(directory, name)
+    item = np.dtype(dtype).itemsize * width
+    available = os.path.getsize(path) // item if os.path.exists(path) else 0
+    count = available if count is None else min(count, available)
+    if count == 0:
+        return np.zeros((0, width) if width > 1 else 0, dtype=dtype)
+    arr = np.memmap(path, dtype=dtype, mode="r", shape=(count * width,))
+    return arr.reshape(count, width) if width > 1 else arr
+
+
+def _blob(directory: str, name: str) -> Any:
+    path = os.path.join(directory, name)
+    if not os.path.exists(path) or os.path.getsize(path) == 0:
+        return b""
+    with open(path, "rb") as f:
+        return mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+
+class Segment:
+    """세그먼트 하나의 읽기 전용 뷰. 열 때까지 기록이 끝난 영수증만 보입니다."""
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        self.line_end = _column(directory, "line_end.u64")
+        self.n_lines = int(self.line_end[-1]) if len(self.line_end) else 0
+        self.conf = _column(directory, "conf.f32", self.n_lines)
+        self.bbox = _column(directory, "bbox.i32", self.n_lines)
+        self.flags = _column(directory, "flags.u8", self.n_lines)
+        self.text_end = _column(directory, "text_end.u64", self.n_lines)
+        self.key_end = _column(directory, "key_end.u64", len(self.line_end))
+        self.ts = _column(directory, "ts.f64", len(self.line_end))
+        self.text = _blob(directory, "text.bin")
+        self.keys = _blob(directory, "keys.bin")
+
+    def __len__(self) -> int:
+        return len(self.line_end)
+
+    def key(self, i: int) -> str:
+        start = int(self.key_end[i - 1]) if i else 0
+        return self.keys[start:int(self.key_end[i])].decode("utf-8")
+
+    def lines(self, i: int) -> List[Dict[str, Any]]:
+        """영수증 i 의 라인 (Ocr_Recorder._ocr_lines 와 같은 형식, conf 는 float32 정밀도)"""
+        start = int(self.line_end[i - 1]) if i else 0
+        stop = int(self.line_end[i])
+        if start == stop:
+            return []
+        ends = self.text_end[start:stop].tolist()
+        text_start = int(self.text_end[start - 1]) if start else 0
+        confs = self.conf[start:stop].tolist()
+        boxes = self.bbox[start:stop].reshape(-1, 4, 2).tolist()
+        flags = self.flags[start:stop].tolist()
+        lines = []
+        for end, conf, box, flag in zip(ends, confs, boxes, flags):
+            line = {"text": self.text[text_start:end].decode("utf-8"), "conf": conf, "bbox": box}
+            if flag & FLAG_REFINED:
+                line["refined"] = True
+            lines.append(line)
+            text_start = end
+        return lines
+
+    def receipts(self, start: int = 0, stop: Optional[int] = None) -> Iterator[Tuple[str, float, List[Dict[str, Any]]]]:
+        """(키, 보관 시각, 라인) 을 영수증 순서대로"""
+        for i in range(start, len(self) if stop is None else min(stop, len(self))):
+            yield self.key(i), float(self.ts[i]), self.lines(i)
+
+
+class _SegmentWriter:
+    """이 프로세스가 새로 만든(차지한) 세그먼트 끝에 영수증을 이어 씁니다."""
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        self.n_lines = 0
+        self.text_bytes = 0
+        self.key_bytes = 0
+        self.files = {name: open(os.path.join(directory, name), "ab") for name in (*COLUMNS, *BLOBS)}
+
+    def append(self, key: str, lines: List[Dict[str, Any]], ts: float) -> None:
+        texts = [(line.get("text") or "").encode("utf-8") for line in lines]
+        boxes = []
+        for line in lines:
+            points = line.get("bbox") or [[0, 0]] * 4
+            if len(points) != 4:
+                raise ValueError(f"bbox 는 꼭짓점 4개여야 합니다: {points}")
+            boxes.append(points)
+        text_end = np.cumsum([len(t) for t in texts], dtype=np.uint64) + np.uint64(self.text_bytes)
+        encoded_key = key.encode("utf-8")
+
+        f = self.files
+        f["conf.f32"].write(np.asarray([line.get("conf", 0.0) for line in lines], dtype="<f4").tobytes())
+        f["bbox.i32"].write(np.asarray(boxes, dtype="<i4").reshape(-1, 8).tobytes())
+        f["flags.u8"].write(bytes(FLAG_REFINED if line.get("refined") else 0 for line in lines))
+        f["text.bin"].write(b"".join(texts))
+        f["text_end.u64"].write(text_end.astype("<u8").tobytes())
+        f["keys.bin"].write(encoded_key)
+        f["key_end.u64"].write(np.asarray([self.key_bytes + len(encoded_key)], dtype="<u8").tobytes())
+        f["ts.f64"].write(np.asarray([ts], dtype="<f8").tobytes())
+        for name in (*BLOBS, *COLUMNS):
+            if name != "line_end.u64":
+                f[name].flush()
+        # 커밋 표시: 이 값이 기록된 영수증만 읽힌다
+        f["line_end.u64"].write(np.asarray([self.n_lines + len(lines)], dtype="<u8").tobytes())
+        f["line_end.u64"].flush()
+
+        self.n_lines += len(lines)
+        self.text_bytes = int(text_end[-1]) if len(lines) else self.text_bytes
+        self.key_bytes += len(encoded_key)
+
+    def close(self) -> None:
+        for fp in self.files.values():
+            fp.close()
+
+
+class LineStore:
+    """
+    세그먼트 디렉터리 목록. 쓰는 프로세스마다 자기 세그먼트를 만들어 쓰고,
+    읽기는 여러 프로세스에서 동시에 할 수 있습니다.
+    """
+
+    def __init__(self, path: str, segment_lines: int = LINE_STORE_SEGMENT_LINES):
+        self.path = path
+        self.segment_lines = segment_lines
+        self._lock = threading.Lock()
+        self._writer: Optional[_SegmentWriter] = None
+        self._stats: Optional[Dict[str, Any]] = None
+        self._stats_at = float("-inf")
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.path)
+
+    def segment_dirs(self) -> List[str]:
+        if not os.path.isdir(self.path):
+            return []
+        names = sorted(name for name in os.listdir(self.path) if SEGMENT_PAT.match(name))
+        return [os.path.join(self.path, name) for name in names]
+
+    def segments(self) -> List[Segment]:
+        return [Segment(directory) for directory in self.segment_dirs()]
+
+    def _claim_segment(self) -> str:
+        """
+        마지막 번호 다음의 빈 세그먼트 디렉터리를 만들어 차지합니다.
+        os.mkdir 은 이미 있으면 실패하므로 여러 프로세스가 같은 세그먼트를 차지하지 않습니다.
+        """
+        os.makedirs(self.path, exist_ok=True)
+        dirs = self.segment_dirs()
+        number = int(SEGMENT_PAT.match(os.path.basename(dirs[-1])).group(1)) + 1 if dirs else 0
+        while True:
+            directory = os.path.join(self.path, f"seg-{number:05d}")
+            try:
+                os.mkdir(directory)
+                return directory
+            except FileExistsError:
+                number += 1
+
+    def _current_writer(self) -> _SegmentWriter:
+        if self._writer is not None and self._writer.n_lines < self.segment_lines:
+            return self._writer
+        if self._writer is not None:
+            self._writer.close()
+        self._writer = _SegmentWriter(self._claim_segment())
+        return self._writer
+
+    def append(self, key: str, lines: List[Dict[str, Any]], ts: Optional[float] = None) -> None:
+        if not self.enabled:
+            return
+        with self._lock:
+            self._current_writer().append(key, lines, time.time() if ts is None else ts)
+
+    def close(self) -> None:
+        with self._lock:
+            if self._writer is not None:
+                self._writer.close()
+                self._writer = None
+
+    def __iter__(self) -> Iterator[Tuple[str, float, List[Dict[str, Any]]]]:
+        for segment in self.segments():
+            yield from segment.receipts()
+
+    def keys(self) -> Iterator[str]:
+        """보관된 영수증 키 (라인은 읽지 않음)"""
+        for segment in self.segments():
+            for i in range(len(segment)):
+                yield segment.key(i)
+
+    def stats(self, max_age: float = LINE_STORE_STATS_TTL) -> Dict[str, Any]:
+        """세그먼트/영수증/라인 수와 크기. max_age 초 안에 센 결과가 있으면 그대로 반환합니다."""
+        now = time.monotonic()
+        if self._stats is None or now - self._stats_at > max_age:
+            self._stats = self._scan_stats()
+            self._stats_at = now
+        return dict(self._stats)
+
+    def _scan_stats(self) -> Dict[str, Any]:
+        receipts = lines = size = 0
+        for directory in self.segment_dirs():
+            line_end = _column(directory, "line_end.u64")
+            receipts += len(line_end)
+            lines += int(line_end[-1]) if len(line_end) else 0
+            size += sum(entry.stat().st_size for entry in os.scandir(directory) if entry.is_file())
+        return {
+            "enabled": self.enabled,
+            "segments": len(self.segment_dirs()),
+            "receipts": receipts,
+            "lines": lines,
+            "size_bytes": size,
+        }
+
+
+line_store = LineStore(LINE_STORE_PATH)
+
+
+def _reextract_range(directory: str, start: int, stop: int) -> Tuple[List[str], Counter]:
+    """워커 프로세스: 세그먼트의 [start, stop) 영수증을 다시 추출해 JSON 줄과 누락 필드 수를 반환"""
+    from Ocr_Recorder import _extract_fields
+
+    out: List[str] = []
+    missing: Counter = Counter()
+    for key, ts, lines in Segment(directory).receipts(start, stop):
+        parsed = _extract_fields(lines)
+        for field in ("business_reg_no", "trade_date", "amount"):
+            if not parsed.get(field):
+                missing[field] += 1
+        if not parsed.get("merchant", {}).get("name"):
+            missing["merchant_name"] += 1
+        out.append(json.dumps({"key": key, "ts": ts, **parsed}, ensure_ascii=False))
+    return out, missing
+
+
+def reextract(store: LineStore, out_path: str, workers: int = os.cpu_count() or 1,
+              batch: int = REEXTRACT_BATCH) -> Dict[str, Any]:
+    """
+    보관소 전체에 _extract_fields 를 다시 실행해 영수증별 결과를 out_path 에 JSON 줄로 씁니다 (보관 순서 유지).
+    워커마다 세그먼트를 직접 mmap 해서 읽으므로 부모 프로세스는 진행 중인 작업 결과만 들고 있습니다.
+    시작 시점까지 기록된 영수증만 처리합니다.
+    """
+    started = time.perf_counter()
+    tasks = [
+        (segment.directory, start, min(start + batch, len(segment)))
+        for segment in store.segments()
+        for start in range(0, len(segment), batch)
+    ]
+    missing: Counter = Counter()
+    receipts = 0
+    with open(out_path, "w", encoding="utf-8") as out:
+        def _write(result: Tuple[List[str], Counter]) -> None:
+            nonlocal receipts
+            rows, counts = result
+            for row in rows:
+                out.write(row + "\n")
+            receipts += len(rows)
+            missing.update(counts)
+
+        if workers <= 0:
+            for task in tasks:
+                _write(_reextract_range(*task))
+        else:
+            # 앞선 작업이 끝나야 쓸 수 있으므로 미리 제출하는 작업 수를 제한해 결과가 쌓이지 않게 한다
+            with ProcessPoolExecutor(max_workers=workers) as executor:
+                pending: deque = deque()
+                for task in tasks:
+                    pending.append(executor.submit(_reextract_range, *task))
+                    if len(pending) >= workers * 2:
+                        _write(pending.popleft().result())
+                while pending:
+                    _write(pending.popleft().result())
+    elapsed = time.perf_counter() - started
+    return {
+        "receipts": receipts,
+        "elapsed_seconds": round(elapsed, 3),
+        "receipts_per_second": round(receipts / elapsed, 1) if elapsed else 0.0,
+        "missing": dict(missing),
+    }
+
+
+def import_ocr_cache(store: LineStore, cache_path: str) -> int:
+    """
+    OCR 캐시(SQLite, JSON 라인)의 항목을 보관소에 추가하고 추가한 수를 반환합니다. 시각은 캐시 마지막 사용 시각.
+    캐시 키는 이미지 sha256 이 아니라 (이미지, 언어, 모델/전처리 버전)의 해시라 서버가 쓰는 키로 바꿀 수 없으므로
+    IMPORTED_KEY_PREFIX 를 붙여 키 종류를 구분합니다. 이미 보관소에 있는 키는 건너뛰므로 다시 실행해도 중복되지 않습니다.
+    """
+    existing = set(store.keys())
+    conn = sqlite3.connect(cache_path)
+    count = 0
+    try:
+        for key, payload, last_used in conn.execute("SELECT key, lines, last_used FROM ocr_lines ORDER BY last_used"):
+            key = IMPORTED_KEY_PREFIX + key
+            if key in existing:
+                continue
+            store.append(key, json.loads(payload), last_used)
+            existing.add(key)
+            count += 1
+    finally:
+        conn.close()
+        store.close()
+    return count
+
+
+def main():
+    parser = argparse.ArgumentParser(description="OCR 라인 보관소")
+    parser.add_argument("--path", default=LINE_STORE_PATH, help="보관소 디렉터리")
+    sub = parser.add_subparsers(dest="command", required=True)
+    imp = sub.add_parser("import-cache", help="OCR 캐시 SQLite 의 라인을 보관소로 옮기기")
+    imp.add_argument("cache", nargs="?", default="./ocr_cache.sqlite3")
+    rex = sub.add_parser("reextract", help="보관된 라인으로 필드를 다시 추출")
+    rex.add_argument("--out", default="reextract.jsonl")
+    rex.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="프로세스 수 (0이면 현재 프로세스)")
+    rex.add_argument("--batch", type=int, default=REEXTRACT_BATCH, help="작업 하나가 맡는 영수증 수")
+    sub.add_parser("stats", help="세그먼트/영수증/라인 수와 크기")
+    args = parser.parse_args()
+
+    store = LineStore(args.path)
+    if args.command == "import-cache":
+        print(f"{import_ocr_cache(store, args.cache)}개 영수증을 {args.path} 에 추가했습니다.")
+    elif args.command == "reextract":
+        print(json.dumps(reextract(store, args.out, args.workers, args.batch), ensure_ascii=False))
+    else:
+        print(json.dumps(store.stats(max_age=0), ensure_ascii=False))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,54 +1,296 @@
-from fastapi import FastAPI, HTTPException
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, File, HTTPException, UploadFile
+from fastapi.responses import JSONResponse
 from fastmcp import FastMCP
+import asyncio
+import base64
 import json
 import os
-from pdf_chunking import collection
-from typing import List, Dict, Any, Optional
+import shutil
+import tempfile
+from pdf_chunking import collection_version
+from corpora import CORPORA, DEFAULT_CORPUS, get_corpus, resolve_corpora
+from typing import List, Dict, Any, Optional, Union
 import re
 from Ocr_Recorder import _decode_image_b64, _ocr_lines, _extract_fields
+import ocr_pool
+import policy_search
+from policy_search import SEARCH_MODE
+from ocr_cache import cache as ocr_cache
+from receipt_index import image_phash, image_sha256, receipt_index
+from line_store import line_store
+from query_cache import embedding_cache, normalize_query, result_cache
+import admission
+import telemetry
+from admission import Busy
 from PIL import Image
-from jinja2 import Template
+from forms import render_claim_html, render_cost_html
+from expense_reports import REPORT_OUTPUT_ROOT, generate_reports
 
 mcp = FastMCP("MES-MCP")
 mcp_app = mcp.http_app()
 
+# extract_receipt_core_fields_from_file 도구가 읽을 수 있는 영수증 파일 루트 디렉터리
+RECEIPT_FILE_ROOT = os.path.realpath(os.getenv("RECEIPT_FILE_ROOT", "./receipts"))
+
+# 서버 시작 시 OCR 모델을 백그라운드에서 미리 로드 (0이면 첫 요청 시 로드)
+OCR_WARMUP = os.getenv("OCR_WARMUP", "1") == "1"
+# 서버 시작 시 임베딩 모델과 corpus 별 HNSW/BM25 인덱스를 백그라운드에서 미리 로드 (0이면 첫 검색 시 로드)
+SEARCH_WARMUP = os.getenv("SEARCH_WARMUP", "1") == "1"
+
+
+async def _warm_up_ocr():
+    report = await ocr_pool.warm_up()
+    print(f"OCR warm-up 완료: {json.dumps(report, ensure_ascii=False)}")
+
+
+async def _warm_up_search():
+    report = await asyncio.to_thread(policy_search.warm_up)
+    print(f"검색 warm-up 완료: {json.dumps(report, ensure_ascii=False)}")
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    async with mcp_app.lifespan(app):
+        # 모델 로드를 기다리지 않고 바로 서빙 시작 (/ready 로 준비 상태 확인)
+        warm_tasks = [
+            asyncio.create_task(warm_up())
+            for enabled, warm_up in ((OCR_WARMUP, _warm_up_ocr), (SEARCH_WARMUP, _warm_up_search))
+            if enabled
+        ]
+        try:
+            yield
+        finally:
+            for warm_task in warm_tasks:
+                warm_task.cancel()
+            ocr_pool.shutdown()
+            ocr_cache.flush()
+            line_store.close()
+
+
 app = FastAPI(
     title="MES API + MCP",
     description="REST API와 MCP를 동시에 제공하는 통합 서버",
     version="1.0.0",
-    lifespan=mcp_app.lifespan
+    lifespan=lifespan
 )
 
 
+@app.exception_handler(Busy)
+async def busy_handler(request, exc: Busy):
+    """동시 실행 제한에 걸린 REST 요청은 503 + Retry-After 로 바로 응답"""
+    return JSONResponse(
+        status_code=503,
+        headers={"Retry-After": str(exc.retry_after)},
+        content={"error": "busy", "lane": exc.lane, "retry_after": exc.retry_after, "detail": str(exc)},
+    )
+
+
+@app.get("/ready")
+def ready():
+    """OCR 모델 로드가 끝나야 200 을 반환하는 readiness probe"""
+    if not ocr_pool.is_ready():
+        return JSONResponse(status_code=503, content={"ready": False})
+    return {"ready": True}
+
+
+@app.get("/ocr/cache/stats")
+def ocr_cache_stats():
+    """OCR 결과 캐시 적중/미스 통계"""
+    return ocr_cache.stats()
+
+
+@app.get("/metrics")
+def metrics():
+    """
+    캐시 통계 + 도구별 요청 수/오류 수/동시 실행 수/지연시간(p50/p95/p99)
+    + 구간별(OCR 디코딩/인식, 필드 추출, 임베딩, 벡터 검색 등) 지연시간
+    """
+    return {
+        "ocr_cache": ocr_cache.stats(),
+        "query_embedding_cache": embedding_cache.stats(),
+        "query_result_cache": result_cache.stats(),
+        "receipt_index": receipt_index.stats(),
+        "line_store": line_store.stats(),
+        "collection_version": collection_version(),
+        "collection_versions": {name: collection_version(name) for name in CORPORA},
+        "admission": admission.stats(),
+        **telemetry.snapshot(),
+    }
+
+
+
+# corpus → 마지막으로 본 컬렉션 버전
+_search_state: Dict[str, str] = {}
+
+
+def _collection_versions(corpora: List[str]) -> tuple:
+    versions = tuple(collection_version(name) for name in corpora)
+    if any(_search_state.get(name, ver) != ver for name, ver in zip(corpora, versions)):
+        # 적재로 컬렉션이 바뀌면 이전 검색 결과는 모두 버린다
+        result_cache.clear()
+    _search_state.update(zip(corpora, versions))
+    return versions
+
+
+def _search_key(corpus: str, normalized: str, top_k: int, mode: str, source_file: Optional[str],
+                policy_prefix: Optional[str], version: Optional[str], collection_ver: str) -> tuple:
+    key = (normalized, top_k, mode, source_file, policy_prefix, version, collection_ver)
+    # 내규 검색 결과는 searcing_chromadb 와 searcing_chromadb_batch 가 캐시를 함께 쓴다
+    return key if corpus == DEFAULT_CORPUS else (corpus,) + key
+
+
+def _with_timing(payload: str) -> str:
+    # 디버깅용: 검색 응답(JSON 문자열)에 이번 호출의 구간별 시간을 덧붙임
+    data = json.loads(payload)
+    if not isinstance(data, dict):
+        data = {"results": data}
+    data["timing"] = telemetry.breakdown()
+    return json.dumps(data, ensure_ascii=False)
+
 
 @mcp.tool()
-def searcing_chromadb(query: str, top_k: int = 5):
-    """ChromaDB에서 회사 내규 문서를 검색합니다."""
-    results = collection.query(
-        query_texts=[query],
-        n_results=top_k,
-        include=["documents", "metadatas"]
-    )
-    response = []
-    for doc, meta in zip(results["documents"][0], results["metadatas"][0]):
-        response.append({
-            "document": doc,
-            "metadata": meta
-        })
-    return json.dumps(response, ensure_ascii=False, indent=2)
+@telemetry.track()
+@admission.limit("search")
+def searcing_chromadb(query: str, top_k: int = 5, mode: str = SEARCH_MODE,
+                      source_file: Optional[str] = None, policy_prefix: Optional[str] = None,
+                      version: Optional[str] = None, response_format: str = "full",
+                      max_chars: Optional[int] = None, max_tokens: Optional[int] = None,
+                      timing: bool = False):
+    """
+    ChromaDB에서 회사 내규 문서를 검색합니다.
+    - mode: "hybrid"(기본, 의미 검색 + 키워드 BM25 융합), "vector", "lexical"
+      정책 코드(PRC-301)나 조항 번호(제3조)처럼 정확한 용어가 중요한 질문은 hybrid/lexical 이 유리합니다.
+    - source_file: 특정 PDF 파일명으로 제한
+    - policy_prefix: 정책 코드 접두어로 제한 (HR, FIN, SEC, PRC, QMS)
+    - version: 정책 버전으로 제한 (예: "2.0")
+    - response_format: "full"(기존 형식), "compact"(짧은 JSON, 같은 페이지 연속 청크 병합),
+      "snippets"(ID + 앞부분만, 전체 본문은 get_policy_chunks 로 조회)
+    - max_chars / max_tokens: 응답 전체 크기 상한 (넘치면 뒤 순위부터 생략하고 본문을 자름)
+    - timing: True 면 응답을 {"results": ..., "timing": {구간: ms}} 로 감싸 구간별 소요 시간을 함께 반환 (디버깅용)
+    """
+    (collection_ver,) = _collection_versions([DEFAULT_CORPUS])
+
+    # 정규화한 질의는 캐시 키에만 쓰고, 검색(임베딩/BM25)은 원래 질의로 한다
+    normalized = normalize_query(query)
+    cache_key = _search_key(DEFAULT_CORPUS, normalized, top_k, mode, source_file, policy_prefix, version, collection_ver)
+    with telemetry.span("search.cache_lookup"):
+        hits = result_cache.get(cache_key)
+    if hits is None:
+        hits = policy_search.search(
+            query, top_k, mode,
+            source_file=source_file, policy_prefix=policy_prefix, version=version,
+        )
+        result_cache.put(cache_key, hits)
+    with telemetry.span("search.format"):
+        payload = policy_search.format_results(hits, response_format, max_chars=max_chars, max_tokens=max_tokens)
+    return _with_timing(payload) if timing else payload
+
 
 @mcp.tool()
-def extract_receipt_core_fields(image_b64: str, mime_type: str = "image/jpeg", language: List[str] = ["ko", "en"]) -> Dict[str, Any]:
+@telemetry.track()
+@admission.limit("search")
+def searcing_chromadb_batch(queries: List[str], top_k: int = 5, mode: str = SEARCH_MODE,
+                            source_file: Optional[str] = None, policy_prefix: Optional[str] = None,
+                            version: Optional[str] = None, corpus: str = DEFAULT_CORPUS,
+                            response_format: str = "compact",
+                            max_chars: Optional[int] = None, max_tokens: Optional[int] = None,
+                            timing: bool = False):
     """
-    영수증 이미지(base64)를 입력받아 필수 필드를 추출합니다.
-    - 거래일자, 결제금액, 가맹점 정보(이름/전화), 결제수단, 사업자번호
-    
-    OCR 실패 시 ask_for_missing_field 도구로 사용자에게 정보를 요청합니다.
+    여러 질문을 한 번에 검색합니다 (예: 경비 한도, 결재선, 영수증 규정, 법인카드 규정을 한 호출로).
+    질의 임베딩은 한 번의 배치로 계산하고 벡터 검색도 한 번에 실행합니다.
+    - 응답: {"results": [{"query", "refs"}], "chunks": [...]}
+      여러 질문에 함께 걸린 청크는 chunks 에 한 번만 들어가고, 질문별 결과는 chunks 의 번호(refs, 관련도 순)로 가리킵니다.
+    - corpus: 검색할 문서 묶음 ("policies" 기본, "scenarios")
+    - 필터는 모든 질문에 공통이며, 나머지 옵션은 searcing_chromadb 와 같습니다 (max_chars/max_tokens 는 응답 전체 기준).
     """
-    img_np = _decode_image_b64(image_b64)
-    lines = _ocr_lines(img_np)
-    parsed = _extract_fields(lines)
-    parsed["raw_lines"] = [{"text": l["text"], "conf": l["conf"]} for l in lines]
+    if not queries:
+        raise ValueError("queries 가 비어 있습니다.")
+    if len(queries) > policy_search.SEARCH_BATCH_MAX_QUERIES:
+        raise ValueError(f"질문은 한 번에 최대 {policy_search.SEARCH_BATCH_MAX_QUERIES}개까지 검색할 수 있습니다.")
+    (collection_ver,) = _collection_versions([get_corpus(corpus).name])
+
+    normalized = [normalize_query(q) for q in queries]
+    # 정규화 결과가 같은 질의는 한 번만 검색 (검색에는 처음 나온 원래 질의를 사용)
+    originals: Dict[str, str] = {}
+    for q, n in zip(queries, normalized):
+        originals.setdefault(n, q)
+    unique = list(originals)
+    keys = {
+        q: _search_key(corpus, q, top_k, mode, source_file, policy_prefix, version, collection_ver) for q in unique
+    }
+    with telemetry.span("search.cache_lookup"):
+        found = {q: result_cache.get(keys[q]) for q in unique}
+    missing = [q for q in unique if found[q] is None]
+    if missing:
+        searched = policy_search.search_many(
+            [originals[q] for q in missing], top_k, mode,
+            source_file=source_file, policy_prefix=policy_prefix, version=version, corpus=corpus,
+        )
+        for q, hits in zip(missing, searched):
+            result_cache.put(keys[q], hits)
+            found[q] = hits
+    with telemetry.span("search.format"):
+        payload = policy_search.format_batch_results(
+            queries, [found[q] for q in normalized], response_format, max_chars=max_chars, max_tokens=max_tokens,
+        )
+    return _with_timing(payload) if timing else payload
+
+
+@mcp.tool()
+@telemetry.track()
+@admission.limit("search")
+def search_documents(query: str, corpora: Optional[List[str]] = None, top_k: int = 5, mode: str = SEARCH_MODE,
+                     source_file: Optional[str] = None, policy_prefix: Optional[str] = None,
+                     version: Optional[str] = None, response_format: str = "full",
+                     max_chars: Optional[int] = None, max_tokens: Optional[int] = None,
+                     timing: bool = False):
+    """
+    여러 문서 묶음(corpus)을 동시에 검색해 관련도 점수 순으로 합친 결과를 반환합니다. 결과마다 corpus 가 표시됩니다.
+    - corpora: 검색할 corpus 목록 (생략하면 전체)
+      "policies"(회사 내규), "scenarios"(제조 의사결정 시나리오: 공장 현황, 잔업/교대, 설비 증설, 외주, 납기 재협상)
+    - 나머지 옵션은 searcing_chromadb 와 같습니다. (policy_prefix/version 필터는 내규에만 해당)
+    """
+    names = [c.name for c in resolve_corpora(corpora)]
+    versions = _collection_versions(names)
+
+    normalized = normalize_query(query)
+    cache_key = ("corpora", normalized, top_k, mode, tuple(names), source_file, policy_prefix, version, versions)
+    with telemetry.span("search.cache_lookup"):
+        hits = result_cache.get(cache_key)
+    if hits is None:
+        hits = policy_search.search_corpora(
+            query, names, top_k, mode,
+            source_file=source_file, policy_prefix=policy_prefix, version=version,
+        )
+        result_cache.put(cache_key, hits)
+    with telemetry.span("search.format"):
+        payload = policy_search.format_results(hits, response_format, max_chars=max_chars, max_tokens=max_tokens)
+    return _with_timing(payload) if timing else payload
+
+
+@mcp.tool()
+@telemetry.track()
+@admission.limit("search")
+def get_policy_chunks(ids: List[str], response_format: str = "compact",
+                      max_chars: Optional[int] = None, max_tokens: Optional[int] = None,
+                      corpus: Optional[str] = DEFAULT_CORPUS):
+    """
+    searcing_chromadb / search_documents(response_format="snippets") 가 돌려준 청크 ID 로 전체 본문을 조회합니다.
+    응답 형식과 크기 상한은 searcing_chromadb 와 같습니다.
+    - corpus: 청크가 속한 corpus (search_documents 결과의 corpus 값, null 이면 모든 corpus 에서 찾음)
+    """
+    hits = policy_search.fetch_chunks(ids, corpus)
+    with telemetry.span("search.format"):
+        return policy_search.format_results(hits, response_format, max_chars=max_chars, max_tokens=max_tokens)
+
+def _build_receipt_result(lines: List[Dict[str, Any]]) -> Dict[str, Any]:
+    with telemetry.span("extract.fields"):
+        parsed = _extract_fields(lines)
+    # refined: 2차 부분 재인식으로 값 부분을 다시 읽은 줄
+    parsed["raw_lines"] = [
+        {"text": l["text"], "conf": l["conf"], **({"refined": True} if l.get("refined") else {})} for l in lines
+    ]
     
     # 부족한 필드 확인
     missing_fields = []
@@ -69,7 +311,117 @@ def extract_receipt_core_fields(image_b64: str, mime_type: str = "image/jpeg", l
     
     return parsed
 
+def _flag_duplicates(parsed: Dict[str, Any], source: Union[bytes, str], label: Optional[str] = None) -> Dict[str, Any]:
+    """
+    이전에 제출된 영수증과 필드(사업자번호/거래일자/금액/전화) 또는 이미지 해시가 겹치면
+    duplicate_candidates 에 후보를, possible_duplicate 에 여부를 기록하고 이 영수증을 색인에 추가합니다.
+    똑같은 이미지를 다시 보낸 경우(재시도/재추출)는 중복이 아니라 previously_seen 에 이전 제출을 기록합니다.
+    """
+    if not receipt_index.enabled:
+        return parsed
+    with telemetry.span("receipt.image_hash"):
+        try:
+            phash = image_phash(source)
+        except Exception:
+            phash = None
+        image_sha = image_sha256(source)
+    with telemetry.span("receipt.duplicate_check"):
+        matches, previous = receipt_index.check_and_add(parsed, phash, image_sha, label)
+    parsed["possible_duplicate"] = bool(matches)
+    if matches:
+        parsed["duplicate_candidates"] = matches
+    if previous:
+        parsed["previously_seen"] = previous
+    return parsed
+
+def _finish_receipt(lines: List[Dict[str, Any]], source: Union[bytes, str], label: Optional[str] = None) -> Dict[str, Any]:
+    """
+    필드 추출 → 중복 검사. 파일 읽기/해시가 있으므로 스레드에서 실행합니다.
+    (OCR 라인 보관은 새로 OCR 한 경우에만 ocr_pool 에서 합니다)
+    """
+    return _flag_duplicates(_build_receipt_result(lines), source, label)
+
+def _attach_timing(parsed: Dict[str, Any], timing: bool) -> Dict[str, Any]:
+    if timing:
+        parsed["timing"] = telemetry.breakdown()
+    return parsed
+
 @mcp.tool()
+@telemetry.track()
+@admission.limit("ocr")
+async def extract_receipt_core_fields(image_b64: str, mime_type: str = "image/jpeg", language: List[str] = ["ko", "en"],
+                                      timing: bool = False) -> Dict[str, Any]:
+    """
+    영수증 이미지(base64)를 입력받아 필수 필드를 추출합니다.
+    - 거래일자, 결제금액, 가맹점 정보(이름/전화), 결제수단, 사업자번호
+    
+    OCR 실패 시 ask_for_missing_field 도구로 사용자에게 정보를 요청합니다.
+    이전에 제출된 영수증과 중복으로 보이면 possible_duplicate / duplicate_candidates 로 알려줍니다.
+    같은 이미지를 다시 보낸 경우에는 중복이 아니라 previously_seen 에 이전 제출 정보가 담깁니다.
+    timing=True 면 구간별 소요 시간(ms)을 timing 필드로 함께 반환합니다 (디버깅용).
+    """
+    with telemetry.span("ocr.b64_decode"):
+        img_bytes = base64.b64decode(image_b64)
+    # OCR 은 워커 프로세스에서 실행 (이벤트 루프 블로킹 방지)
+    lines = await ocr_pool.ocr_image_bytes(img_bytes)
+    parsed = await asyncio.to_thread(_finish_receipt, lines, img_bytes)
+    return _attach_timing(parsed, timing)
+
+@mcp.tool()
+@telemetry.track()
+@admission.limit("ocr", weight=lambda args: len(args["images"]))
+async def extract_receipt_core_fields_batch(images: List[str], mime_type: str = "image/jpeg", language: List[str] = ["ko", "en"]) -> List[Dict[str, Any]]:
+    """
+    여러 장의 영수증 이미지(base64 목록)를 한 번에 처리합니다.
+    OCR 워커 풀에서 병렬로 실행되며, 결과는 입력 순서대로 반환됩니다.
+    개별 이미지 처리 실패 시 해당 항목에 error 필드가 담깁니다.
+    """
+    # 배치는 admission 에서 이미 받아들인 요청이므로, 워커 수만큼만 풀에 넣어
+    # 풀 대기열(OCR_QUEUE_DEPTH)을 넘겨 일부 이미지가 busy 로 거절되지 않게 한다
+    slots = asyncio.Semaphore(max(ocr_pool.OCR_WORKERS, 1))
+
+    async def _ocr_one(image_b64: str):
+        # 디코딩도 이미지별로: 잘못된 base64 한 장은 해당 항목의 error 로만 남는다
+        async with slots:
+            with telemetry.span("ocr.b64_decode"):
+                img_bytes = base64.b64decode(image_b64)
+            return img_bytes, await ocr_pool.ocr_image_bytes(img_bytes)
+
+    results = await asyncio.gather(*(_ocr_one(image_b64) for image_b64 in images), return_exceptions=True)
+    response = []
+    for index, result in enumerate(results):
+        if isinstance(result, Exception):
+            response.append({"index": index, "error": str(result)})
+            continue
+        img_bytes, lines = result
+        # 같은 배치 안의 중복도 잡히도록 입력 순서대로 색인에 추가
+        parsed = await asyncio.to_thread(_finish_receipt, lines, img_bytes)
+        parsed["index"] = index
+        response.append(parsed)
+    return response
+
+@mcp.tool()
+@telemetry.track()
+@admission.limit("ocr")
+async def extract_receipt_core_fields_from_file(file_path: str, timing: bool = False) -> Dict[str, Any]:
+    """
+    서버에 저장된 영수증 이미지 파일 경로를 입력받아 필수 필드를 추출합니다.
+    base64 대신 파일을 직접 읽으므로 큰 이미지도 요청 본문이 커지지 않습니다.
+    경로는 RECEIPT_FILE_ROOT 하위여야 합니다.
+    timing=True 면 구간별 소요 시간(ms)을 timing 필드로 함께 반환합니다 (디버깅용).
+    """
+    # 심볼릭 링크를 따라간 실제 경로로 비교 (루트 안의 링크로 바깥 파일을 읽지 못하게)
+    path = os.path.realpath(os.path.join(RECEIPT_FILE_ROOT, file_path))
+    if os.path.commonpath([path, RECEIPT_FILE_ROOT]) != RECEIPT_FILE_ROOT:
+        raise ValueError(f"허용되지 않은 경로입니다: {file_path}")
+    if not os.path.isfile(path):
+        raise ValueError(f"파일을 찾을 수 없습니다: {file_path}")
+    lines = await ocr_pool.ocr_image_file(path)
+    parsed = await asyncio.to_thread(_finish_receipt, lines, path, file_path)
+    return _attach_timing(parsed, timing)
+
+@mcp.tool()
+@telemetry.track()
 def ask_for_missing_field(field_name: str, instruction: str = "") -> Dict[str, str]:
     """
     OCR 추출 실패 시 사용자에게 정보를 요청합니다.
@@ -98,6 +450,7 @@ def ask_for_missing_field(field_name: str, instruction: str = "") -> Dict[str, s
     }
 
 @mcp.tool()
+@telemetry.track()
 def update_receipt_fields(parsed_data: Dict[str, Any], field_updates: Dict[str, str]) -> Dict[str, Any]:
     """
     OCR 추출 결과에 사용자 입력 정보를 병합합니다.
@@ -153,114 +506,104 @@ def update_receipt_fields(parsed_data: Dict[str, Any], field_updates: Dict[str,
     return result
 
 @mcp.tool()
-def generate_cost_html(receipt_data: Dict[str, Any], user_info: Dict[str, str] = None) -> str:
+@telemetry.track()
+def generate_cost_html(receipt_data: Dict[str, Any] = None, user_info: Dict[str, str] = None,
+                       receipts: List[Dict[str, Any]] = None) -> str:
     """
     OCR 추출 영수증 데이터를 지출결의서(cost.html) 템플릿에 자동으로 채웁니다.
     
     Args:
         receipt_data: extract_receipt_core_fields() 결과
         user_info: 추가 사용자 정보 
-                  (문서번호, 결재자, 작성자, 신청부서, 신청일자 등)
+                  (문서번호, 결재자, 결재일자, 작성자, 신청부서, 소속_직급, 신청일자, 신청월, 사용목적 등)
+        receipts: 여러 장을 한 결의서에 넣을 때의 영수증 목록 (receipt_data 뒤에 이어서 채움)
+                  영수증에 category(교통비/식대/사무용품/접대비/교육비/출장비)가 있으면 해당 구분 행에, 없으면 식대로 들어갑니다.
     
     Returns:
         채워진 HTML 문자열
     """
-    if user_info is None:
-        user_info = {}
-    
-    # 템플릿 파일 읽기
-    template_path = os.path.join(os.path.dirname(__file__), "template", "cost.html")
-    with open(template_path, "r", encoding="utf-8") as f:
-        template_content = f.read()
-    
-    # 치환 데이터 준비
-    receipt_date = receipt_data.get("trade_date", "")
-    receipt_amount = receipt_data.get("amount", 0)
-    merchant_name = receipt_data.get("merchant", {}).get("name", "")
-    merchant_tel = receipt_data.get("merchant", {}).get("tel", "")
-    payment_method = receipt_data.get("payment_method", "")
-    business_reg_no = receipt_data.get("business_reg_no", "")
-    
-    # 결제수단 매핑
-    payment_checkbox = ""
-    if payment_method == "card":
-        payment_checkbox = '<label class="check-item"><input type="checkbox" checked> 법인카드</label>'
-    elif payment_method == "cash":
-        payment_checkbox = '<label class="check-item"><input type="checkbox" checked> 현금</label>'
-    elif payment_method == "app_pay":
-        payment_checkbox = '<label class="check-item"><input type="checkbox" checked> 개인카드</label>'
-    
-    # 치환 맵
-    replacements = {
-        # 상단 정보
-        'placeholder="예: FIN-EXP-2025-001"': f'value="{user_info.get("문서번호", "")}"',
-        'placeholder="예: 홍길동"': f'value="{user_info.get("결재자", "")}"',
-        'placeholder="예: 2025-12-30"': f'value="{user_info.get("결재일자", "")}"',
-        'placeholder="예: 김OO"': f'value="{user_info.get("작성자", "")}"',
-        
-        # 기본정보
-        'placeholder="예: 재무회계팀"': f'value="{user_info.get("신청부서", "")}"',
-        'placeholder="예: 생산팀 / 대리"': f'value="{user_info.get("소속_직급", "")}"',
-        
-        # 지출 내역 - 첫 번째 행 (영수증 데이터 채우기)
-    }
-    
-    result = template_content
-    for old, new in replacements.items():
-        result = result.replace(old, new)
-    
-    # 지출 내역 첫 번째 행 채우기 (식대로 분류)
-    expense_row = f'''      <tr>
-        <td><label class="check-item"><input type="checkbox" checked> 식대</label></td>
-        <td><input class="field" value="{receipt_date}" placeholder="YYYY-MM-DD"></td>
-        <td><input class="field" value="{merchant_name}" placeholder="예: 회의 식비"></td>
-        <td><input class="field right" value="{receipt_amount:,}" placeholder="0"></td>
-        <td><input class="field" value="사업자: {business_reg_no}, 전화: {merchant_tel}" placeholder=""></td>
-      </tr>'''
-    
-    # 원래의 식대 행을 교체
-    old_exp_row = '''      <tr>
-        <td><label class="check-item"><input type="checkbox"> 식대</label></td>
-        <td><input class="field" placeholder="YYYY-MM-DD"></td>
-        <td><input class="field" placeholder="예: 회의 식비"></td>
-        <td><input class="field right" placeholder="0"></td>
-        <td><input class="field" placeholder=""></td>
-      </tr>'''
-    result = result.replace(old_exp_row, expense_row, 1)
-    
-    # 합계 금액 채우기
-    result = result.replace(
-        '<input class="field right" style="width:70%;" placeholder="0 원" />',
-        f'<input class="field right" style="width:70%;" value="{receipt_amount:,} 원" />'
-    )
-    
-    # 결제정보 섹션
-    result = result.replace(
-        '<input class="field right" placeholder="0"></td>\n      </tr>\n\n      <tr>\n        <td class="label">결제수단</td>',
-        f'<input class="field right" value="{receipt_amount}"></td>\n      </tr>\n\n      <tr>\n        <td class="label">결제수단</td>'
-    )
+    all_receipts = ([receipt_data] if receipt_data else []) + list(receipts or [])
+    return render_cost_html(all_receipts, user_info)
+
+@mcp.tool()
+@telemetry.track()
+def generate_claim_html(claim_data: Dict[str, Any]) -> str:
+    """
+    고객 클레임 보고서(claim.html) 템플릿을 채웁니다.
     
-    # 결제수단 체크박스 교체
-    old_payment = '''        <td class="value" colspan="3">
-          <div class="checks">
-            <label class="check-item"><input type="checkbox"> 법인카드</label>
-            <label class="check-item"><input type="checkbox"> 개인카드</label>
-            <label class="check-item"><input type="checkbox"> 현금</label>
-          </div>
-        </td>'''
+    Args:
+        claim_data: 보고서 항목
+                    (보고서번호, 작성일자, 작성자, 주관부서, 담당책임자, 클레임유형(품질/납기/서비스/Critical 목록),
+                     고객사_고객명, 발생일시, 접수채널, 핵심내용, 제품명_모델번호, 검출현상, 첨부자료, 발생원인, 유출원인,
+                     주문번호, 당초납기일, 실제지연기간, 지연사유, 관련담당자, 불편포인트, 사실관계확인,
+                     긴급조치, 규격합의여부(완료/합의 중), 원인분석결과, 재발방지조치)
     
-    new_payment = f'''        <td class="value" colspan="3">
-          <div class="checks">
-            {payment_checkbox}
-          </div>
-        </td>'''
+    Returns:
+        채워진 HTML 문자열
+    """
+    return render_claim_html(claim_data)
+
+
+
+@mcp.tool()
+@telemetry.track()
+@admission.limit("reports")
+async def generate_expense_reports(receipts: List[Dict[str, Any]], output_dir: str = "",
+                                   user_info: Dict[str, str] = None) -> Dict[str, Any]:
+    """
+    여러 영수증(extract_receipt_core_fields 결과에 user, department 를 더한 것)을
+    사용자/부서/월 별로 묶어 그룹마다 지출결의서 HTML 을 파일로 생성합니다.
+    비용 구분은 category 가 없으면 가맹점명으로 자동 분류합니다.
     
-    result = result.replace(old_payment, new_payment)
+    Args:
+        receipts: 영수증 목록
+        output_dir: REPORT_OUTPUT_ROOT 하위 출력 디렉터리 (예: "2025-01")
+        user_info: 모든 서식 공통 값 (결재자 등)
     
-    return result
+    Returns:
+        생성된 파일과 그룹별 합계/구분별 금액 (manifest)
+    """
+    path = os.path.abspath(os.path.join(REPORT_OUTPUT_ROOT, output_dir))
+    if os.path.commonpath([path, REPORT_OUTPUT_ROOT]) != REPORT_OUTPUT_ROOT:
+        raise ValueError(f"허용되지 않은 경로입니다: {output_dir}")
+    return await asyncio.to_thread(generate_reports, receipts, path, user_info)
+
+
 
+def _spool_upload(upload: UploadFile) -> str:
+    # 업로드 스트림을 청크 단위로 임시 파일에 기록 (전체를 메모리에 올리지 않음)
+    suffix = os.path.splitext(upload.filename or "")[1]
+    with tempfile.NamedTemporaryFile(suffix=suffix, delete=False) as tmp:
+        shutil.copyfileobj(upload.file, tmp, length=1 << 20)
+        return tmp.name
 
 
+@app.post("/receipts/extract")
+@telemetry.track()
+@admission.limit("ocr")
+async def upload_receipt(file: UploadFile = File(...), timing: bool = False):
+    """
+    영수증 이미지를 multipart/form-data 로 업로드받아 필수 필드를 추출합니다.
+    base64 JSON 대비 전송량이 33% 적고, 이미지는 워커가 임시 파일에서 직접 디코딩합니다.
+    ?timing=true 면 구간별 소요 시간(ms)을 timing 필드로 함께 반환합니다.
+    """
+    with telemetry.span("upload.spool"):
+        tmp_path = await asyncio.to_thread(_spool_upload, file)
+    try:
+        if os.path.getsize(tmp_path) == 0:
+            raise HTTPException(status_code=400, detail="빈 파일입니다.")
+        try:
+            lines = await ocr_pool.ocr_image_file(tmp_path)
+        except (OSError, Image.DecompressionBombError) as e:
+            # 이미지로 읽을 수 없는 업로드(형식 불명 UnidentifiedImageError, 잘린 파일 등 PIL 의 OSError)만 400,
+            # 그 밖의 실패(워커/캐시 오류 등)는 서버 오류(500)
+            raise HTTPException(status_code=400, detail=f"이미지를 처리할 수 없습니다: {e}")
+        parsed = await asyncio.to_thread(_finish_receipt, lines, tmp_path, file.filename)
+        return _attach_timing(parsed, timing)
+    finally:
+        os.unlink(tmp_path)
+        await file.close()
+
 
 app.mount("/", mcp_app)
 
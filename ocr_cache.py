@@ -0,0 +1,163 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, List, Optional
+
+# OCR 결과 캐시 설정
+# - OCR_CACHE_PATH: SQLite 파일 경로 (빈 문자열이면 캐시 비활성화)
+# - OCR_CACHE_MAX_MB: 캐시에 저장할 OCR 결과 총 크기 상한 (초과 시 오래 안 쓴 항목부터 제거)
+OCR_CACHE_PATH = os.getenv("OCR_CACHE_PATH", "./ocr_cache.sqlite3")
+OCR_CACHE_MAX_MB = float(os.getenv("OCR_CACHE_MAX_MB", "256"))
+
+# 적중 시 마지막 사용 시각(LRU) 갱신은 모아 두었다가 이 개수/간격(초)마다 한 번에 기록 (조회마다 commit 하지 않음)
+TOUCH_FLUSH_BATCH = 256
+TOUCH_FLUSH_SECONDS = 5.0
+
+__all__ = ["OcrCache", "cache", "image_key", "file_key"]
+
+
+def image_key(img_bytes: bytes, languages: List[str], model_version: str) -> str:
+    """이미지 바이트 + OCR 언어/모델 버전으로 캐시 키를 만듭니다."""
+    return _finish_key(hashlib.sha256(img_bytes), languages, model_version)
+
+
+def file_key(path: str, languages: List[str], model_version: str, chunk_size: int = 1 << 20) -> str:
+    """이미지 파일을 조금씩 읽어 image_key 와 같은 키를 만듭니다 (파일 전체를 메모리에 올리지 않음)."""
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            h.update(chunk)
+    return _finish_key(h, languages, model_version)
+
+
+def _finish_key(h: "hashlib._Hash", languages: List[str], model_version: str) -> str:
+    h.update(("|" + ",".join(languages) + "|" + model_version).encode("utf-8"))
+    return h.hexdigest()
+
+
+class OcrCache:
+    """
+    이미지 해시 → OCR 라인(text/conf/bbox) 을 저장하는 SQLite 캐시.
+    총 크기가 max_bytes 를 넘으면 마지막 사용 시각이 오래된 항목부터 제거합니다(LRU).
+    조회/저장은 디스크 I/O 이므로 이벤트 루프에서는 스레드로 호출합니다.
+    """
+
+    def __init__(self, path: str, max_bytes: int):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+        self._total_bytes = 0
+        # 아직 기록하지 않은 적중 항목의 마지막 사용 시각
+        self._touched: Dict[str, float] = {}
+        self._touch_flushed_at = time.monotonic()
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.path)
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._conn is None:
+            conn = sqlite3.connect(self.path, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS ocr_lines ("
+                " key TEXT PRIMARY KEY,"
+                " lines TEXT NOT NULL,"
+                " size INTEGER NOT NULL,"
+                " last_used REAL NOT NULL)"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS ocr_lines_last_used ON ocr_lines(last_used)")
+            self._total_bytes = conn.execute("SELECT COALESCE(SUM(size), 0) FROM ocr_lines").fetchone()[0]
+            self._conn = conn
+        return self._conn
+
+    def get(self, key: str) -> Optional[List[Dict[str, Any]]]:
+        if not self.enabled:
+            return None
+        with self._lock:
+            conn = self._connect()
+            row = conn.execute("SELECT lines FROM ocr_lines WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            self._touched[key] = time.time()
+            if (len(self._touched) >= TOUCH_FLUSH_BATCH
+                    or time.monotonic() - self._touch_flushed_at >= TOUCH_FLUSH_SECONDS):
+                self._flush_touches(conn)
+                conn.commit()
+            self.hits += 1
+        return json.loads(row[0])
+
+    def put(self, key: str, lines: List[Dict[str, Any]]) -> None:
+        if not self.enabled:
+            return
+        payload = json.dumps(lines, ensure_ascii=False, separators=(",", ":"))
+        size = len(payload.encode("utf-8"))
+        with self._lock:
+            conn = self._connect()
+            old = conn.execute("SELECT size FROM ocr_lines WHERE key = ?", (key,)).fetchone()
+            conn.execute(
+                "INSERT OR REPLACE INTO ocr_lines (key, lines, size, last_used) VALUES (?, ?, ?, ?)",
+                (key, payload, size, time.time()),
+            )
+            self._total_bytes += size - (old[0] if old else 0)
+            # 제거 순서가 최근 적중을 반영하도록 모아 둔 사용 시각을 먼저 기록
+            self._flush_touches(conn)
+            self._evict(conn)
+            conn.commit()
+
+    def _flush_touches(self, conn: sqlite3.Connection) -> None:
+        if self._touched:
+            conn.executemany(
+                "UPDATE ocr_lines SET last_used = ? WHERE key = ?",
+                [(used, key) for key, used in self._touched.items()],
+            )
+            self._touched.clear()
+        self._touch_flushed_at = time.monotonic()
+
+    def flush(self) -> None:
+        """모아 둔 마지막 사용 시각을 기록합니다 (서버 종료 시)."""
+        if not self.enabled:
+            return
+        with self._lock:
+            if self._conn is not None and self._touched:
+                self._flush_touches(self._conn)
+                self._conn.commit()
+
+    def _evict(self, conn: sqlite3.Connection) -> None:
+        while self._total_bytes > self.max_bytes:
+            rows = conn.execute(
+                "SELECT key, size FROM ocr_lines ORDER BY last_used LIMIT 64"
+            ).fetchall()
+            if not rows:
+                self._total_bytes = 0
+                break
+            for key, size in rows:
+                if self._total_bytes <= self.max_bytes:
+                    break
+                conn.execute("DELETE FROM ocr_lines WHERE key = ?", (key,))
+                self._total_bytes -= size
+                self.evictions += 1
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "enabled": self.enabled,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0,
+            "evictions": self.evictions,
+            "size_bytes": self._total_bytes,
+            "max_bytes": self.max_bytes,
+        }
+
+
+cache = OcrCache(OCR_CACHE_PATH, int(OCR_CACHE_MAX_MB * 1024 * 1024))
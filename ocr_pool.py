@@ -0,0 +1,240 @@
+import asyncio
+import base64
+import multiprocessing as mp
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, List, Optional, Tuple, Union
+
+import telemetry
+from line_store import line_store
+from ocr_cache import cache, file_key, image_key
+from receipt_index import image_sha256
+
+# OCR 워커 설정 (환경변수로 조정)
+# - OCR_WORKERS: EasyOCR 리더를 보유한 프로세스 수 (0이면 서버 프로세스의 리더 1개를 스레드에서 사용)
+# - OCR_QUEUE_DEPTH: 워커가 모두 바쁠 때 대기할 수 있는 요청 수 (넘으면 바로 busy 로 거절)
+# - OCR_SHARE_MODEL: 1이면 부모 프로세스에서 모델을 한 번 로드한 뒤 fork 하여
+#   워커들이 copy-on-write 로 같은 모델 메모리를 공유 (워커 수만큼 복사본이 생기지 않음)
+OCR_WORKERS = int(os.getenv("OCR_WORKERS", "2"))
+OCR_QUEUE_DEPTH = int(os.getenv("OCR_QUEUE_DEPTH", "16"))
+OCR_SHARE_MODEL = os.getenv("OCR_SHARE_MODEL", "0") == "1"
+
+__all__ = [
+    "OCR_WORKERS",
+    "OCR_QUEUE_DEPTH",
+    "OCR_SHARE_MODEL",
+    "start",
+    "shutdown",
+    "warm_up",
+    "is_ready",
+    "ocr_image_b64",
+    "ocr_image_bytes",
+    "ocr_image_file",
+]
+
+# warm-up 중 아직 모델을 로드 중인 워커가 있을 때 다시 확인하기까지의 간격(초)
+WARMUP_POLL_SECONDS = 0.2
+
+_executor: Optional[ProcessPoolExecutor] = None
+_slots: Optional[asyncio.Semaphore] = None
+_waiting = 0
+_start_lock = threading.Lock()
+_ready = False
+# warm-up 이 진행 중이면 준비 완료 판단은 warm-up 에 맡긴다
+_warming = False
+
+
+def _warm_up() -> None:
+    # 워커 프로세스 시작 시 EasyOCR 모델을 미리 로드해 첫 요청 지연을 없앤다
+    from Ocr_Recorder import get_reader
+
+    get_reader()
+
+
+def _probe() -> Tuple[int, Optional[float]]:
+    import Ocr_Recorder
+
+    return os.getpid(), Ocr_Recorder.reader_load_seconds
+
+
+def _ocr_job(source: Union[bytes, str]) -> Tuple[List[Dict[str, Any]], List[Tuple[str, float]]]:
+    # source: 이미지 바이트 또는 워커가 직접 읽을 파일 경로
+    # 워커에서 잰 구간 시간(디코딩/인식)은 함께 돌려보내 부모 프로세스의 지표에 반영
+    from Ocr_Recorder import OCR_REFINE, _decode_image_bytes, _decode_image_file, _ocr_lines, _refine_lines
+
+    with telemetry.capture() as stages:
+        if isinstance(source, bytes):
+            img_np = _decode_image_bytes(source)
+        else:
+            img_np = _decode_image_file(source)
+        lines = _ocr_lines(img_np)
+        if OCR_REFINE:
+            # 디코딩한 이미지가 워커에 있을 때 약한 필드 영역만 다시 인식
+            lines = _refine_lines(img_np, lines)
+    return lines, stages
+
+
+def _cache_version() -> str:
+    from Ocr_Recorder import OCR_MODEL_VERSION, OCR_REFINE, OCR_REFINE_CONF, PREPROCESS
+
+    # 전처리/재인식 설정이 다르면 bbox 좌표와 인식 결과가 달라지므로 키에 포함
+    refine = f"refine{OCR_REFINE_CONF}" if OCR_REFINE else "norefine"
+    return f"{OCR_MODEL_VERSION}|{PREPROCESS.signature()}|{refine}"
+
+
+def start() -> None:
+    """
+    OCR 프로세스 풀을 생성합니다. 이미 생성되어 있으면 아무것도 하지 않습니다.
+    OCR_SHARE_MODEL 모드에서는 모델 로드가 포함되므로 이벤트 루프 밖에서 호출해야 합니다.
+    """
+    global _executor, _slots
+    with _start_lock:
+        if _slots is None:
+            # 워커 수만큼만 실행기에 넘기고 나머지는 여기서 OCR_QUEUE_DEPTH 개까지만 기다린다
+            _slots = asyncio.Semaphore(max(OCR_WORKERS, 1))
+        if _executor is None and OCR_WORKERS > 0:
+            if OCR_SHARE_MODEL:
+                from Ocr_Recorder import get_reader
+
+                get_reader()
+                context = mp.get_context("fork")
+            else:
+                # torch 를 fork 하면 교착될 수 있으므로 기본은 spawn 사용
+                context = mp.get_context("spawn")
+            _executor = ProcessPoolExecutor(
+                max_workers=OCR_WORKERS,
+                mp_context=context,
+                initializer=_warm_up,
+            )
+
+
+def shutdown() -> None:
+    global _executor, _slots, _ready
+    with _start_lock:
+        if _executor is not None:
+            _executor.shutdown(wait=False, cancel_futures=True)
+        _executor = None
+        _slots = None
+        _ready = False
+
+
+def is_ready() -> bool:
+    """모든 OCR 모델 로드가 끝났는지 여부 (readiness probe 용)"""
+    return _ready
+
+
+async def warm_up() -> Dict[str, Any]:
+    """
+    OCR 모델을 미리 로드하고 로드 시간 리포트를 반환합니다.
+    모든 워커의 모델 로드가 끝나면 is_ready() 가 True 가 됩니다.
+    """
+    global _ready, _warming
+    started = time.perf_counter()
+    _warming = True
+    try:
+        await asyncio.to_thread(start)
+        loop = asyncio.get_running_loop()
+        if _executor is None:
+            await asyncio.to_thread(_warm_up)
+            workers = dict([await asyncio.to_thread(_probe)])
+        else:
+            # 작업은 초기화(모델 로드)가 끝난 워커만 가져가므로, 모든 워커의 pid 를 볼 때까지 반복해서 확인
+            workers: Dict[int, Optional[float]] = {}
+            while len(workers) < OCR_WORKERS:
+                probes = await asyncio.gather(
+                    *(loop.run_in_executor(_executor, _probe) for _ in range(OCR_WORKERS))
+                )
+                workers.update(probes)
+                if len(workers) < OCR_WORKERS:
+                    await asyncio.sleep(WARMUP_POLL_SECONDS)
+        _ready = True
+    finally:
+        _warming = False
+    return {
+        "mode": "process" if _executor is not None else "thread",
+        "shared_model": OCR_SHARE_MODEL,
+        "workers": [
+            {"pid": pid, "model_load_seconds": round(load_s, 3) if load_s is not None else None}
+            for pid, load_s in workers.items()
+        ],
+        "elapsed_seconds": round(time.perf_counter() - started, 3),
+    }
+
+
+async def ocr_image_b64(image_b64: str) -> List[Dict[str, Any]]:
+    """base64 이미지를 OCR 합니다. (ocr_image_bytes 참고)"""
+    return await ocr_image_bytes(base64.b64decode(image_b64))
+
+
+async def ocr_image_bytes(img_bytes: bytes) -> List[Dict[str, Any]]:
+    """
+    이미지 바이트를 OCR 워커에서 처리하고 라인 목록을 반환합니다.
+    같은 이미지는 OCR 캐시에서 바로 반환합니다.
+    이벤트 루프를 막지 않으며, 워커가 모두 바쁠 때 OCR_QUEUE_DEPTH 개를 넘는 요청은 Busy 로 거절합니다.
+    """
+    from Ocr_Recorder import OCR_LANGUAGES
+
+    key = image_key(img_bytes, OCR_LANGUAGES, _cache_version())
+    return await _ocr_cached(key, img_bytes)
+
+
+async def ocr_image_file(path: str) -> List[Dict[str, Any]]:
+    """
+    이미지 파일 경로를 OCR 합니다. 서버 프로세스는 파일을 해시만 하고,
+    디코딩은 워커가 파일에서 직접 수행하므로 이미지 사본이 프로세스 간에 오가지 않습니다.
+    """
+    from Ocr_Recorder import OCR_LANGUAGES
+
+    with telemetry.span("ocr.hash_file"):
+        key = await asyncio.to_thread(file_key, path, OCR_LANGUAGES, _cache_version())
+    return await _ocr_cached(key, path)
+
+
+async def _ocr_cached(key: str, source: Union[bytes, str]) -> List[Dict[str, Any]]:
+    global _ready, _waiting
+    # SQLite 조회/저장은 스레드에서 (이벤트 루프가 디스크 I/O 를 기다리지 않도록)
+    with telemetry.span("ocr.cache_lookup"):
+        cached = await asyncio.to_thread(cache.get, key)
+    if cached is not None:
+        return cached
+
+    if _slots is None or (_executor is None and OCR_WORKERS > 0):
+        await asyncio.to_thread(start)
+    if _slots.locked() and _waiting >= OCR_QUEUE_DEPTH:
+        # 대기열이 가득 차면 기다리지 않고 바로 거절 (admission 을 거치지 않는 호출도 대기열이 무한히 늘지 않음)
+        from admission import Busy, lanes
+
+        raise Busy("ocr", lanes["ocr"].retry_after())
+    waited = time.perf_counter()
+    _waiting += 1
+    try:
+        await _slots.acquire()
+    finally:
+        _waiting -= 1
+    try:
+        telemetry.record("ocr.queue_wait", time.perf_counter() - waited)
+        if _executor is None:
+            lines, stages = await asyncio.to_thread(_ocr_job, source)
+        else:
+            loop = asyncio.get_running_loop()
+            lines, stages = await loop.run_in_executor(_executor, _ocr_job, source)
+    finally:
+        _slots.release()
+    telemetry.merge(stages)
+    # warm-up 없이 기동한 경우 첫 OCR 성공 시점에 준비 완료로 전환
+    # (warm-up 중에는 먼저 로드된 워커가 처리한 요청만으로 준비 완료가 되지 않도록 warm-up 이 결정)
+    if not _warming:
+        _ready = True
+    with telemetry.span("ocr.cache_store"):
+        await asyncio.to_thread(cache.put, key, lines)
+    if line_store.enabled:
+        # 새로 OCR 한 결과만 보관소에 남긴다 (캐시 적중/같은 이미지 재제출은 다시 보관하지 않음)
+        with telemetry.span("ocr.archive"):
+            await asyncio.to_thread(_archive, source, lines)
+    return lines
+
+
+def _archive(source: Union[bytes, str], lines: List[Dict[str, Any]]) -> None:
+    line_store.append(image_sha256(source), lines)
@@ -1,46 +1,531 @@
+import bisect
 import chromadb
+import hashlib
 import os
+import re
+import sys
+import threading
+import time
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from dataclasses import dataclass
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from corpora import CORPORA, DEFAULT_CORPUS, get_corpus
+from embeddings import EMBEDDING, create_embedding_function
+from lexical_index import BM25Index
 
 client = chromadb.PersistentClient(path="./chroma_data")
-collection = client.get_or_create_collection(name="pdf_documents")
+# 질의 임베딩을 직접 계산/캐시할 수 있도록 임베딩 함수를 명시적으로 보관 (적재/질의 공통, EMBEDDING_* 환경변수)
+# 모든 corpus 가 같은 임베딩을 쓰므로 질의 임베딩 하나로 여러 컬렉션을 검색할 수 있습니다.
+embedding_function = create_embedding_function(EMBEDDING)
+
+__all__ = [
+    "collection", "embedding_function", "get_collection", "collection_version", "add_pdf_chunk", "chunking_pdf",
+    "ingest_corpus", "ingest_policies", "build_lexical_index",
+]
+
+# 적재로 내용이 바뀔 때마다 컬렉션 메타데이터의 이 값을 갱신 (검색 캐시 무효화용)
+VERSION_KEY = "ingest_version"
+# 다른 프로세스(적재 CLI)가 바꾼 버전을 다시 읽어오는 주기(초)
+VERSION_CHECK_SECONDS = float(os.getenv("VERSION_CHECK_SECONDS", "5"))
+# corpus → {"checked_at", "version"}
+_version_state: Dict[str, Dict[str, Any]] = defaultdict(lambda: {"checked_at": float("-inf"), "version": ""})
+
+_collections: Dict[str, Any] = {}
+_collections_lock = threading.Lock()
+
+# 정책 파일명 규칙: <코드>_<제목>_v<버전>.pdf (예: FIN-101_Expense_Approval_and_Accounting_Policy_v2.0.pdf)
+POLICY_FILE_PAT = re.compile(r"^(?P<code>[A-Z]+-\d+)_(?P<title>.+?)_v(?P<version>\d+(?:\.\d+)*)\.pdf$", re.I)
+
+# 한 번에 upsert 할 청크 수 (모델 안에서는 EMBEDDING_BATCH_SIZE 단위로 나눠 encode)
+UPSERT_BATCH_SIZE = int(os.getenv("UPSERT_BATCH_SIZE", "256"))
+# 페이지 텍스트 추출 프로세스 수 (0이면 현재 프로세스에서 추출) / 작업 하나가 맡는 페이지 수
+INGEST_WORKERS = int(os.getenv("INGEST_WORKERS", str(os.cpu_count() or 1)))
+PAGES_PER_TASK = int(os.getenv("PAGES_PER_TASK", "16"))
+
+Chunk = Tuple[str, str, Dict[str, Any]]
+
+
+@dataclass(frozen=True)
+class ChunkingConfig:
+    """
+    청킹 설정
+    - strategy: "structure" (조항/섹션 제목과 문장 경계 기준, 페이지를 넘어 이어짐) 또는 "fixed" (글자 수 고정 분할)
+    - chunk_size: 청크 최대 글자 수
+    - chunk_overlap: 이웃 청크와 겹치는 글자 수 (structure 전략에서 문장 단위로 적용)
+    """
+    strategy: str = "structure"
+    chunk_size: int = 500
+    chunk_overlap: int = 100
+
+    def signature(self) -> str:
+        if self.strategy == "fixed":
+            return f"fixed-{self.chunk_size}"
+        return f"{self.strategy}-{self.chunk_size}-{self.chunk_overlap}"
+
 
-__all__ = ["collection", "add_pdf_chunk", "chunking_pdf"]
+CHUNKING = ChunkingConfig(
+    strategy=os.getenv("CHUNK_STRATEGY", "structure"),
+    chunk_size=int(os.getenv("CHUNK_SIZE", "500")),
+    chunk_overlap=int(os.getenv("CHUNK_OVERLAP", "100")),
+)
 
-def add_pdf_chunk(chunk_id: str, content: str, metadata: dict):
-    collection.add(
+# 조항/섹션 제목 줄: "제3조 (목적)", "제2장", "1. 원칙", "B1. 지출결의서 필수입력항목", "부록", "용어정의", "개정이력"
+SECTION_HEADING_PAT = re.compile(
+    r"^(?:제\s*\d+\s*[장절조].*|\d{1,2}\.\s+\S.*|[A-Z]\d{1,2}\.\s+\S.*|부록|용어\s*정의|개정\s*이력)$"
+)
+MAX_HEADING_LEN = 40
+# 문장 끝: 마침표/물음표/느낌표 뒤 공백 또는 줄바꿈 (목록 번호 "1." 은 제외)
+SENTENCE_END_PAT = re.compile(r"(?<!\d)[.!?](?=\s|$)")
+WHITESPACE_PAT = re.compile(r"\s+")
+# PDF 글머리표(Wingdings/Symbol 사설영역 문자 등) → "- "
+BULLET_PAT = re.compile(r"^[\uf0a7\uf0b7\uf0d8\u2022\u25cf\u25aa\u00b7]\s*")
+
+
+def get_collection(corpus: str = DEFAULT_CORPUS):
+    """corpus 의 Chroma 컬렉션 (처음 요청할 때 만들고 이후에는 같은 객체)"""
+    coll = _collections.get(corpus)
+    if coll is None:
+        with _collections_lock:
+            coll = _collections.get(corpus)
+            if coll is None:
+                coll = client.get_or_create_collection(
+                    name=get_corpus(corpus).collection_name(), embedding_function=embedding_function
+                )
+                _collections[corpus] = coll
+    return coll
+
+
+# 기본(내규) corpus 컬렉션
+collection = get_collection(DEFAULT_CORPUS)
+
+
+def add_pdf_chunk(chunk_id: str, content: str, metadata: dict, corpus: str = DEFAULT_CORPUS):
+    get_collection(corpus).upsert(
         documents=[content],
         metadatas=[metadata],
         ids=[chunk_id]
     )
+    _bump_collection_version(corpus)
+
+
+def _bump_collection_version(corpus: str = DEFAULT_CORPUS) -> str:
+    coll = get_collection(corpus)
+    metadata = dict(coll.metadata or {})
+    metadata[VERSION_KEY] = str(time.time_ns())
+    coll.modify(metadata=metadata)
+    _version_state[corpus]["checked_at"] = float("-inf")
+    return metadata[VERSION_KEY]
+
+
+def collection_version(corpus: str = DEFAULT_CORPUS) -> str:
+    """컬렉션 내용 버전. 적재로 청크가 바뀌면 값이 달라집니다 (최대 VERSION_CHECK_SECONDS 지연)."""
+    state = _version_state[corpus]
+    now = time.monotonic()
+    if now - state["checked_at"] >= VERSION_CHECK_SECONDS:
+        current = client.get_collection(get_collection(corpus).name, embedding_function=embedding_function)
+        state["version"] = (current.metadata or {}).get(VERSION_KEY, "")
+        state["checked_at"] = now
+    return state["version"]
+
+
+def build_lexical_index(source_version: Optional[str] = None, path: Optional[str] = None,
+                        corpus: str = DEFAULT_CORPUS) -> int:
+    """컬렉션의 모든 청크로 BM25 키워드 인덱스를 다시 만들어 저장합니다. 색인한 청크 수를 반환."""
+    coll = get_collection(corpus)
+    res = coll.get(include=["documents", "metadatas"])
+    if source_version is None:
+        source_version = (coll.metadata or {}).get(VERSION_KEY, "")
+    BM25Index.build(res["ids"], res["documents"], res["metadatas"], source_version).save(
+        path or get_corpus(corpus).lexical_index_path()
+    )
+    return len(res["ids"])
+
+
+def file_sha256(file_path: str) -> str:
+    h = hashlib.sha256()
+    with open(file_path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            h.update(block)
+    return h.hexdigest()
+
+
+def parse_policy_filename(filename: str) -> Tuple[str, str]:
+    """파일명에서 (정책 ID, 버전) 을 추출합니다. 규칙에 맞지 않으면 (파일명, "")."""
+    m = POLICY_FILE_PAT.match(filename)
+    if not m:
+        return os.path.splitext(filename)[0], ""
+    return m.group("code").upper(), m.group("version")
+
+
+def _version_key(version: str) -> Tuple[int, ...]:
+    return tuple(int(p) for p in version.split(".")) if version else ()
+
+
+class FileChunker:
+    """
+    한 PDF 의 페이지 텍스트를 페이지 순서대로 받아 (id, 본문, 메타데이터) 청크로 자릅니다.
+    chunk_size 글자 단위 고정 분할 (페이지 경계를 넘지 않음).
+    """
+
+    def __init__(self, file_path: str, file_hash: str, config: ChunkingConfig):
+        self.filename = os.path.basename(file_path)
+        self.policy_id, self.version = parse_policy_filename(self.filename)
+        self.file_hash = file_hash
+        self.config = config
+        self.chunk_size = config.chunk_size
+        self.chunk_count = 0
+
+    def _make_chunk(self, page_num: int, text: str, **extra: Any) -> Chunk:
+        metadata = {
+            "page": page_num,
+            "chunk_index": self.chunk_count,
+            "source_file": self.filename,
+            "policy_id": self.policy_id,
+            "version": self.version,
+            "file_hash": self.file_hash,
+            "chunker": self.config.signature(),
+            **extra,
+        }
+        # 같은 내용이면 같은 ID → 재실행해도 중복이 생기지 않음
+        chunk = (f"{self.policy_id}:{self.file_hash[:16]}:{self.chunk_count}", text, metadata)
+        self.chunk_count += 1
+        return chunk
+
+    def feed(self, page_num: int, text: str) -> List[Chunk]:
+        return [
+            self._make_chunk(page_num, text[i:i + self.chunk_size])
+            for i in range(0, len(text), self.chunk_size)
+        ]
+
+    def finish(self) -> List[Chunk]:
+        return []
+
+
+class StructureChunker(FileChunker):
+    """
+    조항/섹션 제목 줄에서 구간을 나누고, 구간 안에서는 문장 경계로 chunk_size 이하씩 묶습니다.
+    - 구간은 페이지 경계를 넘어 이어지며, 청크의 시작/끝 페이지를 page/page_end 로 기록
+    - 이웃 청크는 chunk_overlap 글자 이내의 마지막 문장들을 공유
+    - 섹션 제목은 metadata["section"] 에 기록하고, 섹션의 두 번째 청크부터는 본문 앞에 [제목] 을 붙임
+    """
+
+    def __init__(self, file_path: str, file_hash: str, config: ChunkingConfig):
+        super().__init__(file_path, file_hash, config)
+        self.section: Optional[str] = None
+        self._lines: List[str] = []
+        self._line_pages: List[int] = []
+        self._has_body = False
+
+    @staticmethod
+    def _is_heading(line: str) -> bool:
+        return (
+            len(line) <= MAX_HEADING_LEN
+            and not line.endswith(".")
+            and SECTION_HEADING_PAT.match(line) is not None
+        )
+
+    def feed(self, page_num: int, text: str) -> List[Chunk]:
+        chunks: List[Chunk] = []
+        for raw in (text or "").splitlines():
+            line = BULLET_PAT.sub("- ", raw.strip())
+            if not line:
+                continue
+            if self._is_heading(line):
+                title = WHITESPACE_PAT.sub(" ", line)
+                if self._has_body:
+                    chunks.extend(self._flush_section())
+                    self.section = title
+                else:
+                    # 본문 없는 제목(예: "부록" 다음 "B1. ...")은 다음 제목과 합친다
+                    self.section = f"{self.section} > {title}" if self._lines else title
+                self._lines.append(line)
+                self._line_pages.append(page_num)
+                continue
+            if self.section is None:
+                # 첫 제목 전 머리말 구간은 문서 첫 줄(문서 제목)을 섹션명으로 사용
+                self.section = WHITESPACE_PAT.sub(" ", line)
+            self._lines.append(line)
+            self._line_pages.append(page_num)
+            self._has_body = True
+        return chunks
+
+    def finish(self) -> List[Chunk]:
+        return self._flush_section() if self._lines else []
 
-def chunking_pdf(file_path: str, chunk_size: int = 500):
+    def _flush_section(self) -> List[Chunk]:
+        text = "\n".join(self._lines)
+        # 각 줄의 시작 오프셋 → 오프셋으로 페이지 조회
+        starts, offset = [], 0
+        for line in self._lines:
+            starts.append(offset)
+            offset += len(line) + 1
+        pages = self._line_pages
+
+        def page_at(pos: int) -> int:
+            return pages[bisect.bisect_right(starts, pos) - 1]
+
+        boundaries = [m.end() for m in SENTENCE_END_PAT.finditer(text)]
+        chunks: List[Chunk] = []
+        section = self.section or ""
+        size, overlap = self.chunk_size, self.config.chunk_overlap
+        start = 0
+        while start < len(text):
+            limit = start + size
+            if limit >= len(text):
+                end = len(text)
+            else:
+                # 한도 안의 마지막 문장 끝 → 없으면 마지막 줄바꿈 → 없으면 강제 분할
+                k = bisect.bisect_right(boundaries, limit) - 1
+                if k >= 0 and boundaries[k] > start:
+                    end = boundaries[k]
+                else:
+                    nl = text.rfind("\n", start + 1, limit)
+                    end = nl if nl > start else limit
+            body = text[start:end].strip()
+            if body:
+                prefix = "" if start == 0 else f"[{section}]\n"
+                chunks.append(self._make_chunk(
+                    page_at(start), prefix + body,
+                    page_end=page_at(max(start, end - 1)),
+                    section=section,
+                ))
+            if end >= len(text):
+                break
+            # 다음 청크는 overlap 범위 안의 첫 문장 경계에서 시작 (문장 단위 겹침)
+            next_start = end
+            k = bisect.bisect_left(boundaries, end - overlap)
+            if overlap > 0 and k < len(boundaries) and start < boundaries[k] < end:
+                next_start = boundaries[k]
+            start = next_start
+        self._lines, self._line_pages = [], []
+        self._has_body = False
+        return chunks
+
+
+def make_chunker(file_path: str, file_hash: str, config: Optional[ChunkingConfig] = None) -> FileChunker:
+    config = config or CHUNKING
+    if config.strategy == "fixed":
+        return FileChunker(file_path, file_hash, config)
+    if config.strategy == "structure":
+        return StructureChunker(file_path, file_hash, config)
+    raise ValueError(f"알 수 없는 청킹 전략: {config.strategy}")
+
+
+def _extract_page_range(file_path: str, start: int, stop: int) -> Tuple[str, int, List[str]]:
     from pypdf import PdfReader
 
     reader = PdfReader(file_path)
-    chunk_id = 0
-
-    for page_num, page in enumerate(reader.pages):
-        text = page.extract_text()
-        for i in range(0, len(text), chunk_size):
-            chunk = text[i:i + chunk_size]
-            metadata = {
-                "page": page_num,
-                "chunk_index": chunk_id,
-                "source_file": os.path.basename(file_path)
-            }
-            add_pdf_chunk(f"{file_path}_chunk_{chunk_id}", chunk, metadata)
-            chunk_id += 1
-    print(f"Added {chunk_id} chunks from {file_path} to the collection.")
+    return file_path, start, [reader.pages[p].extract_text() for p in range(start, stop)]
+
+
+def _page_count(file_path: str) -> int:
+    from pypdf import PdfReader
+
+    return len(PdfReader(file_path).pages)
+
+
+def extract_chunks(file_path: str, config: Optional[ChunkingConfig] = None, file_hash: Optional[str] = None) -> List[Chunk]:
+    """PDF 한 개를 현재 프로세스에서 청킹해 (id, 본문, 메타데이터) 목록을 반환합니다."""
+    chunker = make_chunker(file_path, file_hash or file_sha256(file_path), config)
+    _, _, texts = _extract_page_range(file_path, 0, _page_count(file_path))
+    chunks = []
+    for page_num, text in enumerate(texts):
+        chunks.extend(chunker.feed(page_num, text))
+    chunks.extend(chunker.finish())
+    return chunks
+
+
+def _stream_chunks(files: List[Tuple[str, str]], config: ChunkingConfig, workers: int, stats: Dict[str, Any]) -> Iterator[Chunk]:
+    """
+    (파일 경로, 해시) 목록의 페이지를 프로세스 풀에서 병렬 추출하며,
+    끝난 페이지부터 파일별 페이지 순서를 맞춰 청커에 흘려 청크를 내보냅니다.
+    """
+    chunkers = {path: make_chunker(path, file_hash, config) for path, file_hash in files}
+    page_counts = {path: _page_count(path) for path, _ in files}
+    next_page = {path: 0 for path, _ in files}
+    pending: Dict[str, Dict[int, List[str]]] = {path: {} for path, _ in files}
+    tasks = [
+        (path, start, min(start + PAGES_PER_TASK, page_counts[path]))
+        for path, _ in files
+        for start in range(0, page_counts[path], PAGES_PER_TASK)
+    ]
+
+    def _drain(path: str, start: int, texts: List[str]) -> Iterator[Chunk]:
+        stats["pages"] += len(texts)
+        pending[path][start] = texts
+        # 앞 페이지가 모두 도착한 구간만 순서대로 청킹
+        while next_page[path] in pending[path]:
+            block = pending[path].pop(next_page[path])
+            for offset, text in enumerate(block):
+                yield from chunkers[path].feed(next_page[path] + offset, text)
+            next_page[path] += len(block)
+        if next_page[path] >= page_counts[path]:
+            yield from chunkers[path].finish()
+
+    for path, _ in files:
+        if page_counts[path] == 0:
+            yield from chunkers[path].finish()
+
+    if workers <= 0 or len(tasks) <= 1:
+        for task in tasks:
+            yield from _drain(*_extract_page_range(*task))
+        return
+
+    with ProcessPoolExecutor(max_workers=min(workers, len(tasks))) as executor:
+        futures = [executor.submit(_extract_page_range, *task) for task in tasks]
+        for future in as_completed(futures):
+            yield from _drain(*future.result())
+
+
+def _upsert_batched(chunks: Iterator[Chunk], batch_size: int, corpus: str = DEFAULT_CORPUS) -> int:
+    """청크 스트림을 batch_size 개씩 모아 upsert 하는 단일 임베딩 writer. 적재한 청크 수를 반환."""
+    coll = get_collection(corpus)
+    batch_size = min(batch_size, client.get_max_batch_size())
+    batch: List[Chunk] = []
+    written = 0
+
+    def _flush():
+        coll.upsert(
+            ids=[c[0] for c in batch],
+            documents=[c[1] for c in batch],
+            metadatas=[c[2] for c in batch],
+        )
+
+    for chunk in chunks:
+        batch.append(chunk)
+        if len(batch) >= batch_size:
+            _flush()
+            written += len(batch)
+            batch = []
+    if batch:
+        _flush()
+        written += len(batch)
+    return written
+
+
+def chunking_pdf(file_path: str, config: Optional[ChunkingConfig] = None, corpus: str = DEFAULT_CORPUS):
+    written = _upsert_batched(iter(extract_chunks(file_path, config)), UPSERT_BATCH_SIZE, corpus)
+    build_lexical_index(_bump_collection_version(corpus), corpus=corpus)
+    print(f"Added {written} chunks from {file_path} to the {corpus} collection.")
+
+
+def _existing_chunks(coll, policy_id: str, filename: str) -> Dict[str, Dict[str, Any]]:
+    # 이전 방식(source_file 만 기록)으로 넣은 청크도 함께 찾는다
+    res = coll.get(
+        where={"$or": [{"policy_id": policy_id}, {"source_file": filename}]},
+        include=["metadatas"],
+    )
+    return dict(zip(res["ids"], res["metadatas"]))
+
+
+def ingest_corpus(corpus: str = DEFAULT_CORPUS, pdf_directory: Optional[str] = None,
+                  config: Optional[ChunkingConfig] = None, batch_size: int = UPSERT_BATCH_SIZE,
+                  prune: bool = True, workers: int = INGEST_WORKERS) -> Dict[str, Any]:
+    """
+    corpus 의 PDF 폴더(pdf_directory 를 주지 않으면 corpus 설정의 폴더)를 해당 컬렉션에 증분 적재합니다.
+    - 파일 해시, 청킹 설정, 파일명(버전)이 이미 적재된 것과 같으면 건너뜀
+    - 바뀐 파일만 페이지 단위로 병렬 추출/청킹하여 배치 upsert
+    - 같은 정책의 이전 버전/이전 내용 청크는 삭제
+    - prune=True 면 폴더에서 사라진 파일의 청크도 삭제
+    - 내용이 바뀌었거나 인덱스 파일이 없으면 BM25 키워드 인덱스를 다시 생성
+    """
+    started = time.perf_counter()
+    config = config or CHUNKING
+    coll = get_collection(corpus)
+    pdf_directory = pdf_directory or get_corpus(corpus).directory
+    lexical_path = get_corpus(corpus).lexical_index_path()
+    # 같은 정책 ID 의 파일이 여러 버전 있으면 최신 버전만 적재
+    latest: Dict[str, Tuple[str, str]] = {}
+    for filename in sorted(os.listdir(pdf_directory)):
+        if not filename.lower().endswith(".pdf"):
+            continue
+        policy_id, version = parse_policy_filename(filename)
+        if policy_id not in latest or _version_key(version) > _version_key(latest[policy_id][1]):
+            latest[policy_id] = (filename, version)
+
+    report: Dict[str, Any] = {"corpus": corpus, "unchanged": [], "updated": [], "pages": 0}
+    changed: List[Tuple[str, str]] = []
+    previous_ids: List[str] = []
+    for policy_id, (filename, version) in latest.items():
+        file_path = os.path.join(pdf_directory, filename)
+        file_hash = file_sha256(file_path)
+        existing = _existing_chunks(coll, policy_id, filename)
+        # 내용이 같아도 파일명(버전)이 바뀌었으면 메타데이터를 새 버전으로 다시 써야 버전 필터가 맞는다
+        if existing and all(
+            md.get("file_hash") == file_hash and md.get("chunker") == config.signature()
+            and md.get("source_file") == filename and md.get("version") == version
+            for md in existing.values()
+        ):
+            report["unchanged"].append(filename)
+            continue
+        changed.append((file_path, file_hash))
+        previous_ids.extend(existing)
+        report["updated"].append(filename)
+
+    # 새 청크를 먼저 넣고 나서 이전 청크를 지워 검색 공백을 없앤다
+    written_ids = set()
+
+    def _record(chunks: Iterator[Chunk]) -> Iterator[Chunk]:
+        for chunk in chunks:
+            written_ids.add(chunk[0])
+            yield chunk
+
+    written = _upsert_batched(_record(_stream_chunks(changed, config, workers, report)), batch_size, corpus)
+    stale_ids = {cid for cid in previous_ids if cid not in written_ids}
+
+    if prune:
+        known_files = {filename for filename, _ in latest.values()}
+        res = coll.get(include=["metadatas"])
+        for cid, md in zip(res["ids"], res["metadatas"]):
+            if md.get("source_file") not in known_files and md.get("policy_id") not in latest:
+                stale_ids.add(cid)
+
+    stale = sorted(stale_ids)
+    max_batch = client.get_max_batch_size()
+    for start in range(0, len(stale), max_batch):
+        coll.delete(ids=stale[start:start + max_batch])
+
+    if written or stale:
+        build_lexical_index(_bump_collection_version(corpus), corpus=corpus)
+    elif not os.path.exists(lexical_path):
+        build_lexical_index(corpus=corpus)
+
+    elapsed = time.perf_counter() - started
+    report.update({
+        "upserted_chunks": written,
+        "deleted_chunks": len(stale),
+        "elapsed_seconds": round(elapsed, 3),
+        "pages_per_second": round(report["pages"] / elapsed, 1) if elapsed else 0.0,
+        "chunks_per_second": round(written / elapsed, 1) if elapsed else 0.0,
+    })
+    return report
+
+
+def ingest_policies(pdf_directory: str = "./policies", config: Optional[ChunkingConfig] = None,
+                    batch_size: int = UPSERT_BATCH_SIZE, prune: bool = True,
+                    workers: int = INGEST_WORKERS) -> Dict[str, Any]:
+    """내규 PDF 폴더를 기본 corpus 컬렉션에 증분 적재합니다 (ingest_corpus 참고)."""
+    return ingest_corpus(DEFAULT_CORPUS, pdf_directory, config, batch_size, prune, workers)
+
 
 if __name__ == "__main__":
-    pdf_directory = "./policies"
-    for filename in os.listdir(pdf_directory):
-        if filename.endswith(".pdf"):
-            file_path = os.path.join(pdf_directory, filename)
-            chunking_pdf(file_path)
-            
-    print("PDF chunking and storage complete.")
-    print(f"총 collection 개수: {collection.count()}")
+    # python pdf_chunking.py [corpus ...]  (생략하면 폴더가 있는 모든 corpus)
+    names = sys.argv[1:] or [name for name, c in CORPORA.items() if os.path.isdir(c.directory)]
+    for name in names:
+        report = ingest_corpus(name)
+        coll = get_collection(name)
+        print(f"\n[{name}] {get_corpus(name).directory} → {coll.name}")
+        print(f"변경 없음: {len(report['unchanged'])}개, 갱신: {report['updated']}")
+        print(f"upsert {report['upserted_chunks']}개, 삭제 {report['deleted_chunks']}개")
+        print(
+            f"{report['pages']} pages / {report['elapsed_seconds']}s "
+            f"({report['pages_per_second']} pages/s, {report['chunks_per_second']} chunks/s)"
+        )
+        print(f"총 collection 개수: {coll.count()}")
+
+    print("\nPDF chunking and storage complete.")
     n = min(3, collection.count())
     res = collection.get(limit=n, include=["documents", "metadatas"])
 
@@ -48,4 +533,3 @@ if __name__ == "__main__":
         print("\nID:", _id)
         print("META:", md)
         print("DOC:", doc[:300], "...")
-            
\ No newline at end of file
@@ -0,0 +1,465 @@
+import contextvars
+import json
+import os
+import time
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from corpora import DEFAULT_CORPUS, get_corpus, resolve_corpora
+from lexical_index import BM25Index, load_index
+from pdf_chunking import embedding_function, get_collection
+from query_cache import embedding_cache
+from telemetry import span
+
+# 검색 방식 기본값: "hybrid"(벡터 + BM25 순위 융합), "vector", "lexical"
+SEARCH_MODE = os.getenv("SEARCH_MODE", "hybrid")
+# 융합 전 각 검색기에서 가져올 후보 수 = top_k * SEARCH_CANDIDATE_FACTOR
+SEARCH_CANDIDATE_FACTOR = int(os.getenv("SEARCH_CANDIDATE_FACTOR", "4"))
+# Reciprocal Rank Fusion 상수 (클수록 하위 순위의 영향이 커짐)
+SEARCH_RRF_K = int(os.getenv("SEARCH_RRF_K", "60"))
+
+# 여러 corpus 를 동시에 검색할 때 쓰는 스레드 수
+SEARCH_FANOUT_WORKERS = int(os.getenv("SEARCH_FANOUT_WORKERS", "4"))
+
+# 배치 검색 한 번에 받을 수 있는 최대 질의 수
+SEARCH_BATCH_MAX_QUERIES = int(os.getenv("SEARCH_BATCH_MAX_QUERIES", "16"))
+
+# snippets 응답에서 청크마다 보여줄 앞부분 글자 수
+SEARCH_SNIPPET_CHARS = int(os.getenv("SEARCH_SNIPPET_CHARS", "160"))
+
+SEARCH_MODES = ("hybrid", "vector", "lexical")
+RESPONSE_FORMATS = ("full", "compact", "snippets")
+# 이웃 청크를 합칠 때 겹침으로 인정하는 최소 글자 수 (우연히 같은 한두 글자는 겹침으로 보지 않음)
+MIN_OVERLAP_CHARS = 20
+
+__all__ = [
+    "SEARCH_MODE", "SEARCH_MODES", "SEARCH_BATCH_MAX_QUERIES", "RESPONSE_FORMATS", "embed_query", "embed_queries", "build_filters", "search",
+    "search_many", "search_corpora", "fetch_chunks", "format_results", "format_batch_results", "warm_up",
+]
+
+_fanout = ThreadPoolExecutor(max_workers=max(SEARCH_FANOUT_WORKERS, 1), thread_name_prefix="search-fanout")
+
+
+def embed_queries(queries: List[str]) -> List[List[float]]:
+    """
+    질의 목록의 임베딩. 캐시에 없는 질의만 모아 한 번의 배치로 계산합니다.
+    대소문자를 구분하는 임베딩 모델도 있으므로 캐시 키는 정규화하지 않은 질의 그대로입니다.
+    """
+    embeddings = [embedding_cache.get(q) for q in queries]
+    missing = list(dict.fromkeys(q for q, e in zip(queries, embeddings) if e is None))
+    if not missing:
+        return embeddings
+    with span("search.embed"):
+        computed = dict(zip(missing, embedding_function.embed_query(missing)))
+    for q, e in computed.items():
+        embedding_cache.put(q, e)
+    return [computed[q] if e is None else e for q, e in zip(queries, embeddings)]
+
+
+def embed_query(query: str) -> List[float]:
+    return embed_queries([query])[0]
+
+
+def _policy_ids(prefix: str, index: Optional[BM25Index], corpus: str = DEFAULT_CORPUS) -> List[str]:
+    if index is not None:
+        return index.policy_ids(prefix)
+    # 키워드 인덱스가 아직 없으면 컬렉션 메타데이터에서 정책 ID 를 모은다
+    res = get_collection(corpus).get(include=["metadatas"])
+    prefix = prefix.upper().rstrip("-")
+    return sorted({
+        md["policy_id"] for md in res["metadatas"]
+        if md.get("policy_id") and md["policy_id"].upper().split("-")[0] == prefix
+    })
+
+
+def build_filters(source_file: Optional[str] = None, policy_prefix: Optional[str] = None,
+                  version: Optional[str] = None, index: Optional[BM25Index] = None,
+                  corpus: str = DEFAULT_CORPUS) -> Optional[Dict[str, Any]]:
+    """
+    메타데이터 필터 {필드: 값 또는 값 목록}. 조건이 없으면 None.
+    정책 코드 접두어(HR/FIN/SEC/PRC/QMS)는 해당하는 policy_id 목록으로 바꿉니다.
+    """
+    filters: Dict[str, Any] = {}
+    if source_file:
+        filters["source_file"] = source_file
+    if policy_prefix:
+        filters["policy_id"] = _policy_ids(policy_prefix, index, corpus)
+    if version:
+        filters["version"] = version
+    return filters or None
+
+
+def _chroma_where(filters: Optional[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+    if not filters:
+        return None
+    clauses = [
+        {field: {"$in": list(value)}} if isinstance(value, (list, tuple, set)) else {field: value}
+        for field, value in filters.items()
+    ]
+    return clauses[0] if len(clauses) == 1 else {"$and": clauses}
+
+
+def _vector_search(queries: List[str], n: int, filters: Optional[Dict[str, Any]], corpus: str = DEFAULT_CORPUS,
+                   embeddings: Optional[List[List[float]]] = None) -> List[List[Tuple[str, str, Dict[str, Any], float]]]:
+    """질의마다 (id, 본문, 메타데이터, 거리) 목록. 여러 질의도 Chroma 질의 한 번으로 검색합니다."""
+    if embeddings is None:
+        embeddings = embed_queries(queries)
+    with span("search.vector"):
+        results = get_collection(corpus).query(
+            query_embeddings=embeddings,
+            n_results=n,
+            where=_chroma_where(filters),
+            include=["documents", "metadatas", "distances"],
+        )
+    return [
+        list(zip(ids, docs, mds, distances))
+        for ids, docs, mds, distances in zip(results["ids"], results["documents"], results["metadatas"], results["distances"])
+    ]
+
+
+def _fetch(ids: List[str], corpus: str = DEFAULT_CORPUS) -> Dict[str, Tuple[str, Dict[str, Any]]]:
+    if not ids:
+        return {}
+    with span("search.fetch"):
+        res = get_collection(corpus).get(ids=ids, include=["documents", "metadatas"])
+    return {cid: (doc, md) for cid, doc, md in zip(res["ids"], res["documents"], res["metadatas"])}
+
+
+def _rrf(rank: int) -> float:
+    return 1.0 / (SEARCH_RRF_K + rank + 1)
+
+
+def search(query: str, top_k: int = 5, mode: str = SEARCH_MODE,
+           source_file: Optional[str] = None, policy_prefix: Optional[str] = None,
+           version: Optional[str] = None, corpus: str = DEFAULT_CORPUS,
+           embedding: Optional[List[float]] = None) -> List[Dict[str, Any]]:
+    """
+    질의로 corpus(기본: 내규)의 청크를 검색해 [{"id", "document", "metadata", "score"}, ...] 를 점수 순으로 반환합니다.
+    - vector: 임베딩 유사도 / lexical: BM25 키워드 / hybrid: 두 순위를 RRF 로 융합
+    - score: vector 는 1 / (1 + 거리), lexical 은 BM25 점수, hybrid 는 RRF 점수 (클수록 관련도 높음)
+    - 필터가 있으면 벡터 검색은 Chroma where 로, BM25 는 후보 문서 집합으로 범위를 먼저 좁힙니다.
+    - 키워드 인덱스가 없으면(적재 전) vector 로 동작합니다 (hybrid 였다면 점수는 벡터 순위의 RRF).
+    - embedding: 이미 계산한 질의 임베딩 (여러 corpus 를 검색할 때 한 번만 계산)
+    """
+    return search_many(
+        [query], top_k, mode, source_file, policy_prefix, version, corpus,
+        embeddings=None if embedding is None else [embedding],
+    )[0]
+
+
+def search_many(queries: List[str], top_k: int = 5, mode: str = SEARCH_MODE,
+                source_file: Optional[str] = None, policy_prefix: Optional[str] = None,
+                version: Optional[str] = None, corpus: str = DEFAULT_CORPUS,
+                embeddings: Optional[List[List[float]]] = None) -> List[List[Dict[str, Any]]]:
+    """
+    질의 여러 개를 한 번에 검색해 질의 순서대로 search 와 같은 결과 목록을 반환합니다.
+    필터 준비는 한 번, 질의 임베딩은 배치 하나, 벡터 검색은 Chroma 질의 하나로 처리하고
+    BM25 로만 찾은 청크의 본문도 모든 질의 것을 모아 한 번에 조회합니다.
+    """
+    if mode not in SEARCH_MODES:
+        raise ValueError(f"알 수 없는 검색 방식: {mode} (가능: {', '.join(SEARCH_MODES)})")
+    if not queries:
+        return []
+    with span("search.filters"):
+        index = load_index(get_corpus(corpus).lexical_index_path()) if mode != "vector" else None
+        filters = build_filters(source_file, policy_prefix, version, index, corpus)
+    if filters and any(value == [] for value in filters.values()):
+        return [[] for _ in queries]
+
+    if index is None:
+        return [
+            [
+                {"id": cid, "document": doc, "metadata": md,
+                 "score": _rrf(rank) if mode == "hybrid" else 1.0 / (1.0 + distance)}
+                for rank, (cid, doc, md, distance) in enumerate(hits)
+            ]
+            for hits in _vector_search(queries, top_k, filters, corpus, embeddings)
+        ]
+
+    n = max(top_k * SEARCH_CANDIDATE_FACTOR, top_k)
+    with span("search.lexical"):
+        lexical = [index.search(q, n if mode == "hybrid" else top_k, filters) for q in queries]
+    found: Dict[str, Tuple[str, Dict[str, Any]]] = {}
+    scored: List[Dict[str, float]] = []
+    rankings: List[List[str]] = []
+    if mode == "lexical":
+        for lex in lexical:
+            scored.append(dict(lex))
+            rankings.append([cid for cid, _ in lex])
+    else:
+        vectors = _vector_search(queries, n, filters, corpus, embeddings)
+        for vector, lex in zip(vectors, lexical):
+            found.update((cid, (doc, md)) for cid, doc, md, _ in vector)
+            scores: Dict[str, float] = defaultdict(float)
+            for ranking in ([cid for cid, _, _, _ in vector], [cid for cid, _ in lex]):
+                for rank, cid in enumerate(ranking):
+                    scores[cid] += _rrf(rank)
+            scored.append(scores)
+            rankings.append(sorted(scores, key=lambda cid: -scores[cid])[:top_k])
+
+    found.update(_fetch(list(dict.fromkeys(cid for ranked in rankings for cid in ranked if cid not in found)), corpus))
+    # 인덱스 생성 이후 삭제된 청크는 건너뜀
+    return [
+        [{"id": cid, "document": found[cid][0], "metadata": found[cid][1], "score": scores[cid]}
+         for cid in ranked if cid in found]
+        for ranked, scores in zip(rankings, scored)
+    ]
+
+
+def search_corpora(query: str, corpora: Optional[List[str]] = None, top_k: int = 5, mode: str = SEARCH_MODE,
+                   source_file: Optional[str] = None, policy_prefix: Optional[str] = None,
+                   version: Optional[str] = None) -> List[Dict[str, Any]]:
+    """
+    여러 corpus(비어 있으면 전체)를 동시에 검색해 점수 순으로 합친 상위 top_k 개를 반환합니다.
+    질의 임베딩은 한 번만 계산하고, corpus 마다 top_k 개씩 가져와 합칩니다. 각 결과에 "corpus" 를 기록합니다.
+    모든 corpus 가 같은 임베딩/검색 방식을 쓰므로 점수를 그대로 비교할 수 있습니다.
+    """
+    if mode not in SEARCH_MODES:
+        raise ValueError(f"알 수 없는 검색 방식: {mode} (가능: {', '.join(SEARCH_MODES)})")
+    names = [c.name for c in resolve_corpora(corpora)]
+    embedding = embed_query(query) if mode != "lexical" else None
+    args = (query, top_k, mode, source_file, policy_prefix, version)
+    if len(names) == 1:
+        per_corpus = [search(*args, corpus=names[0], embedding=embedding)]
+    else:
+        # 구간 시간(span)이 현재 요청에 기록되도록 컨텍스트를 복사해 실행
+        futures = [
+            _fanout.submit(contextvars.copy_context().run, search, *args, corpus=name, embedding=embedding)
+            for name in names
+        ]
+        per_corpus = [future.result() for future in futures]
+    merged = [{**hit, "corpus": name} for name, hits in zip(names, per_corpus) for hit in hits]
+    # 점수가 같으면 corpus 지정 순서, corpus 안 순위 순 (sorted 는 안정 정렬)
+    return sorted(merged, key=lambda hit: -hit["score"])[:top_k]
+
+
+def fetch_chunks(ids: List[str], corpus: Optional[str] = DEFAULT_CORPUS) -> List[Dict[str, Any]]:
+    """
+    청크 ID 목록의 전체 본문/메타데이터를 요청 순서대로 반환합니다 (없는 ID 는 건너뜀).
+    corpus 가 None 이면 모든 corpus 에서 찾고 결과에 "corpus" 를 기록합니다.
+    """
+    wanted = list(dict.fromkeys(ids))
+    if corpus is not None:
+        found = _fetch(wanted, corpus)
+        return [{"id": cid, "document": found[cid][0], "metadata": found[cid][1]} for cid in wanted if cid in found]
+    located: Dict[str, Dict[str, Any]] = {}
+    for c in resolve_corpora():
+        remaining = [cid for cid in wanted if cid not in located]
+        for cid, (doc, md) in _fetch(remaining, c.name).items():
+            located[cid] = {"id": cid, "document": doc, "metadata": md, "corpus": c.name}
+    return [located[cid] for cid in wanted if cid in located]
+
+
+def warm_up(corpora: Optional[List[str]] = None) -> Dict[str, Any]:
+    """
+    검색 첫 요청이 디스크 로드를 기다리지 않도록 임베딩 모델, corpus 별 HNSW 인덱스, BM25 인덱스를 미리 메모리에 올립니다.
+    Chroma 는 컬렉션의 HNSW 인덱스를 첫 질의 때 읽으므로 corpus 마다 질의를 한 번 실행합니다.
+    """
+    report: Dict[str, Any] = {}
+    started = time.perf_counter()
+    embedding = embedding_function.embed_query(["warm-up"])[0]
+    report["embedding_seconds"] = round(time.perf_counter() - started, 3)
+    for corpus in resolve_corpora(corpora):
+        started = time.perf_counter()
+        coll = get_collection(corpus.name)
+        count = coll.count()
+        if count:
+            coll.query(query_embeddings=[embedding], n_results=1, include=["distances"])
+        index = load_index(corpus.lexical_index_path())
+        report[corpus.name] = {
+            "chunks": count,
+            "lexical_index": index is not None,
+            "seconds": round(time.perf_counter() - started, 3),
+        }
+    return report
+
+
+def _body(document: str, section: Optional[str]) -> str:
+    # StructureChunker 가 섹션 두 번째 청크부터 붙이는 "[섹션]" 줄은 section 필드와 중복이므로 제거
+    prefix = f"[{section}]\n" if section else None
+    return document[len(prefix):] if prefix and document.startswith(prefix) else document
+
+
+def _join(left: str, right: str) -> str:
+    """이웃 청크 본문을 겹치는 부분(chunk_overlap) 없이 잇습니다."""
+    for k in range(min(len(left), len(right)), MIN_OVERLAP_CHARS - 1, -1):
+        if left.endswith(right[:k]):
+            rest = right[k:].lstrip()
+            return f"{left}\n{rest}" if rest else left
+    return f"{left}\n{right}"
+
+
+def _merge_adjacent(hits: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """
+    같은 파일·같은 페이지의 연속 청크(chunk_index 가 이웃)를 하나로 합칩니다.
+    합친 항목은 구성 청크 중 가장 높은 순위 자리에 놓입니다.
+    """
+    groups: List[Dict[str, Any]] = []
+    for hit in hits:
+        md = hit["metadata"]
+        index, page = md.get("chunk_index"), md.get("page")
+        page_end = md.get("page_end", page)
+        body = _body(hit["document"], md.get("section"))
+        for group in groups:
+            if (
+                index is not None and page is not None
+                and group["corpus"] == hit.get("corpus")
+                and group["source_file"] == md.get("source_file")
+                and group["section"] == md.get("section")
+                and group["page"] <= page_end and page <= group["page_end"]
+                and index in (group["first"] - 1, group["last"] + 1)
+            ):
+                if index < group["first"]:
+                    group["text"], group["first"] = _join(body, group["text"]), index
+                    group["ids"].insert(0, hit["id"])
+                else:
+                    group["text"], group["last"] = _join(group["text"], body), index
+                    group["ids"].append(hit["id"])
+                group["page"], group["page_end"] = min(group["page"], page), max(group["page_end"], page_end)
+                break
+        else:
+            groups.append({
+                "ids": [hit["id"]], "text": body, "first": index, "last": index, "corpus": hit.get("corpus"),
+                "source_file": md.get("source_file"), "policy_id": md.get("policy_id"),
+                "version": md.get("version"), "section": md.get("section"),
+                "page": page, "page_end": page_end,
+            })
+    return groups
+
+
+def _compact_item(group: Dict[str, Any], snippet: bool) -> Dict[str, Any]:
+    text = group["text"]
+    if snippet and len(text) > SEARCH_SNIPPET_CHARS:
+        text = text[:SEARCH_SNIPPET_CHARS] + "…"
+    page = group["page"] if group["page"] == group["page_end"] else f"{group['page']}-{group['page_end']}"
+    item = {
+        "ids": group["ids"],
+        "corpus": group["corpus"],
+        "policy": group["policy_id"],
+        "ver": group["version"],
+        "page": page,
+        "section": group["section"],
+        "text": text,
+    }
+    return {k: v for k, v in item.items() if v not in (None, "")}
+
+
+def _dumps(obj: Any, response_format: str) -> str:
+    if response_format == "full":
+        return json.dumps(obj, ensure_ascii=False, indent=2)
+    return json.dumps(obj, ensure_ascii=False, separators=(",", ":"))
+
+
+def format_results(hits: List[Dict[str, Any]], response_format: str = "full",
+                   max_chars: Optional[int] = None, max_tokens: Optional[int] = None) -> str:
+    """
+    검색 결과를 응답 문자열로 직렬화합니다.
+    - full: 기존 형식 ([{"document", "metadata"}], 들여쓰기 JSON, 여러 corpus 검색이면 "corpus" 추가)
+    - compact: 공백 없는 JSON, 필요한 메타데이터만 짧은 키로, 같은 페이지의 연속 청크는 하나로 합침
+    - snippets: compact 와 같되 본문은 앞부분만 (전체 본문은 get_policy_chunks 로 조회)
+    max_chars / max_tokens(UTF-8 바이트 / 4 근사)를 주면 응답 전체가 예산 안에 들어가도록
+    뒤 순위 결과를 버리고 경계에 걸린 결과의 본문은 잘라 "…" 로 표시합니다.
+    compact/snippets 는 {"results": [...]} 이며 예산 때문에 버린 결과 수를 "omitted" 로 알려줍니다.
+    """
+    if response_format not in RESPONSE_FORMATS:
+        raise ValueError(f"알 수 없는 응답 형식: {response_format} (가능: {', '.join(RESPONSE_FORMATS)})")
+    if response_format == "full":
+        items = [
+            {"document": h["document"], "metadata": h["metadata"], **({"corpus": h["corpus"]} if "corpus" in h else {})}
+            for h in hits
+        ]
+        text_key = "document"
+    else:
+        items = [_compact_item(g, response_format == "snippets") for g in _merge_adjacent(hits)]
+        text_key = "text"
+
+    def wrap(kept: List[Dict[str, Any]]) -> Any:
+        if response_format == "full":
+            return kept
+        omitted = len(items) - len(kept)
+        return {"results": kept, "omitted": omitted} if omitted else {"results": kept}
+
+    return _fit(items, wrap, text_key, response_format, max_chars, max_tokens)
+
+
+def format_batch_results(queries: List[str], results: List[List[Dict[str, Any]]], response_format: str = "compact",
+                         max_chars: Optional[int] = None, max_tokens: Optional[int] = None) -> str:
+    """
+    여러 질의의 검색 결과를 한 응답으로 직렬화합니다.
+    {"results": [{"query", "refs"}], "chunks": [...]} — 여러 질의에 함께 걸린 청크는 chunks 에 한 번만 넣고
+    질의별 결과는 chunks 의 번호(refs, 질의의 순위 순)로 가리킵니다.
+    chunks 는 질의별 1위들, 2위들 ... 순서로 나열하므로 크기 상한에 걸리면 모든 질의의 하위 순위부터 생략됩니다.
+    응답 형식(full 은 청크마다 "id" 포함)과 크기 상한은 format_results 와 같습니다.
+    """
+    if response_format not in RESPONSE_FORMATS:
+        raise ValueError(f"알 수 없는 응답 형식: {response_format} (가능: {', '.join(RESPONSE_FORMATS)})")
+    ordered: Dict[str, Dict[str, Any]] = {}
+    for rank in range(max((len(hits) for hits in results), default=0)):
+        for hits in results:
+            if rank < len(hits):
+                ordered.setdefault(hits[rank]["id"], hits[rank])
+    union = list(ordered.values())
+    if response_format == "full":
+        items = [
+            {"id": h["id"], "document": h["document"], "metadata": h["metadata"],
+             **({"corpus": h["corpus"]} if "corpus" in h else {})}
+            for h in union
+        ]
+        ref_of = {h["id"]: i for i, h in enumerate(union)}
+        text_key = "document"
+    else:
+        # 다른 질의에서 걸린 이웃 청크도 하나로 합쳐진다
+        groups = _merge_adjacent(union)
+        items = [_compact_item(g, response_format == "snippets") for g in groups]
+        ref_of = {cid: i for i, g in enumerate(groups) for cid in g["ids"]}
+        text_key = "text"
+    refs = [list(dict.fromkeys(ref_of[h["id"]] for h in hits)) for hits in results]
+
+    def wrap(kept: List[Dict[str, Any]]) -> Any:
+        out: Dict[str, Any] = {
+            "results": [{"query": q, "refs": [r for r in rs if r < len(kept)]} for q, rs in zip(queries, refs)],
+            "chunks": kept,
+        }
+        if len(kept) < len(items):
+            out["omitted"] = len(items) - len(kept)
+        return out
+
+    return _fit(items, wrap, text_key, response_format, max_chars, max_tokens)
+
+
+def _fit(items: List[Dict[str, Any]], wrap: Callable[[List[Dict[str, Any]]], Any], text_key: str,
+         response_format: str, max_chars: Optional[int], max_tokens: Optional[int]) -> str:
+    """
+    wrap(앞에서부터 남긴 항목) 의 직렬화가 max_chars / max_tokens 안에 들도록 뒤 항목을 버리고
+    경계에 걸린 항목의 본문(text_key)은 잘라 "…" 로 표시합니다.
+    """
+    def fits(kept: List[Dict[str, Any]]) -> bool:
+        payload = _dumps(wrap(kept), response_format)
+        if max_chars is not None and len(payload) > max_chars:
+            return False
+        if max_tokens is not None and len(payload.encode("utf-8")) / 4 > max_tokens:
+            return False
+        return True
+
+    if max_chars is None and max_tokens is None:
+        return _dumps(wrap(items), response_format)
+
+    kept: List[Dict[str, Any]] = []
+    for item in items:
+        if fits(kept + [item]):
+            kept.append(item)
+            continue
+        # 남은 예산에 들어가는 최대 길이를 이분 탐색으로 찾아 본문을 잘라 넣는다
+        text = item[text_key]
+        lo, hi = 0, len(text)
+        while lo < hi:
+            mid = (lo + hi + 1) // 2
+            if fits(kept + [{**item, text_key: text[:mid] + "…"}]):
+                lo = mid
+            else:
+                hi = mid - 1
+        if lo > 0:
+            kept.append({**item, text_key: text[:lo] + "…"})
+        break
+    return _dumps(wrap(kept), response_format)
@@ -0,0 +1,84 @@
+import os
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+from typing import Any, Dict, Hashable
+
+# 검색 캐시 설정
+# - QUERY_EMBEDDING_CACHE_SIZE / QUERY_EMBEDDING_CACHE_TTL: 정규화된 질의 → 임베딩
+# - QUERY_RESULT_CACHE_SIZE / QUERY_RESULT_CACHE_TTL: (질의, top_k, 검색 방식·필터, 컬렉션 버전) → 검색 결과
+QUERY_EMBEDDING_CACHE_SIZE = int(os.getenv("QUERY_EMBEDDING_CACHE_SIZE", "2048"))
+QUERY_EMBEDDING_CACHE_TTL = float(os.getenv("QUERY_EMBEDDING_CACHE_TTL", "86400"))
+QUERY_RESULT_CACHE_SIZE = int(os.getenv("QUERY_RESULT_CACHE_SIZE", "512"))
+QUERY_RESULT_CACHE_TTL = float(os.getenv("QUERY_RESULT_CACHE_TTL", "600"))
+
+__all__ = ["TTLCache", "normalize_query", "embedding_cache", "result_cache"]
+
+_MISSING = object()
+
+
+def normalize_query(query: str) -> str:
+    """유니코드 정규화(NFKC) + 소문자 + 공백 정리"""
+    return " ".join(unicodedata.normalize("NFKC", query).lower().split())
+
+
+class TTLCache:
+    """
+    크기 제한 + 만료 시간이 있는 스레드 안전 LRU 캐시.
+    maxsize 를 넘으면 가장 오래 사용하지 않은 항목부터, ttl 이 지난 항목은 조회 시 제거합니다.
+    """
+
+    def __init__(self, maxsize: int, ttl: float):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._data: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        with self._lock:
+            item = self._data.get(key, _MISSING)
+            if item is not _MISSING:
+                value, expires_at = item
+                if expires_at > time.monotonic():
+                    self._data.move_to_end(key)
+                    self.hits += 1
+                    return value
+                del self._data[key]
+                self.evictions += 1
+            self.misses += 1
+            return default
+
+    def put(self, key: Hashable, value: Any) -> None:
+        if self.maxsize <= 0:
+            return
+        with self._lock:
+            self._data[key] = (value, time.monotonic() + self.ttl)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self.evictions += len(self._data)
+            self._data.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._data),
+            "maxsize": self.maxsize,
+            "ttl_seconds": self.ttl,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0,
+            "evictions": self.evictions,
+        }
+
+
+embedding_cache = TTLCache(QUERY_EMBEDDING_CACHE_SIZE, QUERY_EMBEDDING_CACHE_TTL)
+result_cache = TTLCache(QUERY_RESULT_CACHE_SIZE, QUERY_RESULT_CACHE_TTL)
@@ -0,0 +1,250 @@
+import hashlib
+import io
+import itertools
+import os
+import re
+import sqlite3
+import threading
+import time
+from typing import Any, BinaryIO, Dict, List, Optional, Tuple, Union
+
+from PIL import Image, ImageOps
+
+from Ocr_Recorder import _crop_receipt_region
+
+# 중복 영수증 인덱스 설정
+# - RECEIPT_INDEX_PATH: SQLite 파일 경로 (빈 문자열이면 중복 검사 비활성화)
+# - DUPLICATE_PHASH_DISTANCE: 이미지 지각 해시(64bit) 해밍 거리 이하면 같은 영수증 사진으로 판단 (구간 탐색 반경은 이 값 // 4 비트)
+RECEIPT_INDEX_PATH = os.getenv("RECEIPT_INDEX_PATH", "./receipt_index.sqlite3")
+DUPLICATE_PHASH_DISTANCE = int(os.getenv("DUPLICATE_PHASH_DISTANCE", "7"))
+
+__all__ = ["ReceiptIndex", "receipt_index", "image_phash", "image_sha256"]
+
+# 해시 격자: 4열 x 16행 비교 = 64bit
+PHASH_COLS, PHASH_ROWS = 4, 16
+# 64bit 해시를 16bit 4개 구간으로 나눠 각각 색인 (multi-index hashing).
+# 거리 d 이하인 해시는 적어도 한 구간이 d // 4 비트 이하로만 다르므로(비둘기집),
+# 구간마다 그 반경 안의 값들을 IN 으로 색인 조회하면 전체를 훑지 않고도 빠짐없이 후보를 찾습니다.
+PHASH_BANDS = 4
+PHASH_BAND_BITS = 64 // PHASH_BANDS
+NON_DIGIT_PAT = re.compile(r"\D")
+
+
+def image_phash(source: Union[bytes, str, BinaryIO]) -> int:
+    """
+    영수증 이미지의 64bit 지각 해시.
+    EXIF 회전 보정 후 영수증 영역만 잘라 4x17 흑백으로 줄이고, 위아래 칸의 밝기 비교를 비트로 씁니다.
+    영수증은 세로로 긴 글자 줄의 배치가 서로 다르므로 세로 방향 비교가 가로 dHash 보다 잘 구분되고,
+    다시 찍거나 여백을 다르게 자른 같은 영수증은 가까운 값이 나옵니다.
+    """
+    fp = io.BytesIO(source) if isinstance(source, bytes) else source
+    with Image.open(fp) as img:
+        img.draft("L", (256, 256))
+        img = ImageOps.exif_transpose(img).convert("L")
+        img = _crop_receipt_region(img)
+        small = img.resize((PHASH_COLS, PHASH_ROWS + 1), Image.BOX)
+        pixels = small.tobytes()
+    value = 0
+    for row in range(PHASH_ROWS):
+        for col in range(PHASH_COLS):
+            upper, lower = pixels[row * PHASH_COLS + col], pixels[(row + 1) * PHASH_COLS + col]
+            value = (value << 1) | (1 if upper > lower else 0)
+    return value
+
+
+def image_sha256(source: Union[bytes, str]) -> str:
+    if isinstance(source, bytes):
+        return hashlib.sha256(source).hexdigest()
+    h = hashlib.sha256()
+    with open(source, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def _signed(value: int) -> int:
+    # SQLite INTEGER 는 부호 있는 64bit
+    return value - (1 << 64) if value >= (1 << 63) else value
+
+
+def _bands(phash: int) -> List[int]:
+    mask = (1 << PHASH_BAND_BITS) - 1
+    return [(phash >> (PHASH_BAND_BITS * i)) & mask for i in range(PHASH_BANDS)]
+
+
+def _band_neighbors(band: int, radius: int) -> List[int]:
+    values = [band]
+    for r in range(1, radius + 1):
+        for bits in itertools.combinations(range(PHASH_BAND_BITS), r):
+            flipped = band
+            for bit in bits:
+                flipped ^= 1 << bit
+            values.append(flipped)
+    return values
+
+
+def _digits(value: Any) -> str:
+    return NON_DIGIT_PAT.sub("", str(value or ""))
+
+
+class ReceiptIndex:
+    """
+    제출된 영수증의 추출 필드 + 이미지 해시를 저장하고 새 영수증의 중복 후보를 찾는 SQLite 색인.
+    - 필드: (거래일자, 금액) 색인으로 후보를 찾고 사업자번호/가맹점 전화가 같으면 중복
+    - 이미지: 지각 해시 해밍 거리가 DUPLICATE_PHASH_DISTANCE 이하면 중복
+    - 같은 파일(sha256)을 다시 보낸 것은 재시도로 보고 중복 대신 이전 제출(previously_seen)로 알려줍니다
+    모든 조회는 색인 탐색이라 저장 건수가 수십만이어도 영수증당 비용이 거의 일정합니다.
+    """
+
+    def __init__(self, path: str, phash_distance: int = DUPLICATE_PHASH_DISTANCE):
+        self.path = path
+        self.phash_distance = phash_distance
+        self.checks = 0
+        self.flagged = 0
+        # 저장된 영수증 수 (연결할 때 한 번 세고 이후에는 추가할 때마다 증가, /metrics 가 매번 COUNT(*) 하지 않도록)
+        self.count = 0
+        self._lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.path)
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._conn is None:
+            conn = sqlite3.connect(self.path, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS receipts ("
+                " id INTEGER PRIMARY KEY,"
+                " image_sha TEXT UNIQUE,"
+                " business_reg_no TEXT,"
+                " trade_date TEXT,"
+                " amount INTEGER,"
+                " tel TEXT,"
+                " phash INTEGER,"
+                + "".join(f" phash_b{i} INTEGER," for i in range(PHASH_BANDS))
+                + " source TEXT,"
+                " created_at REAL NOT NULL)"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS receipts_date_amount ON receipts(trade_date, amount)")
+            for i in range(PHASH_BANDS):
+                # (구간, 전체 해시) 커버링 색인: 후보의 해밍 거리를 테이블을 읽지 않고 계산
+                conn.execute(f"CREATE INDEX IF NOT EXISTS receipts_phash_b{i} ON receipts(phash_b{i}, phash)")
+            self.count = conn.execute("SELECT COUNT(*) FROM receipts").fetchone()[0]
+            self._conn = conn
+        return self._conn
+
+    @staticmethod
+    def _fields(parsed: Dict[str, Any]) -> Dict[str, Any]:
+        merchant = parsed.get("merchant") or {}
+        amount = parsed.get("amount")
+        return {
+            "business_reg_no": _digits(parsed.get("business_reg_no")) or None,
+            "trade_date": parsed.get("trade_date") or None,
+            "amount": int(amount) if amount else None,
+            "tel": _digits(merchant.get("tel")) or None,
+        }
+
+    def _find(self, conn: sqlite3.Connection, fields: Dict[str, Any], phash: Optional[int],
+              image_sha: Optional[str]) -> Tuple[List[Dict[str, Any]], Optional[Dict[str, Any]]]:
+        """(중복 후보 목록, 같은 이미지의 이전 제출 또는 None)"""
+        matches: Dict[int, Dict[str, Any]] = {}
+        previous: Optional[Dict[str, Any]] = None
+
+        cols = "id, source, created_at"
+        if image_sha:
+            row = conn.execute(f"SELECT {cols} FROM receipts WHERE image_sha = ?", (image_sha,)).fetchone()
+            if row is not None:
+                previous = {"receipt_id": row[0], "source": row[1], "submitted_at": row[2]}
+
+        def _add(row: tuple, reason: str, **extra: Any) -> None:
+            rid, source, created_at = row[0], row[1], row[2]
+            if previous is not None and rid == previous["receipt_id"]:
+                # 같은 이미지를 다시 보낸 것(재시도/재추출)은 자기 자신과 겹치는 것이므로 중복이 아님
+                return
+            match = matches.setdefault(rid, {
+                "receipt_id": rid, "source": source, "submitted_at": created_at, "reasons": [],
+            })
+            match["reasons"].append(reason)
+            match.update(extra)
+
+        if fields["trade_date"] and fields["amount"]:
+            rows = conn.execute(
+                f"SELECT {cols}, business_reg_no, tel FROM receipts WHERE trade_date = ? AND amount = ?",
+                (fields["trade_date"], fields["amount"]),
+            )
+            for row in rows:
+                if fields["business_reg_no"] and row[3] == fields["business_reg_no"]:
+                    _add(row, "same_business_reg_no_date_amount")
+                elif fields["tel"] and row[4] == fields["tel"]:
+                    _add(row, "same_tel_date_amount")
+
+        if phash is not None:
+            radius = self.phash_distance // PHASH_BANDS
+            close: Dict[int, int] = {}
+            for i, band in enumerate(_bands(phash)):
+                neighbors = _band_neighbors(band, radius)
+                rows = conn.execute(
+                    f"SELECT id, phash FROM receipts WHERE phash_b{i} IN ({', '.join('?' * len(neighbors))})",
+                    neighbors,
+                )
+                for rid, other in rows:
+                    distance = bin((other & ((1 << 64) - 1)) ^ phash).count("1")
+                    if distance <= self.phash_distance:
+                        close[rid] = distance
+            if close:
+                ids = sorted(close)
+                rows = conn.execute(
+                    f"SELECT {cols} FROM receipts WHERE id IN ({', '.join('?' * len(ids))})", ids
+                )
+                for row in rows:
+                    _add(row, "similar_image", phash_distance=close[row[0]])
+
+        return sorted(matches.values(), key=lambda m: m["receipt_id"]), previous
+
+    def check(self, parsed: Dict[str, Any], phash: Optional[int] = None,
+              image_sha: Optional[str] = None) -> List[Dict[str, Any]]:
+        """저장하지 않고 중복 후보만 조회합니다."""
+        if not self.enabled:
+            return []
+        with self._lock:
+            return self._find(self._connect(), self._fields(parsed), phash, image_sha)[0]
+
+    def check_and_add(self, parsed: Dict[str, Any], phash: Optional[int] = None, image_sha: Optional[str] = None,
+                      source: Optional[str] = None) -> Tuple[List[Dict[str, Any]], Optional[Dict[str, Any]]]:
+        """
+        중복 후보를 조회한 뒤 이 영수증을 색인에 추가합니다. (이전 제출분 중 중복 후보 목록, 같은 이미지의 이전 제출) 반환.
+        같은 이미지 파일(sha256)을 다시 넣으면 새 행을 만들지 않고, 그 이전 행은 중복 후보에서 제외합니다.
+        """
+        if not self.enabled:
+            return [], None
+        fields = self._fields(parsed)
+        with self._lock:
+            conn = self._connect()
+            matches, previous = self._find(conn, fields, phash, image_sha)
+            if previous is None:
+                bands = _bands(phash) if phash is not None else [None] * PHASH_BANDS
+                conn.execute(
+                    "INSERT INTO receipts (image_sha, business_reg_no, trade_date, amount, tel, phash, "
+                    + ", ".join(f"phash_b{i}" for i in range(PHASH_BANDS))
+                    + ", source, created_at) VALUES (" + ", ".join("?" * (8 + PHASH_BANDS)) + ")",
+                    (image_sha, fields["business_reg_no"], fields["trade_date"], fields["amount"], fields["tel"],
+                     _signed(phash) if phash is not None else None, *bands, source, time.time()),
+                )
+                conn.commit()
+                self.count += 1
+            self.checks += 1
+            if matches:
+                self.flagged += 1
+        return matches, previous
+
+    def stats(self) -> Dict[str, Any]:
+        if self.enabled:
+            with self._lock:
+                self._connect()
+        return {"enabled": self.enabled, "receipts": self.count, "checks": self.checks, "flagged": self.flagged}
+
+
+receipt_index = ReceiptIndex(RECEIPT_INDEX_PATH)
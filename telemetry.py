@@ -0,0 +1,161 @@
+import contextvars
+import functools
+import inspect
+import os
+import threading
+import time
+from collections import defaultdict, deque
+from contextlib import contextmanager
+from typing import Any, Callable, Deque, Dict, Iterator, List, Optional, Tuple
+
+# 백분위 계산에 쓰는 최근 샘플 수 (구간별)
+METRICS_WINDOW = int(os.getenv("METRICS_WINDOW", "2048"))
+
+__all__ = ["span", "record", "capture", "merge", "track", "breakdown", "snapshot"]
+
+# 현재 도구 호출의 구간별 누적 시간(초) — track() 이 호출마다 새로 만든다
+_request: contextvars.ContextVar[Optional[Dict[str, float]]] = contextvars.ContextVar("telemetry_request", default=None)
+# OCR 워커처럼 다른 프로세스에서 잰 구간을 부모에게 넘기기 위한 수집 목록
+_capture: contextvars.ContextVar[Optional[List[Tuple[str, float]]]] = contextvars.ContextVar("telemetry_capture", default=None)
+
+
+class Histogram:
+    """전체 호출 수/합계와 최근 METRICS_WINDOW 개 샘플의 p50/p95/p99"""
+
+    def __init__(self, window: int = METRICS_WINDOW):
+        self.count = 0
+        self.total = 0.0
+        self._samples: Deque[float] = deque(maxlen=window)
+
+    def observe(self, seconds: float) -> None:
+        self.count += 1
+        self.total += seconds
+        self._samples.append(seconds)
+
+    def summary(self) -> Dict[str, Any]:
+        samples = sorted(self._samples)
+
+        def pct(p: float) -> float:
+            if not samples:
+                return 0.0
+            return round(samples[min(len(samples) - 1, int(p * len(samples)))] * 1000, 3)
+
+        return {
+            "count": self.count,
+            "mean_ms": round(self.total / self.count * 1000, 3) if self.count else 0.0,
+            "p50_ms": pct(0.50),
+            "p95_ms": pct(0.95),
+            "p99_ms": pct(0.99),
+        }
+
+
+_lock = threading.Lock()
+_stages: Dict[str, Histogram] = defaultdict(Histogram)
+_tools: Dict[str, Histogram] = defaultdict(Histogram)
+_requests: Dict[str, int] = defaultdict(int)
+_errors: Dict[str, int] = defaultdict(int)
+_in_flight: Dict[str, int] = defaultdict(int)
+
+
+def record(stage: str, seconds: float) -> None:
+    """구간 시간을 히스토그램과 현재 요청의 breakdown 에 기록합니다."""
+    captured = _capture.get()
+    if captured is not None:
+        captured.append((stage, seconds))
+        return
+    with _lock:
+        _stages[stage].observe(seconds)
+    current = _request.get()
+    if current is not None:
+        current[stage] = current.get(stage, 0.0) + seconds
+
+
+@contextmanager
+def span(stage: str) -> Iterator[None]:
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        record(stage, time.perf_counter() - started)
+
+
+@contextmanager
+def capture() -> Iterator[List[Tuple[str, float]]]:
+    """블록 안의 span 을 전역 히스토그램 대신 목록에 모읍니다 (워커 → 부모 전달용, merge 로 반영)."""
+    captured: List[Tuple[str, float]] = []
+    token = _capture.set(captured)
+    try:
+        yield captured
+    finally:
+        _capture.reset(token)
+
+
+def merge(captured: List[Tuple[str, float]]) -> None:
+    for stage, seconds in captured:
+        record(stage, seconds)
+
+
+def breakdown() -> Dict[str, Any]:
+    """현재 도구 호출에서 지금까지 잰 구간별 시간(ms)"""
+    current = _request.get() or {}
+    return {stage: round(seconds * 1000, 3) for stage, seconds in current.items()}
+
+
+@contextmanager
+def _tool_call(name: str) -> Iterator[None]:
+    token = _request.set({})
+    with _lock:
+        _requests[name] += 1
+        _in_flight[name] += 1
+    started = time.perf_counter()
+    try:
+        yield
+    except BaseException:
+        with _lock:
+            _errors[name] += 1
+        raise
+    finally:
+        elapsed = time.perf_counter() - started
+        with _lock:
+            _in_flight[name] -= 1
+            _tools[name].observe(elapsed)
+        _request.reset(token)
+
+
+def track(name: Optional[str] = None) -> Callable:
+    """
+    도구/엔드포인트 함수의 호출 수, 오류 수, 동시 실행 수, 전체 지연시간을 기록하는 데코레이터.
+    호출마다 breakdown() 용 구간 기록을 새로 시작합니다. (@mcp.tool() 아래에 붙임)
+    """
+
+    def decorator(fn: Callable) -> Callable:
+        tool_name = name or fn.__name__
+        if inspect.iscoroutinefunction(fn):
+            @functools.wraps(fn)
+            async def async_wrapper(*args, **kwargs):
+                with _tool_call(tool_name):
+                    return await fn(*args, **kwargs)
+            return async_wrapper
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            with _tool_call(tool_name):
+                return fn(*args, **kwargs)
+        return wrapper
+
+    return decorator
+
+
+def snapshot() -> Dict[str, Any]:
+    with _lock:
+        tools = {
+            name: {
+                "requests": _requests[name],
+                "errors": _errors[name],
+                "in_flight": _in_flight[name],
+                "latency": _tools[name].summary(),
+            }
+            for name in sorted(_requests)
+        }
+        stages = {stage: hist.summary() for stage, hist in sorted(_stages.items())}
+    return {"tools": tools, "stages": stages}
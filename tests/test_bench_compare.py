@@ -0,0 +1,20 @@
+from benchmarks.suite import compare
+
+
+BASELINE = {"metrics": {
+    "ocr.latency_ms": {"value": 100.0, "unit": "ms", "better": "lower"},
+    "search.hit_rate": {"value": 0.9, "unit": "ratio", "better": "higher"},
+}}
+CURRENT = {"metrics": {"search.hit_rate": {"value": 0.9, "unit": "ratio", "better": "higher"}}}
+
+
+def test_missing_metric_is_a_regression():
+    rows = {r["metric"]: r for r in compare(CURRENT, BASELINE, 0.15, {})}
+    assert rows["ocr.latency_ms"]["current"] is None
+    assert rows["ocr.latency_ms"]["regressed"]
+    assert not rows["search.hit_rate"]["regressed"]
+
+
+def test_allow_missing_skips_missing_metric():
+    rows = compare(CURRENT, BASELINE, 0.15, {}, allow_missing=True)
+    assert not [r for r in rows if r["regressed"]]
@@ -0,0 +1,49 @@
+import asyncio
+import json
+
+import pytest
+
+import expense_reports
+import ocr_pool
+from expense_reports import generate_reports
+from line_store import LineStore
+from ocr_cache import OcrCache
+
+
+def test_formatted_amounts_are_summed(tmp_path):
+    receipts = [
+        {"user": "a", "department": "d", "trade_date": "2025-01-03", "amount": "32,000", "merchant": {"name": "스타벅스"}},
+        {"user": "a", "department": "d", "trade_date": "2025-01-04", "amount": 1000, "merchant": {"name": "택시"}},
+    ]
+    manifest = generate_reports(receipts, str(tmp_path))
+    assert manifest["reports"][0]["total"] == 33000
+    assert manifest["reports"][0]["by_category"] == {"식대": 32000, "교통비": 1000}
+
+
+def test_groups_with_same_sanitized_name_get_separate_files(tmp_path):
+    receipts = [
+        {"user": "홍 길동", "department": "d", "trade_date": "2025-01-03", "amount": 1},
+        {"user": "홍_길동", "department": "d", "trade_date": "2025-01-03", "amount": 2},
+    ]
+    manifest = generate_reports(receipts, str(tmp_path))
+    files = [r["file"] for r in manifest["reports"]]
+    assert len(set(files)) == 2
+    assert all((tmp_path / f).exists() for f in files)
+
+
+def test_fill_from_images_handles_more_images_than_queue_depth(tmp_path, monkeypatch):
+    def fake_job(source):
+        return [{"text": "합계 5,000원", "conf": 0.9, "bbox": [[0, 0], [1, 0], [1, 1], [0, 1]]}], []
+
+    def fake_key(path, languages, version):
+        return path
+
+    monkeypatch.setattr(ocr_pool, "OCR_WORKERS", 0)
+    monkeypatch.setattr(ocr_pool, "OCR_QUEUE_DEPTH", 2)
+    monkeypatch.setattr(ocr_pool, "_ocr_job", fake_job)
+    monkeypatch.setattr(ocr_pool, "file_key", fake_key)
+    monkeypatch.setattr(ocr_pool, "cache", OcrCache("", 0))
+    monkeypatch.setattr(ocr_pool, "line_store", LineStore(""))
+    receipts = [{"image_path": str(tmp_path / f"r{i}.jpg")} for i in range(40)]
+    asyncio.run(expense_reports._fill_from_images(receipts))
+    assert all(r.get("amount") == 5000 for r in receipts)
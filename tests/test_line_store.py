@@ -0,0 +1,41 @@
+from line_store import IMPORTED_KEY_PREFIX, LineStore, import_ocr_cache
+from ocr_cache import OcrCache
+from receipt_index import ReceiptIndex
+
+
+LINES = [{"text": "합계 32,000원", "conf": 0.9, "bbox": [[0, 0], [10, 0], [10, 5], [0, 5]]}]
+
+
+def test_receipt_index_count_follows_inserts(tmp_path):
+    path = str(tmp_path / "index.sqlite3")
+    index = ReceiptIndex(path)
+    assert index.stats()["receipts"] == 0
+    index.check_and_add({"amount": 1000}, image_sha="a")
+    index.check_and_add({"amount": 1000}, image_sha="a")  # 같은 이미지 재제출은 행을 늘리지 않음
+    index.check_and_add({"amount": 2000}, image_sha="b")
+    assert index.stats()["receipts"] == 2
+    # 다시 열면 저장된 건수에서 시작
+    assert ReceiptIndex(path).stats()["receipts"] == 2
+
+
+def test_line_store_stats_are_cached_until_max_age(tmp_path):
+    store = LineStore(str(tmp_path / "lines"))
+    store.append("a", LINES)
+    store.close()
+    assert store.stats()["receipts"] == 1
+    store.append("b", LINES)
+    store.close()
+    assert store.stats()["receipts"] == 1
+    assert store.stats(max_age=0)["receipts"] == 2
+
+
+def test_import_ocr_cache_is_idempotent_and_marks_key_kind(tmp_path):
+    cache_path = str(tmp_path / "ocr_cache.sqlite3")
+    cache = OcrCache(cache_path, 1 << 20)
+    cache.put("k1", LINES)
+    cache.put("k2", LINES)
+    cache.flush()
+    store = LineStore(str(tmp_path / "lines"))
+    assert import_ocr_cache(store, cache_path) == 2
+    assert import_ocr_cache(store, cache_path) == 0
+    assert sorted(store.keys()) == [IMPORTED_KEY_PREFIX + "k1", IMPORTED_KEY_PREFIX + "k2"]
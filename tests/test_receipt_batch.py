@@ -0,0 +1,58 @@
+import asyncio
+import base64
+import time
+
+import pytest
+
+import main
+import ocr_pool
+from line_store import LineStore
+from ocr_cache import OcrCache
+from receipt_index import ReceiptIndex
+
+
+LINES = [{"text": "합계 32,000원", "conf": 0.9, "bbox": [[0, 0], [10, 0], [10, 5], [0, 5]]}]
+
+
+def _slow_ocr_job(source):
+    time.sleep(0.01)
+    return LINES, []
+
+
+@pytest.fixture
+def pool(monkeypatch):
+    # 모델 없이 워커 1개(스레드)와 작은 대기열로 실행
+    monkeypatch.setattr(ocr_pool, "OCR_WORKERS", 0)
+    monkeypatch.setattr(ocr_pool, "OCR_QUEUE_DEPTH", 2)
+    monkeypatch.setattr(ocr_pool, "_ocr_job", _slow_ocr_job)
+    monkeypatch.setattr(ocr_pool, "cache", OcrCache("", 0))
+    monkeypatch.setattr(ocr_pool, "line_store", LineStore(""))
+    monkeypatch.setattr(main, "receipt_index", ReceiptIndex(""))
+    ocr_pool.shutdown()
+    yield
+    ocr_pool.shutdown()
+
+
+def test_batch_larger_than_queue_depth_is_not_rejected(pool):
+    images = [base64.b64encode(bytes([i])).decode() for i in range(ocr_pool.OCR_QUEUE_DEPTH * 5)]
+    results = asyncio.run(main.extract_receipt_core_fields_batch.fn(images))
+    assert [r["index"] for r in results] == list(range(len(images)))
+    assert not [r for r in results if "error" in r]
+    assert all(r["amount"] == 32000 for r in results)
+
+
+def test_batch_reports_bad_base64_per_image(pool):
+    good = base64.b64encode(b"receipt").decode()
+    results = asyncio.run(main.extract_receipt_core_fields_batch.fn([good, "abc", good]))
+    assert "error" in results[1]
+    assert "error" not in results[0] and "error" not in results[2]
+
+
+def test_ocr_during_warm_up_does_not_mark_ready(pool, monkeypatch):
+    monkeypatch.setattr(ocr_pool, "_warming", True)
+    monkeypatch.setattr(ocr_pool, "_ready", False)
+    asyncio.run(ocr_pool.ocr_image_bytes(b"receipt"))
+    assert not ocr_pool.is_ready()
+    monkeypatch.setattr(ocr_pool, "_warming", False)
+    asyncio.run(ocr_pool.ocr_image_bytes(b"receipt"))
+    assert ocr_pool.is_ready()
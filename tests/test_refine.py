@@ -0,0 +1,39 @@
+import numpy as np
+
+import Ocr_Recorder
+
+
+LINE = {"text": "합계 32,000원", "conf": 0.5, "bbox": [[10, 10], [200, 10], [200, 40], [10, 40]]}
+
+
+class _Reader:
+    def __init__(self, text, conf):
+        self.text, self.conf = text, conf
+
+    def recognize(self, img, **kwargs):
+        return [(None, self.text, self.conf)]
+
+
+def _refine(monkeypatch, text, conf, lines=(LINE,)):
+    monkeypatch.setattr(Ocr_Recorder, "get_reader", lambda: _Reader(text, conf))
+    img = np.full((60, 240, 3), 255, dtype=np.uint8)
+    refined = Ocr_Recorder._refine_lines(img, list(lines))
+    return refined, Ocr_Recorder._extract_fields(refined)["amount"]
+
+
+def test_refine_keeps_amount_when_candidate_drops_digits(monkeypatch):
+    refined, amount = _refine(monkeypatch, "3,000", 0.9)
+    assert amount == 32000
+    assert refined[0]["text"] == LINE["text"]
+
+
+def test_refine_ignores_candidate_without_the_field(monkeypatch):
+    refined, amount = _refine(monkeypatch, "-", 0.99)
+    assert amount == 32000
+    assert "refined" not in refined[0]
+
+
+def test_refine_accepts_confident_candidate_with_same_digits(monkeypatch):
+    refined, amount = _refine(monkeypatch, "32,800", 0.9)
+    assert amount == 32800
+    assert refined[0]["refined"]
@@ -0,0 +1,38 @@
+import asyncio
+
+import pytest
+
+import main
+import policy_search
+from query_cache import result_cache
+
+
+@pytest.fixture
+def searched(monkeypatch):
+    calls = []
+
+    def fake_search(query, *args, **kwargs):
+        calls.append(query)
+        return [{"id": "c1", "document": query, "metadata": {}, "score": 1.0}]
+
+    def fake_search_many(queries, *args, **kwargs):
+        calls.extend(queries)
+        return [[{"id": q, "document": q, "metadata": {}, "score": 1.0}] for q in queries]
+
+    monkeypatch.setattr(main, "collection_version", lambda corpus=None: "v-test")
+    monkeypatch.setattr(policy_search, "search", fake_search)
+    monkeypatch.setattr(policy_search, "search_many", fake_search_many)
+    result_cache.clear()
+    yield calls
+    result_cache.clear()
+
+
+def test_search_uses_original_query_and_normalized_cache_key(searched):
+    asyncio.run(main.searcing_chromadb.fn("PRC-301  구매 절차"))
+    asyncio.run(main.searcing_chromadb.fn("prc-301 구매 절차"))
+    assert searched == ["PRC-301  구매 절차"]
+
+
+def test_batch_searches_original_queries_once_per_normalized_form(searched):
+    asyncio.run(main.searcing_chromadb_batch.fn(["PRC-301 절차", "prc-301  절차", "HR-001"]))
+    assert searched == ["PRC-301 절차", "HR-001"]
@@ -0,0 +1,70 @@
+import asyncio
+import io
+import os
+
+import pytest
+from fastapi.testclient import TestClient
+from PIL import Image
+
+import main
+import ocr_pool
+from line_store import LineStore
+from Ocr_Recorder import _decode_image_file
+from ocr_cache import OcrCache
+from receipt_index import ReceiptIndex
+
+
+def _decode_only_job(source):
+    # 실제 디코딩/전처리는 하고 인식 결과만 고정
+    _decode_image_file(source)
+    return [{"text": "합계 1,000", "conf": 0.9, "bbox": [[0, 0], [1, 0], [1, 1], [0, 1]]}], []
+
+
+def _png(size=(40, 40)) -> bytes:
+    buf = io.BytesIO()
+    Image.new("RGB", size, "white").save(buf, "PNG")
+    return buf.getvalue()
+
+
+@pytest.fixture
+def client(monkeypatch):
+    monkeypatch.setattr(ocr_pool, "OCR_WORKERS", 0)
+    monkeypatch.setattr(ocr_pool, "_ocr_job", _decode_only_job)
+    monkeypatch.setattr(ocr_pool, "cache", OcrCache("", 0))
+    monkeypatch.setattr(ocr_pool, "line_store", LineStore(""))
+    monkeypatch.setattr(main, "receipt_index", ReceiptIndex(""))
+    ocr_pool.shutdown()
+    yield TestClient(main.app, raise_server_exceptions=False)
+    ocr_pool.shutdown()
+
+
+@pytest.mark.parametrize("payload", [b"", b"not an image", _png()[:60]])
+def test_unreadable_upload_is_400(client, payload):
+    res = client.post("/receipts/extract", files={"file": ("r.png", payload)})
+    assert res.status_code == 400
+
+
+def test_valid_upload_is_200(client):
+    res = client.post("/receipts/extract", files={"file": ("r.png", _png())})
+    assert res.status_code == 200
+    assert res.json()["amount"] == 1000
+
+
+def test_server_fault_is_500(client, monkeypatch):
+    def broken(source):
+        raise RuntimeError("pool broken")
+
+    monkeypatch.setattr(ocr_pool, "_ocr_job", broken)
+    res = client.post("/receipts/extract", files={"file": ("r.png", _png((41, 40)))})
+    assert res.status_code == 500
+
+
+def test_from_file_rejects_symlink_out_of_root(client, tmp_path, monkeypatch):
+    root = tmp_path / "receipts"
+    root.mkdir()
+    outside = tmp_path / "secret.png"
+    outside.write_bytes(_png())
+    os.symlink(outside, root / "link.png")
+    monkeypatch.setattr(main, "RECEIPT_FILE_ROOT", os.path.realpath(root))
+    with pytest.raises(ValueError):
+        asyncio.run(main.extract_receipt_core_fields_from_file.fn("link.png"))